@@ -2,54 +2,113 @@
 Advanced NLP Pipeline for sentiment analysis and pain point extraction.
 Target: 94% sentiment classification accuracy on 3.2M words of user feedback.
 """
+import hashlib
+import json
 import logging
+import os
 import re
+import time
 import numpy as np
-from collections import Counter, defaultdict
+from collections import Counter
 from datetime import datetime
+from functools import cached_property
+from itertools import product
 from typing import List, Dict, Tuple, Optional
-import nltk
-from nltk.sentiment import SentimentIntensityAnalyzer
-from nltk.tokenize import word_tokenize, sent_tokenize
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
-# pos_tag available but not used in current implementation
-# from nltk.tag import pos_tag
 import joblib
+from joblib import Parallel, delayed
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.naive_bayes import MultinomialNB
 from sklearn.linear_model import LogisticRegression
 from sklearn.ensemble import VotingClassifier
-from sklearn.model_selection import train_test_split
+from sklearn.model_selection import train_test_split, StratifiedKFold, cross_validate
+from sklearn.pipeline import Pipeline
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
+from pain_point_matrix import incidence_matrix, PainPointAggregates
+from fast_tokenizer import get_tokenizer
+from nltk_resources import get_sentiment_analyzer, get_stopwords, get_lemmatizer
 
-# Download required NLTK data
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt', quiet=True)
+logger = logging.getLogger(__name__)
 
-try:
-    nltk.data.find('vader_lexicon')
-except LookupError:
-    nltk.download('vader_lexicon', quiet=True)
+# Default TF-IDF settings used by train_model
+DEFAULT_VECTORIZER_PARAMS = {
+    'max_features': 5000,
+    'ngram_range': (1, 2),
+    'stop_words': 'english',
+    'min_df': 2,
+    'max_df': 0.95
+}
 
-try:
-    nltk.data.find('stopwords')
-except LookupError:
-    nltk.download('stopwords', quiet=True)
+# Default NB/LR ensemble settings used by train_model
+DEFAULT_CLASSIFIER_PARAMS = {
+    'nb_alpha': 0.1,
+    'lr_C': 1.0,
+    'weights': None
+}
 
-try:
-    nltk.data.find('wordnet')
-except LookupError:
-    nltk.download('wordnet', quiet=True)
+# Classifier grid swept by hyperparameter_search when none is given
+DEFAULT_PARAM_GRID = {
+    'nb_alpha': [0.01, 0.1, 0.5, 1.0],
+    'lr_C': [0.5, 1.0, 2.0, 5.0],
+    'weights': [None, (1, 2), (2, 1)]
+}
 
-try:
-    nltk.data.find('averaged_perceptron_tagger')
-except LookupError:
-    nltk.download('averaged_perceptron_tagger', quiet=True)
+# Where vectorized feature matrices are cached between runs
+FEATURE_CACHE_DIR = os.getenv(
+    "NLP_FEATURE_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "features")
+)
 
-logger = logging.getLogger(__name__)
+
+def _build_classifier(params: Dict) -> VotingClassifier:
+    """Build the soft-voting NB/LR ensemble for a set of classifier params."""
+    params = {**DEFAULT_CLASSIFIER_PARAMS, **(params or {})}
+    nb = MultinomialNB(alpha=params['nb_alpha'])
+    lr = LogisticRegression(C=params['lr_C'], max_iter=1000, random_state=42)
+    return VotingClassifier(
+        estimators=[('nb', nb), ('lr', lr)],
+        voting='soft',
+        weights=list(params['weights']) if params['weights'] else None
+    )
+
+
+def _expand_grid(grid: Dict) -> List[Dict]:
+    """Expand a {param: [values]} grid into a list of param dicts."""
+    keys = sorted(grid)
+    return [dict(zip(keys, values)) for values in product(*(grid[k] for k in keys))]
+
+
+def _evaluate_config(texts: List[str], y, vectorizer_params: Dict, params: Dict, cv: int,
+                     memory: Optional[str] = None) -> Dict:
+    """
+    Cross-validate one vectorizer + ensemble configuration.
+
+    The TF-IDF vectorizer is part of the pipeline, so each fold fits it on
+    its training texts only and the held-out fold never shapes the vocabulary
+    or IDF weights. With memory set, the fitted vectorizer and training matrix
+    of each fold are cached there and shared by every classifier config.
+
+    Runs in a joblib worker, so it must stay a module-level function.
+    """
+    folds = StratifiedKFold(n_splits=cv, shuffle=True, random_state=42)
+    pipeline = Pipeline([
+        ('tfidf', TfidfVectorizer(**{**DEFAULT_VECTORIZER_PARAMS, **vectorizer_params})),
+        ('classifier', _build_classifier(params))
+    ], memory=memory)
+    started = time.perf_counter()
+    scores = cross_validate(pipeline, texts, y, cv=folds, scoring='accuracy')
+    return {
+        'params': params,
+        'accuracy': float(np.mean(scores['test_score'])),
+        'accuracy_std': float(np.std(scores['test_score'])),
+        'fit_time': float(np.mean(scores['fit_time'])),
+        'total_time': time.perf_counter() - started
+    }
+
+
+def _post_weight(post) -> int:
+    """How many posts a post stands for (near-duplicate cluster size, default 1)."""
+    weight = getattr(post, 'duplicate_count', 1)
+    return 1 if weight is None else weight
 
 
 class AdvancedNLPAnalyzer:
@@ -58,14 +117,14 @@ class AdvancedNLPAnalyzer:
     Combines VADER, TF-IDF + ML models, and rule-based analysis.
     """
     
-    def __init__(self):
-        """Initialize the advanced NLP analyzer."""
-        self.sia = SentimentIntensityAnalyzer()
-        self.lemmatizer = WordNetLemmatizer()
-        self.stop_words = set(stopwords.words('english'))
-        
-        # Extended stop words for better filtering
-        self.stop_words.update(['reddit', 'subreddit', 'post', 'comment', 'thread'])
+    def __init__(self, tokenizer: Optional[str] = None):
+        """
+        Initialize the advanced NLP analyzer.
+
+        Args:
+            tokenizer: Tokenizer implementation, 'regex' or 'nltk' (default: NLP_TOKENIZER env var, else 'regex')
+        """
+        self.tokenizer = get_tokenizer(tokenizer)
         
         # Pain point indicators with weights
         self.pain_indicators = {
@@ -87,6 +146,23 @@ class AdvancedNLPAnalyzer:
             'sentiment_predictions': {'positive': 0, 'negative': 0, 'neutral': 0},
             'accuracy_metrics': {}
         }
+
+    # NLTK resources are loaded from the bundled data directory on first use,
+    # so constructing an analyzer (and importing this module) never touches NLTK data.
+    @cached_property
+    def sia(self):
+        """VADER sentiment analyzer."""
+        return get_sentiment_analyzer()
+
+    @cached_property
+    def lemmatizer(self):
+        """WordNet lemmatizer."""
+        return get_lemmatizer()
+
+    @cached_property
+    def stop_words(self) -> set:
+        """English stopwords extended with Reddit boilerplate terms."""
+        return set(get_stopwords('english')) | {'reddit', 'subreddit', 'post', 'comment', 'thread'}
     
     def preprocess_text(self, text: str) -> str:
         """
@@ -132,7 +208,7 @@ class AdvancedNLPAnalyzer:
         """
         features = {
             'word_count': len(text.split()),
-            'sentence_count': len(sent_tokenize(text)),
+            'sentence_count': self.tokenizer.count_sentences(text),
             'exclamation_count': text.count('!'),
             'question_count': text.count('?'),
             'uppercase_ratio': sum(1 for c in text if c.isupper()) / max(len(text), 1),
@@ -249,12 +325,16 @@ class AdvancedNLPAnalyzer:
         }
         
         sentiment_scores = []
+        weights = []
         all_text = []
         
         for post in posts:
             # Combine title and content
             full_text = f"{getattr(post, 'title', '')} {getattr(post, 'content', '')}"
             
+            # Near-duplicate representatives stand in for their whole cluster
+            weight = _post_weight(post)
+            
             # Count words
             word_count = len(full_text.split())
             results['total_words'] += word_count
@@ -263,7 +343,8 @@ class AdvancedNLPAnalyzer:
             # Analyze sentiment
             sentiment_score, sentiment_label = self.ensemble_sentiment(full_text)
             sentiment_scores.append(sentiment_score)
-            results['sentiment_distribution'][sentiment_label] += 1
+            weights.append(weight)
+            results['sentiment_distribution'][sentiment_label] += weight
             
             # Store sentiment on post object
             post.sentiment = sentiment_score
@@ -271,10 +352,14 @@ class AdvancedNLPAnalyzer:
             
             all_text.append(full_text)
         
-        # Calculate statistics
-        if sentiment_scores:
-            results['avg_sentiment'] = np.mean(sentiment_scores)
-            results['std_sentiment'] = np.std(sentiment_scores)
+        results['posts_represented'] = sum(weights)
+        
+        # Calculate statistics (weighted by near-duplicate cluster size)
+        if sentiment_scores and sum(weights) > 0:
+            results['avg_sentiment'] = float(np.average(sentiment_scores, weights=weights))
+            results['std_sentiment'] = float(np.sqrt(np.average(
+                (np.asarray(sentiment_scores) - results['avg_sentiment']) ** 2, weights=weights
+            )))
         
         # Extract topics and pain points
         results['topics'] = self._extract_topics(all_text)
@@ -296,7 +381,7 @@ class AdvancedNLPAnalyzer:
         preprocessed = self.preprocess_text(all_text)
         
         # Tokenize and filter
-        tokens = word_tokenize(preprocessed)
+        tokens = self.tokenizer.word_tokenize(preprocessed)
         tokens = [t for t in tokens if t.isalnum() and t not in self.stop_words and len(t) > 2]
         
         # Count frequencies
@@ -314,47 +399,38 @@ class AdvancedNLPAnalyzer:
         return topics
     
     def _identify_pain_points(self, posts: List) -> List[Dict]:
-        """Identify pain points from posts."""
-        pain_points = defaultdict(lambda: {
-            'count': 0,
-            'severity': 0,
-            'posts': [],
-            'avg_sentiment': 0.0
-        })
+        """Identify pain points from posts using a sparse post x indicator matrix."""
+        severity_scores = {'critical': 1.0, 'high': 0.7, 'medium': 0.4, 'low': 0.2}
+        columns = [
+            (severity, indicator)
+            for severity, indicators in self.pain_indicators.items()
+            for indicator in indicators
+        ]
+        
+        texts = [f"{getattr(post, 'title', '')} {getattr(post, 'content', '')}".lower() for post in posts]
+        matrix = incidence_matrix(texts, [indicator for _, indicator in columns])
+        aggregates = PainPointAggregates(
+            matrix,
+            [getattr(post, 'sentiment', 0) for post in posts],
+            [_post_weight(post) for post in posts]
+        )
+        
+        frequency = aggregates.frequency
+        post_count = aggregates.post_count
+        avg_sentiment = aggregates.avg_sentiment
+        # Severity is the indicator weight times the strongest sentiment among matching posts
+        severity = np.array([severity_scores[s] for s, _ in columns]) * aggregates.max_abs_sentiment()
         
-        for post in posts:
-            text = f"{getattr(post, 'title', '')} {getattr(post, 'content', '')}".lower()
-            sentiment = getattr(post, 'sentiment', 0)
-            
-            # Check for pain indicators
-            for severity, indicators in self.pain_indicators.items():
-                for indicator in indicators:
-                    if indicator in text:
-                        key = f"{severity}:{indicator}"
-                        pain_points[key]['count'] += 1
-                        pain_points[key]['posts'].append(getattr(post, 'id', 'unknown'))
-                        pain_points[key]['avg_sentiment'] = (
-                            pain_points[key]['avg_sentiment'] * (pain_points[key]['count'] - 1) + sentiment
-                        ) / pain_points[key]['count']
-                        
-                        # Set severity score
-                        severity_scores = {'critical': 1.0, 'high': 0.7, 'medium': 0.4, 'low': 0.2}
-                        pain_points[key]['severity'] = max(
-                            pain_points[key]['severity'],
-                            severity_scores[severity] * abs(sentiment)
-                        )
-        
-        # Convert to list and sort by severity
         result = []
-        for key, data in pain_points.items():
-            severity, indicator = key.split(':', 1)
+        for col in np.flatnonzero(post_count):
+            category, indicator = columns[col]
             result.append({
-                'category': severity,
+                'category': category,
                 'indicator': indicator,
-                'frequency': data['count'],
-                'severity_score': data['severity'],
-                'avg_sentiment': data['avg_sentiment'],
-                'affected_posts': len(data['posts'])
+                'frequency': int(frequency[col]),
+                'severity_score': float(severity[col]),
+                'avg_sentiment': float(avg_sentiment[col]),
+                'affected_posts': int(post_count[col])
             })
         
         return sorted(result, key=lambda x: x['severity_score'], reverse=True)
@@ -383,12 +459,127 @@ class AdvancedNLPAnalyzer:
         
         return insights
     
-    def train_model(self, training_data: List[Tuple[str, str]]) -> Dict:
+    def vectorize_cached(self, texts: List[str], vectorizer_params: Optional[Dict] = None,
+                         cache_dir: Optional[str] = None) -> Tuple[TfidfVectorizer, object]:
+        """
+        Fit a TF-IDF vectorizer, reusing a cached feature matrix when possible.
+        
+        The cache key covers both the corpus contents and the vectorizer
+        parameters, so any change to either produces a fresh matrix.
+        
+        Args:
+            texts: Training texts
+            vectorizer_params: TfidfVectorizer keyword arguments (defaults to DEFAULT_VECTORIZER_PARAMS)
+            cache_dir: Directory for cached matrices (defaults to FEATURE_CACHE_DIR)
+            
+        Returns:
+            Tuple of (fitted vectorizer, sparse feature matrix)
+        """
+        params = {**DEFAULT_VECTORIZER_PARAMS, **(vectorizer_params or {})}
+        cache_dir = cache_dir or FEATURE_CACHE_DIR
+        
+        digest = hashlib.sha256()
+        for text in texts:
+            digest.update(hashlib.sha1(text.encode('utf-8')).digest())
+        digest.update(json.dumps(params, sort_keys=True, default=list).encode('utf-8'))
+        cache_path = os.path.join(cache_dir, f"tfidf_{digest.hexdigest()[:32]}.joblib")
+        
+        if os.path.exists(cache_path):
+            try:
+                cached = joblib.load(cache_path)
+                logger.info(f"Loaded cached feature matrix from {cache_path}")
+                return cached['vectorizer'], cached['X']
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable feature cache {cache_path}: {e}")
+        
+        vectorizer = TfidfVectorizer(**params)
+        X = vectorizer.fit_transform(texts)
+        
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            joblib.dump({'vectorizer': vectorizer, 'X': X, 'params': params}, cache_path)
+            logger.info(f"Cached feature matrix {X.shape} at {cache_path}")
+        except OSError as e:
+            logger.warning(f"Could not write feature cache {cache_path}: {e}")
+        
+        return vectorizer, X
+    
+    def hyperparameter_search(self, training_data: List[Tuple[str, str]], param_grid: Optional[Dict] = None,
+                              vectorizer_grid: Optional[List[Dict]] = None, cv: int = 5,
+                              n_jobs: int = -1, cache_dir: Optional[str] = None) -> Dict:
+        """
+        Cross-validated sweep over the NB/LR ensemble, run in parallel across cores.
+        
+        Every vectorizer x classifier configuration is cross-validated as a
+        TF-IDF + ensemble pipeline in a separate joblib worker, so the vectorizer
+        is fit inside each fold. The per-fold vectorizers and training matrices
+        are cached (under cache_dir/folds) by fold and vectorizer params, so each
+        one is fit once per sweep, not once per classifier config. The best
+        configuration is refit with train_model so the analyzer ends up trained.
+        
+        Args:
+            training_data: List of (text, label) tuples
+            param_grid: Classifier grid, e.g. {'nb_alpha': [...], 'lr_C': [...], 'weights': [...]}
+            vectorizer_grid: List of TfidfVectorizer param overrides (defaults to one default config)
+            cv: Number of stratified folds
+            n_jobs: Parallel workers (-1 uses every core)
+            cache_dir: Feature cache directory (per-fold matrices go in its folds subdirectory)
+            
+        Returns:
+            Dictionary with per-config results (sorted by accuracy), the best config and training metrics
+        """
+        if len(training_data) < 100:
+            logger.warning("Insufficient training data. Need at least 100 samples.")
+            return {'status': 'insufficient_data'}
+        
+        texts, labels = zip(*training_data)
+        texts = list(texts)
+        y = np.asarray(labels)
+        configs = _expand_grid(param_grid or DEFAULT_PARAM_GRID)
+        vectorizer_grid = vectorizer_grid or [{}]
+        
+        logger.info(f"Sweeping {len(configs)} classifier configs x {len(vectorizer_grid)} vectorizer configs "
+                    f"with {cv}-fold CV (n_jobs={n_jobs})")
+        
+        fold_cache = os.path.join(cache_dir or FEATURE_CACHE_DIR, "folds")
+        results = []
+        for vectorizer_params in vectorizer_grid:
+            config_results = Parallel(n_jobs=n_jobs)(
+                delayed(_evaluate_config)(texts, y, vectorizer_params, params, cv, fold_cache) for params in configs
+            )
+            for result in config_results:
+                result['vectorizer_params'] = vectorizer_params
+            results.extend(config_results)
+        
+        results.sort(key=lambda r: r['accuracy'], reverse=True)
+        best = results[0]
+        logger.info(f"Best config {best['params']} / {best['vectorizer_params']}: "
+                    f"{best['accuracy']:.4f} CV accuracy")
+        
+        training = self.train_model(
+            training_data,
+            vectorizer_params=best['vectorizer_params'],
+            classifier_params=best['params'],
+            cache_dir=cache_dir
+        )
+        
+        return {
+            'status': 'success',
+            'results': results,
+            'best': best,
+            'training': training
+        }
+    
+    def train_model(self, training_data: List[Tuple[str, str]], vectorizer_params: Optional[Dict] = None,
+                    classifier_params: Optional[Dict] = None, cache_dir: Optional[str] = None) -> Dict:
         """
         Train ML model on labeled data for improved accuracy.
         
         Args:
             training_data: List of (text, label) tuples where label is 'positive', 'negative', or 'neutral'
+            vectorizer_params: TfidfVectorizer overrides (optional)
+            classifier_params: NB/LR ensemble overrides (optional)
+            cache_dir: Feature cache directory (optional)
             
         Returns:
             Training metrics dictionary
@@ -401,33 +592,21 @@ class AdvancedNLPAnalyzer:
         
         texts, labels = zip(*training_data)
         
-        # Vectorize texts
-        self.vectorizer = TfidfVectorizer(
-            max_features=5000,
-            ngram_range=(1, 2),
-            stop_words='english',
-            min_df=2,
-            max_df=0.95
+        # Split first: the vectorizer only sees the training texts
+        texts_train, texts_test, y_train, y_test = train_test_split(
+            list(texts), labels, test_size=0.2, random_state=42, stratify=labels
         )
         
-        X = self.vectorizer.fit_transform(texts)
-        y = labels
-        
-        # Split data
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=0.2, random_state=42, stratify=y
-        )
+        # Vectorize texts (cached on disk by corpus and vectorizer params)
+        self.vectorizer, X_train = self.vectorize_cached(texts_train, vectorizer_params, cache_dir)
+        X_test = self.vectorizer.transform(texts_test)
         
         # Train ensemble classifier
-        nb = MultinomialNB(alpha=0.1)
-        lr = LogisticRegression(max_iter=1000, random_state=42)
-        
-        self.sentiment_classifier = VotingClassifier(
-            estimators=[('nb', nb), ('lr', lr)],
-            voting='soft'
-        )
+        self.sentiment_classifier = _build_classifier(classifier_params)
         
+        fit_started = time.perf_counter()
         self.sentiment_classifier.fit(X_train, y_train)
+        fit_time = time.perf_counter() - fit_started
         
         # Evaluate
         y_pred = self.sentiment_classifier.predict(X_test)
@@ -445,8 +624,9 @@ class AdvancedNLPAnalyzer:
         return {
             'status': 'success',
             'accuracy': accuracy,
-            'training_samples': len(X_train),
-            'test_samples': len(X_test)
+            'fit_time': fit_time,
+            'training_samples': X_train.shape[0],
+            'test_samples': X_test.shape[0]
         }
     
     def save_model(self, filepath: str):
@@ -0,0 +1,233 @@
+"""
+Columnar analytics export of posts and their analysis results.
+
+export_posts() keeps a snapshot of every post, hot and archived, as
+uncompressed Arrow IPC segments under ANALYTICS_EXPORT_DIR. Each run only
+appends the posts that are new or whose fingerprint changed since the last
+run: a newer row supersedes the older rows of the same post, and the
+segments are compacted into one once there are more than
+ANALYTICS_MAX_SEGMENTS of them. Only analytics columns are exported (no
+titles or bodies; the word count is stored instead).
+
+load_posts() memory-maps the segments, so reading them costs no copies, and
+corpus_statistics() computes the report aggregates (sentiment distribution,
+per-product counts, topic and pain point frequencies) with Arrow compute
+kernels over whole columns, without touching MongoDB.
+"""
+import os
+import re
+import logging
+from datetime import datetime
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from post_archive import POST_ARCHIVE_DIR, read_archive
+from post_fingerprints import FINGERPRINT_FIELD, post_fingerprint
+
+logger = logging.getLogger(__name__)
+
+ANALYTICS_EXPORT_DIR = os.getenv("ANALYTICS_EXPORT_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                                       "analytics"))
+ANALYTICS_MAX_SEGMENTS = int(os.getenv("ANALYTICS_MAX_SEGMENTS", 8))
+EXPORT_BATCH_SIZE = int(os.getenv("ANALYTICS_EXPORT_BATCH_SIZE", 5000))
+
+# Sentiment labels as AdvancedNLPAnalyzer.ensemble_sentiment assigns them
+SENTIMENT_LABEL_THRESHOLD = 0.1
+
+EXPORT_SCHEMA = pa.schema([
+    ("_id", pa.string()),
+    ("subreddit", pa.string()),
+    ("created_utc", pa.timestamp("ms")),
+    ("score", pa.int64()),
+    ("num_comments", pa.int64()),
+    ("word_count", pa.int64()),
+    ("sentiment", pa.float64()),
+    ("topics", pa.list_(pa.string())),
+    ("pain_points", pa.list_(pa.string())),
+    ("products", pa.list_(pa.string())),
+    ("duplicate_count", pa.int64()),
+    (FINGERPRINT_FIELD, pa.list_(pa.int64())),
+])
+
+_SEGMENT = re.compile(r"^segment-(\d{6})\.arrow$")
+_POST_FIELDS = ["_id", "subreddit", "created_utc", "score", "num_comments", "title", "content", "sentiment",
+                "topics", "pain_points", "products", "duplicate_count", FINGERPRINT_FIELD]
+
+
+def _row(document):
+    """Export row of a post document."""
+    fingerprint = document.get(FINGERPRINT_FIELD) or post_fingerprint(document)
+    created = document.get("created_utc")
+    return {
+        "_id": str(document["_id"]),
+        "subreddit": document.get("subreddit"),
+        "created_utc": created if isinstance(created, datetime) else None,
+        "score": document.get("score"),
+        "num_comments": document.get("num_comments"),
+        "word_count": len(f"{document.get('title') or ''} {document.get('content') or ''}".split()),
+        "sentiment": document.get("sentiment"),
+        "topics": [str(topic) for topic in document.get("topics") or []],
+        "pain_points": [str(label) for label in document.get("pain_points") or []],
+        "products": [str(product) for product in document.get("products") or []],
+        "duplicate_count": document.get("duplicate_count", 1),
+        FINGERPRINT_FIELD: fingerprint,
+    }
+
+
+def segment_paths(root=ANALYTICS_EXPORT_DIR):
+    """Segment files in write order."""
+    if not os.path.isdir(root):
+        return []
+    return [os.path.join(root, name) for name in sorted(os.listdir(root)) if _SEGMENT.match(name)]
+
+
+def _read_segment(path, columns=None):
+    """Memory-map one segment (zero-copy: columns point into the page cache)."""
+    with pa.memory_map(path, "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    return table.select(columns) if columns else table
+
+
+def _write_segment(table, root, sequence):
+    os.makedirs(root, exist_ok=True)
+    path = os.path.join(root, f"segment-{sequence:06d}.arrow")
+    temporary = os.path.join(root, f".segment-{sequence:06d}.arrow.tmp")
+    with pa.OSFile(temporary, "wb") as sink, pa.ipc.new_file(sink, EXPORT_SCHEMA) as writer:
+        writer.write_table(table)
+    os.replace(temporary, path)
+    return path
+
+
+def load_posts(root=ANALYTICS_EXPORT_DIR, columns=None):
+    """
+    The exported posts as one Arrow table, latest row per post.
+
+    Args:
+        root (str): Export directory
+        columns (list): Columns to return (default: all)
+
+    Returns:
+        pyarrow.Table: Exported posts (empty if nothing was exported)
+    """
+    wanted = list(columns) if columns else EXPORT_SCHEMA.names
+    paths = segment_paths(root)
+    if not paths:
+        return EXPORT_SCHEMA.empty_table().select(wanted)
+    needed = wanted if "_id" in wanted else ["_id"] + wanted
+    tables = [_read_segment(path, needed) for path in paths]
+    table = pa.concat_tables(tables)
+    if len(tables) > 1:
+        # Later segments supersede earlier rows of the same post
+        table = table.append_column("_row", pa.array(np.arange(len(table), dtype=np.int64)))
+        latest = table.group_by("_id").aggregate([("_row", "max")]).column("_row_max").to_numpy()
+        table = table.take(np.sort(latest)).drop_columns(["_row"])
+    return table.select(wanted)
+
+
+def export_posts(store, root=ANALYTICS_EXPORT_DIR, archive_root=POST_ARCHIVE_DIR, batch_size=EXPORT_BATCH_SIZE):
+    """
+    Bring the export up to date with the hot posts collection and the archive.
+
+    Args:
+        store (MongoDBStore): Connected store
+        root (str): Export directory
+        archive_root (str): Post archive directory (see post_archive)
+        batch_size (int): Posts fetched per $in query
+
+    Returns:
+        dict: exported (rows appended), total (posts in the export) and segments
+    """
+    exported = load_posts(root, ["_id", FINGERPRINT_FIELD])
+    known = dict(zip(exported.column("_id").to_pylist(), exported.column(FINGERPRINT_FIELD).to_pylist()))
+
+    # New or changed hot posts, found from the fingerprints alone (posts saved before
+    # fingerprints existed are exported once)
+    changed_ids = []
+    for document in store.db.posts.find({}, {FINGERPRINT_FIELD: 1}):
+        post_id, fingerprint = str(document["_id"]), document.get(FINGERPRINT_FIELD)
+        if post_id not in known or (fingerprint is not None and known[post_id] != fingerprint):
+            changed_ids.append(document["_id"])
+    rows = []
+    projection = dict.fromkeys(_POST_FIELDS, 1)
+    for start in range(0, len(changed_ids), batch_size):
+        for document in store.db.posts.find({"_id": {"$in": changed_ids[start:start + batch_size]}}, projection):
+            rows.append(_row(document))
+
+    # Archived posts never change: export the ones the export has not seen
+    hot_ids = {row["_id"] for row in rows}
+    unseen = [document["_id"] for document in read_archive(archive_root, columns=["_id"])
+              if document["_id"] not in known and document["_id"] not in hot_ids]
+    if unseen:
+        rows.extend(_row(document) for document in read_archive(archive_root, ids=unseen))
+
+    paths = segment_paths(root)
+    sequence = int(_SEGMENT.match(os.path.basename(paths[-1])).group(1)) + 1 if paths else 1
+    if rows:
+        _write_segment(pa.Table.from_pylist(rows, schema=EXPORT_SCHEMA), root, sequence)
+        paths = segment_paths(root)
+
+    if len(paths) > ANALYTICS_MAX_SEGMENTS:
+        compacted = load_posts(root)
+        _write_segment(compacted, root, sequence + 1)
+        for path in paths:
+            os.remove(path)
+        paths = segment_paths(root)
+
+    total = len(load_posts(root, ["_id"]))
+    logger.info(f"Exported {len(rows)} posts ({total} in the export, {len(paths)} segments)")
+    return {"exported": len(rows), "total": total, "segments": len(paths)}
+
+
+def _value_counts(list_column, top=None):
+    """Frequencies of the values of a list column, most frequent first."""
+    counts = pc.value_counts(pc.list_flatten(list_column))
+    if len(counts) == 0:
+        return []
+    values, frequencies = counts.field("values"), counts.field("counts")
+    order = pc.sort_indices(pa.table({"f": frequencies, "v": values}),
+                            sort_keys=[("f", "descending"), ("v", "ascending")])
+    if top is not None:
+        order = order[:top]
+    return list(zip(pc.take(values, order).to_pylist(), pc.take(frequencies, order).to_pylist()))
+
+
+def corpus_statistics(table=None, root=ANALYTICS_EXPORT_DIR, top=15):
+    """
+    Report aggregates over the exported corpus, computed column-wise.
+
+    Near-duplicate clusters count once, through their representative
+    (duplicate_count 0 marks the other members), as in the NLP pipeline.
+
+    Args:
+        table (pyarrow.Table): Exported posts (default: load_posts(root))
+        root (str): Export directory
+        top (int): Topics / pain points to list
+
+    Returns:
+        dict: posts, analyzed_posts, total_words, avg_sentiment, sentiment_distribution,
+        products (name -> posts), top_topics and top_pain_points ([value, frequency] pairs)
+    """
+    table = table if table is not None else load_posts(root)
+    table = table.filter(pc.not_equal(pc.fill_null(table.column("duplicate_count"), 1), 0))
+
+    sentiment = table.column("sentiment")
+    analyzed = pc.drop_null(sentiment)
+    scores = analyzed.to_numpy() if len(analyzed) else np.empty(0)
+    distribution = {
+        "positive": int(np.count_nonzero(scores > SENTIMENT_LABEL_THRESHOLD)),
+        "negative": int(np.count_nonzero(scores < -SENTIMENT_LABEL_THRESHOLD)),
+    }
+    distribution["neutral"] = len(scores) - distribution["positive"] - distribution["negative"]
+
+    return {
+        "posts": len(table),
+        "analyzed_posts": len(scores),
+        "total_words": int(pc.sum(table.column("word_count")).as_py() or 0),
+        "avg_sentiment": float(scores.mean()) if len(scores) else 0.0,
+        "sentiment_distribution": distribution,
+        "products": dict(_value_counts(table.column("products"))),
+        "top_topics": _value_counts(table.column("topics"), top),
+        "top_pain_points": _value_counts(table.column("pain_points"), top),
+    }
@@ -18,10 +18,12 @@ from security import (
 
 # Import data_store from app
 from app import data_store
-from reddit_scraper import RedditScraper
-from nlp_analyzer import NLPAnalyzer
-from advanced_nlp_analyzer import AdvancedNLPAnalyzer
-from openai_analyzer import OpenAIAnalyzer
+from mongodb_store import POST_LIST_PROJECTION, POST_SORT_FIELDS
+from pagination import InvalidCursorError, decode_cursor, encode_cursor, keyset_filter, page_items
+from spike_detection import SeriesState
+from time_series import GRANULARITIES, bucket_start, memory_trend, series_point, trend_pipeline
+from near_duplicates import NearDuplicateDetector, apply_clusters, propagate_analysis, unique_posts
+from services import ServiceContainer
 load_dotenv()
 logger = logging.getLogger(__name__)
 
@@ -30,6 +32,8 @@ logger = logging.getLogger(__name__)
 REDDIT_CLIENT_ID = os.getenv("REDDIT_CLIENT_ID")
 REDDIT_CLIENT_SECRET = os.getenv("REDDIT_CLIENT_SECRET")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+# Optional trained sentiment model (see scripts/train_model.py), loaded with the advanced analyzer
+NLP_MODEL_PATH = os.getenv("NLP_MODEL_PATH")
 # Validate JWT secret on startup
 JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
 if not JWT_SECRET_KEY:
@@ -39,22 +43,68 @@ if JWT_SECRET_KEY in ["your-secret-key-change-in-production", "dev_secret_key",
 if len(JWT_SECRET_KEY) < 32:
     raise ValueError("JWT_SECRET_KEY must be at least 32 characters long")
 JWT_ACCESS_TOKEN_EXPIRES = int(os.getenv("JWT_ACCESS_TOKEN_EXPIRES", 3600))  # 1 hour default
+# Near-duplicate clusters analyzed per chunk; each chunk is persisted while the next one is analyzed
+SCRAPE_ANALYSIS_CHUNK = int(os.getenv("SCRAPE_ANALYSIS_CHUNK", 500))
+# Longest wait for the post writer at the end of a scrape (posts still queued keep being retried)
+SCRAPE_FLUSH_TIMEOUT_SECONDS = float(os.getenv("SCRAPE_FLUSH_TIMEOUT_SECONDS", 600))
 
 
-# Initialize scraper and analyzers
-scraper = RedditScraper()
-analyzer = NLPAnalyzer()  # Legacy analyzer for backward compatibility
-advanced_analyzer = AdvancedNLPAnalyzer()  # Advanced NLP with 94% accuracy target
-openai_analyzer = OpenAIAnalyzer()
 # In api_resources.py - no need to create a new MongoDB store here since we're using the one from app.py
 mongodb_uri = os.getenv("MONGODB_URI")
 
-# Initialize Reddit and OpenAI clients if credentials are available
-if REDDIT_CLIENT_ID and REDDIT_CLIENT_SECRET:
-    scraper.initialize_client(REDDIT_CLIENT_ID, REDDIT_CLIENT_SECRET)
-    
-if OPENAI_API_KEY:
-    openai_analyzer.initialize_client(OPENAI_API_KEY)
+# Scraper, analyzers and API clients are built on first use (or pre-warmed in the
+# gunicorn master, see gunicorn.conf.py) instead of at import time
+def _build_scraper():
+    """Reddit scraper, with the PRAW client initialized if credentials are available."""
+    from reddit_scraper import RedditScraper
+    scraper = RedditScraper()
+    if REDDIT_CLIENT_ID and REDDIT_CLIENT_SECRET:
+        scraper.initialize_client(REDDIT_CLIENT_ID, REDDIT_CLIENT_SECRET)
+    return scraper
+
+
+def _build_analyzer():
+    """Legacy analyzer for backward compatibility."""
+    from nlp_analyzer import NLPAnalyzer
+    return NLPAnalyzer()
+
+
+def _build_advanced_analyzer():
+    """Advanced NLP with 94% accuracy target, with the trained model if NLP_MODEL_PATH is set."""
+    from advanced_nlp_analyzer import AdvancedNLPAnalyzer
+    advanced_analyzer = AdvancedNLPAnalyzer()
+    if NLP_MODEL_PATH:
+        if os.path.exists(NLP_MODEL_PATH):
+            advanced_analyzer.load_model(NLP_MODEL_PATH)
+        else:
+            logger.warning(f"NLP_MODEL_PATH {NLP_MODEL_PATH} not found, using the rule-based ensemble")
+    return advanced_analyzer
+
+
+def _build_openai_analyzer():
+    """OpenAI analyzer, with the client initialized if an API key is available."""
+    from openai_analyzer import OpenAIAnalyzer
+    openai_analyzer = OpenAIAnalyzer()
+    if OPENAI_API_KEY:
+        openai_analyzer.initialize_client(OPENAI_API_KEY)
+    return openai_analyzer
+
+
+services = ServiceContainer()
+services.register('scraper', _build_scraper)
+services.register('analyzer', _build_analyzer)
+services.register('advanced_analyzer', _build_advanced_analyzer)
+services.register('openai_analyzer', _build_openai_analyzer)
+services.register('deduplicator', NearDuplicateDetector)  # MinHash/LSH near-duplicate clustering
+
+
+def __getattr__(name):
+    """Expose services as module attributes (api.scraper, api.advanced_analyzer, ...)."""
+    try:
+        return services.get(name)
+    except KeyError:
+        raise AttributeError(f"module 'api' has no attribute '{name}'") from None
+
 
 
 class Register(Resource):
@@ -140,6 +190,57 @@ class Register(Resource):
             return {"status": "error", "message": "Database not available"}, 500
 
 # JWT Authentication helper
+def _post_response(post):
+    """Response dict for an in-memory post (MongoDB pages come back in this shape already)."""
+    # Handle both plain dicts and custom objects
+    if isinstance(post, dict):
+        post_dict = {
+            "id": post.get("_id") or post.get("id"),
+            "title": post.get("title"),
+            "author": post.get("author"),
+            "subreddit": post.get("subreddit"),
+            "url": post.get("url"),
+            "created_utc": post.get("created_utc"),
+            "score": post.get("score"),
+            "num_comments": post.get("num_comments"),
+            "sentiment": post.get("sentiment"),
+            "topics": post.get("topics", []),
+            "pain_points": post.get("pain_points", []),
+            "products": post.get("products", [])
+        }
+    else:
+        # Handle custom objects
+        post_dict = {
+            "id": getattr(post, "id", None),
+            "title": getattr(post, "title", None),
+            "author": getattr(post, "author", None),
+            "subreddit": getattr(post, "subreddit", None),
+            "url": getattr(post, "url", None),
+            "created_utc": getattr(post, "created_utc", None),
+            "score": getattr(post, "score", None),
+            "num_comments": getattr(post, "num_comments", None),
+        }
+        
+        # Add analysis results if available
+        if hasattr(post, 'sentiment') and post.sentiment is not None:
+            post_dict["sentiment"] = post.sentiment
+        
+        if hasattr(post, 'topics') and post.topics:
+            post_dict["topics"] = post.topics
+            
+        if hasattr(post, 'pain_points') and post.pain_points:
+            post_dict["pain_points"] = post.pain_points
+        
+        if hasattr(post, 'products') and post.products:
+            post_dict["products"] = post.products
+    
+    # Convert datetime objects to ISO format strings
+    if isinstance(post_dict["created_utc"], datetime):
+        post_dict["created_utc"] = post_dict["created_utc"].isoformat()
+        
+    return post_dict
+
+
 def token_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
@@ -357,7 +458,7 @@ class ScrapePosts(Resource):
         # Get parameters
         data = request.get_json() or {}
         print(f"Request data: {data}")
-        products = data.get('products', scraper.target_products)
+        products = data.get('products', services.scraper.target_products)
         limit = int(data.get('limit', 100))
         subreddits = data.get('subreddits')
         time_filter = data.get('time_filter', 'month')
@@ -376,7 +477,7 @@ class ScrapePosts(Resource):
             return {"status": "error", "message": "Reddit API credentials not configured on server"}, 500
             
         # Initialize Reddit client
-        if not scraper.initialize_client(REDDIT_CLIENT_ID, REDDIT_CLIENT_SECRET):
+        if not services.scraper.initialize_client(REDDIT_CLIENT_ID, REDDIT_CLIENT_SECRET):
             return {"status": "error", "message": "Failed to initialize Reddit client"}, 500
             
         # Initialize OpenAI client if needed
@@ -384,19 +485,19 @@ class ScrapePosts(Resource):
             if not OPENAI_API_KEY:
                 return {"status": "error", "message": "OpenAI API key not configured on server"}, 500
                 
-            if not openai_analyzer.initialize_client(OPENAI_API_KEY):
+            if not services.openai_analyzer.initialize_client(OPENAI_API_KEY):
                 return {"status": "error", "message": "Failed to initialize OpenAI client"}, 500
         
         # Validate time filter
-        if time_filter not in scraper.time_filters.keys():
-            return {"status": "error", "message": f"Invalid time_filter. Must be one of: {', '.join(scraper.time_filters.keys())}"}, 400
+        if time_filter not in services.scraper.time_filters.keys():
+            return {"status": "error", "message": f"Invalid time_filter. Must be one of: {', '.join(services.scraper.time_filters.keys())}"}, 400
         
         
         # Update metadata in MongoDB -- need added
         data_store.update_metadata(
             scrape_in_progress=True,
             products=products,
-            subreddits=subreddits if subreddits else scraper.default_subreddits,
+            subreddits=subreddits if subreddits else services.scraper.default_subreddits,
             time_filter=time_filter
         )
         def background_scrape():
@@ -421,7 +522,7 @@ class ScrapePosts(Resource):
                 # Use the updated scraper method with filters
                 print("Calling scraper.scrape_all_products...")
                 logger.info(f"Calling scraper.scrape_all_products...")
-                result = scraper.scrape_all_products(
+                result = services.scraper.scrape_all_products(
                     limit=limit,
                     subreddits=subreddits,
                     time_filter=time_filter,
@@ -436,6 +537,8 @@ class ScrapePosts(Resource):
                     logger.info(f"Product '{product_name}': {len(product_posts)} posts")
                     all_posts.extend(product_posts)
                 
+                # A post matching several products is returned by each of their searches
+                all_posts = unique_posts(all_posts)
                 print(f"Total posts scraped: {len(all_posts)}")
                 logger.info(f"Total posts scraped: {len(all_posts)}")
                 
@@ -443,81 +546,68 @@ class ScrapePosts(Resource):
                     print("WARNING: No posts were scraped!")
                     logger.warning("No posts were scraped!")
                 
-                # Use advanced NLP analyzer for high-accuracy sentiment analysis
-                print(f"Running advanced NLP analysis on {len(all_posts)} posts")
-                logger.info(f"Running advanced NLP analysis on {len(all_posts)} posts")
-                nlp_results = advanced_analyzer.analyze_batch(all_posts)
-                print(f"NLP Analysis complete: {nlp_results['total_words']} words, Avg sentiment: {nlp_results['avg_sentiment']:.3f}")
-                print(f"NLP pain points found: {len(nlp_results.get('pain_points', []))}")
-                logger.info(f"NLP Analysis complete: {nlp_results['total_words']} words, "
-                          f"Avg sentiment: {nlp_results['avg_sentiment']:.3f}")
-                logger.info(f"NLP pain points found: {len(nlp_results.get('pain_points', []))}")
+                # Collapse crossposts and copy-pasted complaints; only one post per cluster is analyzed
+                clusters = services.deduplicator.cluster_posts(
+                    all_posts, store=data_store if data_store.db is not None else None
+                )
+                representative_posts = apply_clusters(clusters)
+                print(f"Near-duplicate detection: {len(all_posts)} posts -> {len(representative_posts)} clusters")
+                logger.info(f"Near-duplicate detection: {len(all_posts)} posts -> {len(representative_posts)} clusters")
+                
+                # Analyze chunk by chunk; each analyzed chunk goes to the write-behind queue, which
+                # saves it and updates the pain point rollups, trends and spike detector on its own
+                # thread while the next chunk is analyzed
+                print(f"Running advanced NLP analysis on {len(representative_posts)} posts")
+                logger.info(f"Running advanced NLP analysis on {len(representative_posts)} posts")
+                total_words, sentiment_sum, weight_sum, nlp_pain_points = 0, 0.0, 0, 0
+                for start in range(0, len(clusters), SCRAPE_ANALYSIS_CHUNK):
+                    chunk = clusters[start:start + SCRAPE_ANALYSIS_CHUNK]
+                    representatives = [cluster.representative for cluster in chunk]
+                    
+                    # Advanced NLP for high-accuracy sentiment analysis
+                    nlp_results = services.advanced_analyzer.analyze_batch(representatives)
+                    total_words += nlp_results['total_words']
+                    weight = nlp_results.get('posts_represented', len(representatives))
+                    sentiment_sum += nlp_results['avg_sentiment'] * weight
+                    weight_sum += weight
+                    nlp_pain_points += len(nlp_results.get('pain_points', []))
+                    
+                    # Legacy analyzer for product detection and categorization
+                    services.analyzer.analyze_posts(representatives, products)
+                    
+                    # Duplicates share their representative's analysis
+                    propagate_analysis(chunk)
+                    
+                    chunk_posts = [member for cluster in chunk for member in cluster.members]
+                    for post in chunk_posts:
+                        post.products = services.analyzer.get_product_from_post(post, products)
+                        logger.debug(f"Post '{post.title[:50]}...' -> products: {post.products}, sentiment: {getattr(post, 'sentiment', 'N/A')}")
+                    data_store.enqueue_posts(chunk_posts)
                 
-                # Also run legacy analyzer for product detection and categorization
-                print(f"Running legacy analyzer.analyze_posts...")
-                logger.info(f"Running legacy analyzer.analyze_posts...")
-                analyzer.analyze_posts(all_posts, products)
-                print(f"Legacy analyzer complete")
-                logger.info(f"Legacy analyzer complete")
+                avg_sentiment = sentiment_sum / weight_sum if weight_sum else 0.0
+                print(f"NLP Analysis complete: {total_words} words, Avg sentiment: {avg_sentiment:.3f}")
+                print(f"NLP pain points found: {nlp_pain_points}")
+                logger.info(f"NLP Analysis complete: {total_words} words, Avg sentiment: {avg_sentiment:.3f}")
+                logger.info(f"NLP pain points found: {nlp_pain_points}")
                 
-                posts_saved = 0
-                print(f"Saving {len(all_posts)} posts to MongoDB...")
-                for post in all_posts:
-                    # Get detected products
-                    detected_products = analyzer.get_product_from_post(post, products)
-                    # Set products for this post
-                    post.products = detected_products
-                    logger.debug(f"Post '{post.title[:50]}...' -> products: {detected_products}, sentiment: {getattr(post, 'sentiment', 'N/A')}")
-                    # Save to MongoDB with advanced NLP results
-                    if data_store.save_post(post):
-                        posts_saved += 1
-                        # Add to analyzed_posts list
-                        data_store.analyzed_posts.append(post)
+                # Barrier: wait for the writer to persist everything analyzed above
+                print(f"Waiting for {len(all_posts)} posts to be saved to MongoDB...")
+                save_result = data_store.flush_posts(timeout=SCRAPE_FLUSH_TIMEOUT_SECONDS)
+                posts_saved = save_result['saved']
+                pain_points_saved = save_result['pain_points_updated']
+                for error in save_result['errors'][:10]:
+                    logger.warning(f"Failed to save {error['id']}: {error['error']}")
+                if save_result['pending']:
+                    print(f"{save_result['pending']} posts still queued after {SCRAPE_FLUSH_TIMEOUT_SECONDS:.0f}s")
+                    logger.warning(f"{save_result['pending']} posts still queued after "
+                                   f"{SCRAPE_FLUSH_TIMEOUT_SECONDS:.0f}s; the writer keeps retrying them")
                 
-                print(f"Saved {posts_saved}/{len(all_posts)} posts to MongoDB")
+                print(f"Saved {posts_saved}/{len(all_posts)} posts to MongoDB ({save_result['written']} written)")
                 print(f"Analyzed posts count: {len(data_store.analyzed_posts)}")
-                logger.info(f"Saved {posts_saved}/{len(all_posts)} posts to MongoDB")
+                logger.info(f"Saved {posts_saved}/{len(all_posts)} posts to MongoDB ({save_result['written']} written)")
                 logger.info(f"Analyzed posts count: {len(data_store.analyzed_posts)}")
                 
-                # Use advanced analyzer pain points if available, otherwise fallback
-                logger.info(f"Processing pain points...")
-                if nlp_results.get('pain_points'):
-                    logger.info(f"Using advanced analyzer pain points: {len(nlp_results['pain_points'])} found")
-                    # Convert advanced analyzer pain points to PainPoint objects
-                    pain_points = {}
-                    for pp in nlp_results['pain_points']:
-                        from models import PainPoint
-                        key = f"{pp['category']}:{pp['indicator']}"
-                        pain_point_obj = PainPoint(
-                            name=pp['indicator'],
-                            description=f"{pp['category']} issue: {pp['indicator']}",
-                            frequency=pp['frequency'],
-                            avg_sentiment=pp['avg_sentiment'],
-                            product=products[0] if products else None
-                        )
-                        pain_point_obj.severity = pp['severity_score']
-                        pain_points[key] = pain_point_obj
-                    logger.info(f"Converted {len(pain_points)} pain points to PainPoint objects")
-                else:
-                    logger.info("No advanced analyzer pain points, using legacy analyzer")
-                    # Fallback to legacy analyzer
-                    pain_points = analyzer.categorize_pain_points(all_posts, products)
-                    logger.info(f"Legacy analyzer returned {len(pain_points)} pain points")
-                
-                pain_points_saved = 0
-                for key, pain_point in pain_points.items():
-                    # Check if it's already a list or a single object
-                    if isinstance(pain_point, list):
-                        # If it's a list, iterate through it
-                        for pp in pain_point:
-                            if data_store.save_pain_point(pp):
-                                pain_points_saved += 1
-                    else:
-                        # If it's a single object, save it directly
-                        if data_store.save_pain_point(pain_point):
-                            pain_points_saved += 1
-                
-                logger.info(f"Saved {pain_points_saved} pain points to MongoDB")
+                logger.info(f"Updated {pain_points_saved} pain point aggregates")
                 logger.info(f"Total pain points in store: {len(data_store.pain_points)}")
                 
                 # Note: OpenAI analysis is now manual - users can trigger it from the product detail page
@@ -569,7 +659,7 @@ class ScrapePosts(Resource):
             "message": "Scraping job started", 
             "products": products, 
             "limit": limit,
-            "subreddits": subreddits if subreddits else scraper.default_subreddits,
+            "subreddits": subreddits if subreddits else services.scraper.default_subreddits,
             "time_filter": time_filter,
             "use_openai": use_openai
         }
@@ -672,8 +762,8 @@ class Recommendations(Resource):
                 "openai_enabled": False
             }, 500
             
-        if not openai_analyzer.api_key:
-            if not openai_analyzer.initialize_client(OPENAI_API_KEY):
+        if not services.openai_analyzer.api_key:
+            if not services.openai_analyzer.initialize_client(OPENAI_API_KEY):
                 return {
                     "status": "error",
                     "message": "Failed to initialize OpenAI client",
@@ -689,16 +779,15 @@ class Recommendations(Resource):
                 # Get analyses for requested products or all products if none specified
                 query = {}
                 if products_param:
-                    # Create case-insensitive queries for product names
-                    product_queries = []
-                    for product in products_param:
-                        if isinstance(product, str) and product.strip():
-                            product_queries.append({
-                                "_id": {"$regex": f"^{re.escape(product.strip())}$", "$options": "i"}
-                            })
+                    # Analyses are stored under the normalized (lowercased) product name,
+                    # so an exact _id match is case-insensitive and index-backed
+                    product_ids = [
+                        product.strip().lower() for product in products_param
+                        if isinstance(product, str) and product.strip()
+                    ]
                     
-                    if product_queries:
-                        query = {"$or": product_queries}
+                    if product_ids:
+                        query = {"_id": {"$in": product_ids}}
                 
                 logger.info(f"MongoDB query for analyses: {query}")
                 analyses_cursor = data_store.db.openai_analysis.find(query)
@@ -722,7 +811,7 @@ class Recommendations(Resource):
                     logger.info(f"Generating recommendations for {product_name} based on {len(pain_points)} pain points")
                     
                     # Generate recommendations for this product's pain points
-                    recommendations = openai_analyzer.generate_recommendations(pain_points, product_name)
+                    recommendations = services.openai_analyzer.generate_recommendations(pain_points, product_name)
                     
                     # Save the recommendations to MongoDB
                     save_result = data_store.save_recommendations(product_name, recommendations)
@@ -745,8 +834,9 @@ class Recommendations(Resource):
                 # Fall back to in-memory data if MongoDB query fails
         
         # Fall back to in-memory data if database is not connected or query failed
-        # Get all analyses from in-memory cache
-        if not data_store.openai_analyses:
+        # Get all analyses from in-memory cache (one snapshot for the whole request)
+        openai_analyses = data_store.openai_analyses
+        if not openai_analyses:
             return {
                 "status": "info",
                 "message": "No OpenAI analyses available. Use the scrape endpoint with use_openai=true to generate analysis.",
@@ -755,7 +845,7 @@ class Recommendations(Resource):
             }, 400
         
         # Process requested products or all products if none specified
-        product_keys = list(data_store.openai_analyses.keys())
+        product_keys = list(openai_analyses.keys())
         if products_param:
             # Filter to only requested products (case-insensitive)
             requested_products = [p.strip().lower() for p in products_param if isinstance(p, str) and p.strip()]
@@ -766,12 +856,12 @@ class Recommendations(Resource):
         
         # Generate recommendations for each product
         for product_key in product_keys:
-            analysis = data_store.openai_analyses[product_key]
+            analysis = openai_analyses[product_key]
             pain_points = analysis.get('common_pain_points', [])
             
             if pain_points:
                 # Generate recommendations for this product's pain points
-                recommendations = openai_analyzer.generate_recommendations(pain_points, product_key)
+                recommendations = services.openai_analyzer.generate_recommendations(pain_points, product_key)
                 all_recommendations.append(recommendations)
         
         return {
@@ -785,11 +875,12 @@ class GetPainPoints(Resource):
     @token_required
     def get(self, current_user):
         """
-        Get all identified pain points
+        Get all identified pain points, most severe first
         
         GET parameters:
         - product (str): Filter by product name (optional)
-        - limit (int): Limit number of results (optional)
+        - limit (int): Page size (optional, default: everything)
+        - after (str): Cursor from the previous page's next_cursor (optional)
         - min_severity (float): Minimum severity score (optional)
         
         Returns:
@@ -798,32 +889,42 @@ class GetPainPoints(Resource):
         # Get parameters
         product = request.args.get('product')
         limit = request.args.get('limit', type=int)
+        after = request.args.get('after')
         min_severity = request.args.get('min_severity', type=float, default=0)
         
-        # Get all pain points
-        pain_points = list(data_store.pain_points.values())
+        try:
+            after_key = decode_cursor(after, 'severity', -1) if after else None
+        except InvalidCursorError as e:
+            return {"status": "error", "message": str(e)}, 400
+        
+        # Apply filters lazily over the cached pain points
+        pain_points = data_store.pain_points.items()
         
-        # Apply filters
         if product:
-            pain_points = [p for p in pain_points if p.product and p.product.lower() == product.lower()]
+            product_lower = product.lower()
+            pain_points = ((k, p) for k, p in pain_points if p.product and p.product.lower() == product_lower)
         
         if min_severity > 0:
-            pain_points = [p for p in pain_points if p.severity >= min_severity]
+            pain_points = ((k, p) for k, p in pain_points if p.severity >= min_severity)
         
-        # Sort by severity
-        pain_points.sort(key=lambda x: x.severity, reverse=True)
+        # Select the page by (severity, id) without sorting every pain point
+        pain_points = list(pain_points)
+        page_size = limit if limit and limit > 0 else len(pain_points)
+        page, has_more = page_items(pain_points, lambda item: (item[1].severity, item[0]), page_size, -1, after_key)
         
-        # Apply limit
-        if limit and limit > 0:
-            pain_points = pain_points[:limit]
+        next_cursor = None
+        if has_more:
+            last_id, last = page[-1]
+            next_cursor = encode_cursor('severity', -1, last.severity, last_id)
         
         # Convert to dictionaries
-        result = [p.to_dict() for p in pain_points]
+        result = [p.to_dict() for _, p in page]
         
         return {
             "status": "success",
             "count": len(result),
             "pain_points": result,
+            "next_cursor": next_cursor,
             "last_updated": data_store.last_scrape_time.isoformat() if data_store.last_scrape_time else None
         }
 class GetPosts(Resource):
@@ -831,11 +932,15 @@ class GetPosts(Resource):
     @token_required
     def get(self, current_user):
         """
-        Get all scraped posts
+        Get scraped posts, one page at a time
+        
+        Pages are continued with keyset cursors: pass a response's next_cursor
+        as `after` (with the same filters and sort) to get the following page.
         
         GET parameters:
         - product (str): Filter by product name (optional)
-        - limit (int): Limit number of results (optional)
+        - limit (int): Page size (optional, default: everything)
+        - after (str): Cursor from the previous page's next_cursor (optional)
         - has_pain_points (bool): Only return posts with identified pain points (optional)
         - subreddit (str): Filter by subreddit name (optional)
         - min_score (int): Minimum score threshold (optional)
@@ -849,6 +954,7 @@ class GetPosts(Resource):
         # Get parameters
         product = request.args.get('product')
         limit = request.args.get('limit', type=int)
+        after = request.args.get('after')
         has_pain_points = request.args.get('has_pain_points', type=bool, default=False)
         subreddit = request.args.get('subreddit')
         min_score = request.args.get('min_score', type=int, default=0)
@@ -857,139 +963,84 @@ class GetPosts(Resource):
         sort_order = request.args.get('sort_order', default='desc')
         
         # Validate sort parameters
-        valid_sort_fields = {'date': 'created_utc', 'score': 'score', 'comments': 'num_comments', 'sentiment': 'sentiment'}
+        valid_sort_fields = POST_SORT_FIELDS
         if sort_by not in valid_sort_fields:
             return {"status": "error", "message": f"Invalid sort_by parameter. Must be one of: {', '.join(valid_sort_fields.keys())}"}, 400
         
         if sort_order not in ['asc', 'desc']:
             return {"status": "error", "message": "Invalid sort_order parameter. Must be 'asc' or 'desc'"}, 400
         
+        sort_field = valid_sort_fields[sort_by]
+        sort_direction = -1 if sort_order == 'desc' else 1
+        page_size = limit if limit and limit > 0 else None
+        
+        try:
+            after_key = decode_cursor(after, sort_by, sort_direction) if after else None
+        except InvalidCursorError as e:
+            return {"status": "error", "message": str(e)}, 400
+        
+        def memory_page():
+            """Select the page from the columnar index over the in-memory posts."""
+            # Index over the immutable snapshot of the post cache last published by the scrape thread
+            cache = data_store.analyzed_posts if data_store.analyzed_posts else data_store.raw_posts
+            page, has_more = cache.index().page(
+                sort_field=sort_field, direction=sort_direction, limit=page_size, after=after_key,
+                product=product, has_pain_points=has_pain_points, subreddit=subreddit,
+                min_score=min_score, min_comments=min_comments
+            )
+            cache.record_reads(page)
+            next_key = (getattr(page[-1], sort_field, None), getattr(page[-1], 'id', None)) if has_more else None
+            return page, next_key
+        
         # Check if MongoDB is connected
+        data_source = "memory"
         if data_store.db is None:
             logger.error("MongoDB not connected, using in-memory data")
             # Fallback to in-memory data
-            posts = data_store.analyzed_posts if data_store.analyzed_posts else data_store.raw_posts
+            posts, next_key = memory_page()
         else:
             try:
-                # Build MongoDB query
-                query = {}
-                
-                if product:
-                    query["products"] = product
-                
-                if has_pain_points:
-                    query["pain_points"] = {"$exists": True, "$ne": []}
-                    
-                if subreddit:
-                    query["subreddit"] = {"$regex": f"^{subreddit}$", "$options": "i"}
-                    
-                if min_score > 0:
-                    query["score"] = {"$gte": min_score}
-                    
-                if min_comments > 0:
-                    query["num_comments"] = {"$gte": min_comments}
+                # Build MongoDB query (every filter + sort combination has a matching index)
+                query, collation = data_store.posts_query(
+                    product=product,
+                    has_pain_points=has_pain_points,
+                    subreddit=subreddit,
+                    min_score=min_score,
+                    min_comments=min_comments
+                )
                 
-                # Set up sorting
-                mongo_sort_field = valid_sort_fields[sort_by]
-                mongo_sort_direction = -1 if sort_order == 'desc' else 1
+                # Continue after the previous page: a range scan on the {sort field, _id} index
+                if after_key is not None:
+                    page_filter = keyset_filter(sort_field, sort_direction, *after_key)
+                    query = {"$and": [query, page_filter]} if query else page_filter
                 
-                # Query MongoDB
-                cursor = data_store.db.posts.find(query).sort(mongo_sort_field, mongo_sort_direction)
+                # Query MongoDB, with _id breaking ties so the order is stable across pages;
+                # the projection leaves the content body on the server and returns response-shaped documents
+                cursor = data_store.db.posts.find(query, POST_LIST_PROJECTION, collation=collation).sort(
+                    [(sort_field, sort_direction), ("_id", sort_direction)]
+                )
                 
-                # Apply limit if specified
-                if limit and limit > 0:
-                    cursor = cursor.limit(limit)
+                # Fetch one extra document to know whether another page follows
+                if page_size:
+                    cursor = cursor.limit(page_size + 1)
                 
                 # Convert cursor to list
                 posts = list(cursor)
+                next_key = None
+                if page_size and len(posts) > page_size:
+                    posts = posts[:page_size]
+                    next_key = (posts[-1][sort_field], posts[-1]["id"])
+                data_source = "mongodb"
                 logger.info(f"Retrieved {len(posts)} posts from MongoDB")
                 
             except Exception as e:
                 logger.error(f"Error querying MongoDB: {str(e)}")
                 # Fallback to in-memory data
-                posts = data_store.analyzed_posts if data_store.analyzed_posts else data_store.raw_posts
-                
-                # Apply filters
-                if product:
-                    # Filter posts that mention the specified product
-                    posts = [p for p in posts if hasattr(p, 'products') and product in p.products]
-                
-                if has_pain_points:
-                    posts = [p for p in posts if hasattr(p, 'pain_points') and p.pain_points]
-                    
-                if subreddit:
-                    posts = [p for p in posts if hasattr(p, 'subreddit') and p.subreddit.lower() == subreddit.lower()]
-                    
-                if min_score > 0:
-                    posts = [p for p in posts if hasattr(p, 'score') and p.score >= min_score]
-                    
-                if min_comments > 0:
-                    posts = [p for p in posts if hasattr(p, 'num_comments') and p.num_comments >= min_comments]
-                
-                # Sort by specified field
-                sort_field = valid_sort_fields[sort_by]
-                
-                # For sentiment sorting, handle posts that don't have sentiment
-                if sort_field == 'sentiment':
-                    # Default sentiment to 0 if not available
-                    posts.sort(key=lambda x: getattr(x, sort_field, 0) or 0, reverse=(sort_order == 'desc'))
-                else:
-                    posts.sort(key=lambda x: getattr(x, sort_field, 0), reverse=(sort_order == 'desc'))
-                
-                # Apply limit
-                if limit and limit > 0:
-                    posts = posts[:limit]
-        
-        # Convert to dictionaries for response
-        result = []
-        for post in posts:
-            # Handle both MongoDB documents and custom objects
-            if isinstance(post, dict):
-                post_dict = {
-                    "id": post.get("_id") or post.get("id"),
-                    "title": post.get("title"),
-                    "author": post.get("author"),
-                    "subreddit": post.get("subreddit"),
-                    "url": post.get("url"),
-                    "created_utc": post.get("created_utc"),
-                    "score": post.get("score"),
-                    "num_comments": post.get("num_comments"),
-                    "sentiment": post.get("sentiment"),
-                    "topics": post.get("topics", []),
-                    "pain_points": post.get("pain_points", []),
-                    "products": post.get("products", [])
-                }
-            else:
-                # Handle custom objects
-                post_dict = {
-                    "id": getattr(post, "id", None),
-                    "title": getattr(post, "title", None),
-                    "author": getattr(post, "author", None),
-                    "subreddit": getattr(post, "subreddit", None),
-                    "url": getattr(post, "url", None),
-                    "created_utc": getattr(post, "created_utc", None),
-                    "score": getattr(post, "score", None),
-                    "num_comments": getattr(post, "num_comments", None),
-                }
-                
-                # Add analysis results if available
-                if hasattr(post, 'sentiment') and post.sentiment is not None:
-                    post_dict["sentiment"] = post.sentiment
-                
-                if hasattr(post, 'topics') and post.topics:
-                    post_dict["topics"] = post.topics
-                    
-                if hasattr(post, 'pain_points') and post.pain_points:
-                    post_dict["pain_points"] = post.pain_points
-                
-                if hasattr(post, 'products') and post.products:
-                    post_dict["products"] = post.products
-            
-            # Convert datetime objects to ISO format strings
-            if isinstance(post_dict["created_utc"], datetime):
-                post_dict["created_utc"] = post_dict["created_utc"].isoformat()
-                
-            result.append(post_dict)
+                posts, next_key = memory_page()
+        
+        # MongoDB pages are already in response shape (POST_LIST_PROJECTION);
+        # in-memory posts are converted here
+        result = posts if data_source == "mongodb" else [_post_response(post) for post in posts]
         
         # Get last_updated timestamp
         last_updated = None
@@ -1011,8 +1062,9 @@ class GetPosts(Resource):
                 "field": sort_by,
                 "order": sort_order
             },
+            "next_cursor": encode_cursor(sort_by, sort_direction, *next_key) if next_key else None,
             "last_updated": last_updated,
-            "data_source": "mongodb" if data_store.db is not None else "memory"
+            "data_source": data_source
         }
 class GetStatus(Resource):
     """API endpoint to get current scraper status"""
@@ -1025,8 +1077,8 @@ class GetStatus(Resource):
             JSON response with status information
         """
         # Get connection status from initialized clients
-        reddit_status = "connected" if scraper.reddit else "not_configured"
-        openai_status = "connected" if openai_analyzer.api_key else "not_configured"
+        reddit_status = "connected" if services.scraper.reddit else "not_configured"
+        openai_status = "connected" if services.openai_analyzer.api_key else "not_configured"
         
         # Get counts from MongoDB if available, otherwise use in-memory cache
         raw_posts_count = len(data_store.raw_posts)
@@ -1036,12 +1088,15 @@ class GetStatus(Resource):
         
         if data_store.db is not None:
             try:
-                # Get counts from MongoDB
-                raw_posts_count = data_store.db.posts.count_documents({})
-                # Analyzed posts are posts that have sentiment analysis
-                analyzed_posts_count = data_store.db.posts.count_documents({"sentiment": {"$exists": True}})
-                pain_points_count = data_store.db.pain_points.count_documents({})
-                openai_analyses_count = data_store.db.openai_analysis.count_documents({})
+                # Get counts from the maintained counters document (one read)
+                counters = data_store.get_status_counters()
+                if counters is None:
+                    raise RuntimeError("Status counters unavailable")
+                raw_posts_count = counters["posts"]
+                # Analyzed posts are posts that have a sentiment score
+                analyzed_posts_count = counters["analyzed_posts"]
+                pain_points_count = counters["pain_points"]
+                openai_analyses_count = counters["openai_analyses"]
                 
                 logger.debug(f"Status counts from MongoDB - Posts: {raw_posts_count}, Analyzed: {analyzed_posts_count}, Pain Points: {pain_points_count}, OpenAI: {openai_analyses_count}")
             except Exception as e:
@@ -1059,6 +1114,10 @@ class GetStatus(Resource):
             "subreddits_scraped": list(data_store.subreddits_scraped),
             "has_openai_analyses": openai_analyses_count > 0,
             "openai_analyses_count": openai_analyses_count,
+            "post_cache": {
+                "raw_posts": data_store.raw_posts.stats(),
+                "analyzed_posts": data_store.analyzed_posts.stats()
+            },
             "apis": {
                 "reddit": reddit_status,
                 "openai": openai_status
@@ -1165,66 +1224,36 @@ class GetAllProducts(Resource):
         Get list of all products that have posts in the database
         
         Returns:
-            JSON response with list of product names and their analysis status
+            JSON response with product names, their analysis status, post counts
+            and the date of their newest post
         """
         try:
             if data_store.db is None:
                 # Fallback to in-memory data
-                products = []
+                catalog = {}
                 for post in data_store.raw_posts:
-                    if hasattr(post, 'products') and post.products:
-                        products.extend(post.products)
-                products = list(set(products))
-            else:
-                # Get all unique products from posts collection
-                products_with_posts = data_store.db.posts.distinct("products")
-                # Flatten the list (products is an array field)
-                products = []
-                seen_products = set()
-                for product_list in products_with_posts:
-                    if isinstance(product_list, list):
-                        for product in product_list:
-                            if product and product.strip().lower() not in seen_products:
-                                products.append(product.strip())
-                                seen_products.add(product.strip().lower())
-                    elif product_list and product_list.strip().lower() not in seen_products:
-                        products.append(product_list.strip())
-                        seen_products.add(product_list.strip().lower())
-            
-            # Get analysis status for each product
-            products_with_status = []
-            for product in products:
-                has_analysis = False
-                has_recommendations = False
-                
-                if data_store.db is not None:
-                    # Check if analysis exists
-                    analysis_doc = data_store.db.openai_analysis.find_one({
-                        "$or": [
-                            {"_id": product.strip().lower()},
-                            {"product": product.strip().lower()}
-                        ]
-                    })
-                    has_analysis = analysis_doc is not None
-                    
-                    # Check if recommendations exist
-                    rec_doc = data_store.db.recommendations.find_one({
-                        "$or": [
-                            {"_id": product.strip().lower()},
-                            {"product": product.strip().lower()}
-                        ]
-                    })
-                    has_recommendations = rec_doc is not None
-                else:
-                    # Fallback to in-memory
-                    has_analysis = product in data_store.openai_analyses
-                    has_recommendations = product in data_store.recommendations if hasattr(data_store, 'recommendations') else False
+                    for product in getattr(post, 'products', None) or []:
+                        entry = catalog.setdefault(product, {"post_count": 0, "last_seen": None})
+                        entry["post_count"] += 1
+                        created = getattr(post, 'created_utc', None)
+                        if created is not None and (entry["last_seen"] is None or created > entry["last_seen"]):
+                            entry["last_seen"] = created
                 
-                products_with_status.append({
-                    "name": product,
-                    "has_analysis": has_analysis,
-                    "has_recommendations": has_recommendations
-                })
+                recommendations = getattr(data_store, 'recommendations', {})
+                openai_analyses = data_store.openai_analyses
+                products_with_status = [
+                    {
+                        "name": product,
+                        "has_analysis": product in openai_analyses,
+                        "has_recommendations": product in recommendations,
+                        "post_count": entry["post_count"],
+                        "last_seen": entry["last_seen"],
+                    }
+                    for product, entry in sorted(catalog.items())
+                ]
+            else:
+                # The catalog the post writes maintain (one indexed find), not a scan of the posts
+                products_with_status = data_store.get_product_catalog()
             
             return {
                 "status": "success",
@@ -1238,6 +1267,115 @@ class GetAllProducts(Resource):
                 "products": []
             }, 500
 
+class GetTrends(Resource):
+    """API endpoint to get pain point and sentiment trends over time"""
+    @token_required
+    def get(self, current_user):
+        """
+        Get a daily or hourly series for a product, read from pre-aggregated buckets
+        
+        GET parameters:
+        - product (str): Product name (required)
+        - pain_point (str): Pain point as 'category:indicator' (optional; default: sentiment of all posts)
+        - subreddit (str): Restrict to one subreddit (optional; default: all subreddits)
+        - granularity (str): 'day' or 'hour' (optional, default: 'day')
+        - start (str): ISO date/time of the first bucket (optional; default: 30 days / 48 hours before end)
+        - end (str): ISO date/time of the last bucket (optional; default: now)
+        
+        Returns:
+            JSON response with one point per bucket (count, avg_sentiment, severity)
+        """
+        product = request.args.get('product')
+        pain_point = request.args.get('pain_point') or None
+        subreddit = request.args.get('subreddit')
+        granularity = request.args.get('granularity', default='day')
+        
+        if not product:
+            return {"status": "error", "message": "Product name is required"}, 400
+        
+        if granularity not in GRANULARITIES:
+            return {"status": "error", "message": f"Invalid granularity parameter. Must be one of: {', '.join(GRANULARITIES)}"}, 400
+        
+        try:
+            start = datetime.fromisoformat(request.args['start']) if request.args.get('start') else None
+            end = datetime.fromisoformat(request.args['end']) if request.args.get('end') else None
+        except ValueError:
+            return {"status": "error", "message": "Invalid start or end parameter. Use ISO format, e.g. 2024-01-31"}, 400
+        
+        series = dict(product=product, pain_point=pain_point, subreddit=subreddit,
+                      granularity=granularity, start=start, end=end)
+        try:
+            if data_store.db is None:
+                # Fallback to in-memory data
+                points = memory_trend(data_store.analyzed_posts, **series)
+            else:
+                points = [
+                    series_point(row["_id"], row["count"], row["sentiment_sum"])
+                    for row in data_store.db.pain_point_series.aggregate(trend_pipeline(**series))
+                ]
+        except Exception as e:
+            logger.error(f"Error retrieving trends: {str(e)}")
+            return {"status": "error", "message": f"Database error: {str(e)}"}, 500
+        
+        return {
+            "status": "success",
+            "product": product,
+            "pain_point": pain_point,
+            "subreddit": subreddit,
+            "granularity": granularity,
+            "points": points
+        }
+
+class GetSpikes(Resource):
+    """API endpoint to get the pain points that are currently spiking"""
+    @token_required
+    def get(self, current_user):
+        """
+        Get the product x pain point series the streaming spike detector flags as anomalous
+        
+        GET parameters:
+        - product (str): Restrict to one product (optional)
+        - include_stale (bool): Also list spikes whose bucket has closed (optional, default: false)
+        
+        Returns:
+            JSON response with the spiking series, highest z-score first
+        """
+        product = request.args.get('product')
+        include_stale = request.args.get('include_stale', default='false').lower() == 'true'
+        detector = data_store.spike_detector
+        
+        try:
+            if data_store.db is None:
+                # Fallback to in-memory detector state
+                states = [state for state in data_store.spike_states.values()
+                          if state.anomalous and (include_stale or detector.is_current(state))]
+            else:
+                query = {"anomalous": True}
+                if not include_stale:
+                    query["current_bucket"] = {"$gte": bucket_start(datetime.utcnow(), detector.granularity) - detector.step}
+                states = [SeriesState.from_document(document)
+                          for document in data_store.db.pain_point_spikes.find(query)]
+        except Exception as e:
+            logger.error(f"Error retrieving spikes: {str(e)}")
+            return {"status": "error", "message": f"Database error: {str(e)}"}, 500
+        
+        if product:
+            states = [state for state in states if state.product == product]
+        states.sort(key=lambda state: state.z_score, reverse=True)
+        
+        return {
+            "status": "success",
+            "granularity": detector.granularity,
+            "spikes": [{
+                "product": state.product,
+                "pain_point": state.pain_point,
+                "bucket": state.current_bucket.isoformat(),
+                "count": state.current_count,
+                "expected": round(state.mean, 3),
+                "z_score": round(state.z_score, 3),
+            } for state in states]
+        }
+
 class RunAnalysis(Resource):
     """API endpoint to manually run OpenAI analysis for a product"""
     @token_required
@@ -1264,6 +1402,7 @@ class RunAnalysis(Resource):
             # Fetch posts for this product
             if data_store.db is None:
                 product_posts = [p for p in data_store.raw_posts if hasattr(p, 'products') and product in p.products]
+                data_store.raw_posts.record_reads(product_posts)
             else:
                 # Query MongoDB for posts with this product
                 cursor = data_store.db.posts.find({"products": product})
@@ -1291,7 +1430,7 @@ class RunAnalysis(Resource):
             logger.info(f"Found {len(product_posts)} posts for '{product}'")
             
             # Run OpenAI analysis
-            analysis = openai_analyzer.analyze_common_pain_points(product_posts, product)
+            analysis = services.openai_analyzer.analyze_common_pain_points(product_posts, product)
             
             if 'error' in analysis:
                 print(f"[RUN_ANALYSIS] Analysis failed: {analysis.get('error')}")
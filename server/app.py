@@ -1,21 +1,15 @@
 import os
 import logging
+from datetime import datetime
 from flask import Flask, request
 from flask_cors import CORS
 from flask_restful import Api
-import nltk
 from dotenv import load_dotenv
 from security import secure_headers, validate_jwt_secret
 
 # Load environment variables
 load_dotenv()
 
-# Safe download if not already available
-try:
-    nltk.data.find("tokenizers/punkt")
-except LookupError:
-    nltk.download("punkt")
-
 # Set up logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
@@ -36,16 +30,28 @@ CORS(app, resources={r"/api/*": {
     "allow_headers": ["Content-Type", "Authorization"]
 }})
 
+
+def _json_default(value):
+    """Serialize values MongoDB documents carry that json cannot (dates as ISO strings)."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+# Documents read with a projection go straight into responses
+app.config["RESTFUL_JSON"] = {"default": _json_default}
+
 # Initialize Flask-RESTful API
 api = Api(app)
 
 # Import and initialize MongoDB store
 from mongodb_store import MongoDBStore
 
-# Create a MongoDB store instance
-data_store = MongoDBStore(os.getenv("MONGODB_URI"))
+# Create a MongoDB store instance; it connects (and loads pain points) on first use
+data_store = MongoDBStore(os.getenv("MONGODB_URI"), lazy=True)
 data_store.scrape_in_progress = False
-data_store.update_metadata(scrape_in_progress=False)
+# A flag left behind by the previous deployment is cleared once at startup
+# (gunicorn.conf.py on_starting, main.py), not here: this runs in every worker
 
 # Import and register routes
 from routes import initialize_routes
@@ -0,0 +1 @@
+# Performance benchmarks for the server (run from the server directory, e.g. `python -m benchmarks.nlp_throughput`)
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Worker cold-start and startup benchmark.
+
+Boots the app in fresh interpreters (what a gunicorn worker does when it
+imports main:app) and reports the median time to import the app, the time
+to the first sentiment analysis (which loads the NLTK resources lazily), the
+modules each phase pulled in and, when the app has a service container, the
+time each service takes to build. With --gunicorn it also starts gunicorn
+with and without preloading and reports the time until the first request is
+served.
+
+Usage (from the server directory):
+    python -m benchmarks.cold_start --runs 5 --output cold_start.json
+    python -m benchmarks.cold_start --gunicorn --workers 4
+"""
+import os
+import sys
+import json
+import argparse
+import logging
+import socket
+import statistics
+import subprocess
+import time
+import urllib.error
+import urllib.request
+
+logger = logging.getLogger(__name__)
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Executed in a fresh interpreter; prints one JSON line with its timings
+_BOOT_SCRIPT = """
+import json, sys, time, logging
+logging.disable(logging.CRITICAL)
+started = time.perf_counter()
+import main
+import api
+booted = time.perf_counter()
+modules_after_import = len(sys.modules)
+nltk_loaded_at_import = 'nltk' in sys.modules
+from advanced_nlp_analyzer import AdvancedNLPAnalyzer
+AdvancedNLPAnalyzer().ensemble_sentiment("The editor keeps crashing and it's really frustrating.")
+first_analysis = time.perf_counter()
+services = getattr(api, "services", None)
+print(json.dumps({
+    "import_seconds": booted - started,
+    "first_analysis_seconds": first_analysis - booted,
+    "modules_after_import": modules_after_import,
+    "nltk_loaded_at_import": nltk_loaded_at_import,
+    "modules_after_first_analysis": len(sys.modules),
+    "service_init_seconds": services.warm() if services else None,
+}))
+"""
+
+
+def run_once(env=None):
+    """
+    Boot the app once in a fresh interpreter.
+
+    Args:
+        env (dict): Extra environment variables for the child
+
+    Returns:
+        dict: Timings reported by the child process
+    """
+    child_env = dict(os.environ, **(env or {}))
+    child_env.setdefault("JWT_SECRET_KEY", "cold-start-benchmark-secret-key-0123456789")
+    result = subprocess.run(
+        [sys.executable, "-c", _BOOT_SCRIPT],
+        cwd=SERVER_DIR, env=child_env, capture_output=True, text=True, timeout=300
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Boot failed: {result.stderr.strip().splitlines()[-1:]}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def run_benchmark(runs=5, env=None):
+    """
+    Boot the app several times and summarise the timings.
+
+    Args:
+        runs (int): Number of fresh interpreters to start
+        env (dict): Extra environment variables for the children
+
+    Returns:
+        dict: Per-run results and medians
+    """
+    samples = [run_once(env) for _ in range(runs)]
+    summary = {
+        key: round(statistics.median(sample[key] for sample in samples), 4)
+        for key in ("import_seconds", "first_analysis_seconds")
+    }
+    summary["cold_start_seconds"] = round(summary["import_seconds"] + summary["first_analysis_seconds"], 4)
+    return {"runs": samples, "median": summary}
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_response(port, timeout):
+    """Poll a local server until it answers any HTTP request."""
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1).close()
+            return
+        except urllib.error.HTTPError:
+            return  # any HTTP response means a worker is serving
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"Server on port {port} did not respond within {timeout}s")
+
+
+def measure_gunicorn(preload=True, workers=2, timeout=120, env=None):
+    """
+    Start gunicorn and time how long it takes to serve the first request.
+
+    Args:
+        preload (bool): Preload the app and pre-warm services in the master
+        workers (int): Number of worker processes
+        timeout (int): Seconds to wait for the first response
+        env (dict): Extra environment variables for gunicorn
+
+    Returns:
+        dict: Seconds until the first successful response
+    """
+    port = _free_port()
+    child_env = dict(os.environ, GUNICORN_PRELOAD="true" if preload else "false", **(env or {}))
+    child_env.setdefault("JWT_SECRET_KEY", "cold-start-benchmark-secret-key-0123456789")
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "main:app", "--bind", f"127.0.0.1:{port}", "--workers", str(workers)],
+        cwd=SERVER_DIR, env=child_env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        _wait_for_response(port, timeout)
+        return {"preload": preload, "workers": workers,
+                "first_response_seconds": round(time.perf_counter() - started, 4)}
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Number of fresh interpreters to boot")
+    parser.add_argument("--output", default="cold_start.json", help="Where to write results")
+    parser.add_argument("--gunicorn", action="store_true", help="Also time gunicorn startup with and without preload")
+    parser.add_argument("--workers", type=int, default=2, help="Gunicorn workers for --gunicorn")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    results = run_benchmark(runs=args.runs)
+    median = results["median"]
+    logger.info(f"Import: {median['import_seconds']:.3f}s, first analysis: {median['first_analysis_seconds']:.3f}s "
+                f"(median of {args.runs})")
+
+    if args.gunicorn:
+        results["gunicorn"] = [measure_gunicorn(preload, args.workers) for preload in (False, True)]
+        for run in results["gunicorn"]:
+            logger.info(f"gunicorn preload={run['preload']}: first response after {run['first_response_seconds']:.3f}s")
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    logger.info(f"Wrote results to {args.output}")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
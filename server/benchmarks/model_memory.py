@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Memory of the in-memory models: __dict__ classes vs the slotted models.
+
+Builds the same synthetic posts and pain points twice and measures the
+bytes allocated for them with tracemalloc:
+
+- dict: the previous RedditPost / PainPoint (per-instance __dict__, the
+  analysis fields added at runtime, subreddit and author as the separate
+  string objects the Reddit client returns, related_posts a list of id strings)
+- slots: models.RedditPost / PainPoint (declared __slots__, interned
+  subreddit and author, related_posts as RelatedPosts)
+
+Post titles and bodies are left empty: they take the same space either way.
+
+Usage (from the server directory):
+    python -m benchmarks.model_memory --posts 200000 --output model_memory.json
+"""
+import os
+import sys
+import json
+import random
+import argparse
+import logging
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_corpus import PRODUCTS, SUBREDDITS
+from models import PainPoint, RedditPost
+
+logger = logging.getLogger(__name__)
+
+
+class _DictRedditPost:
+    """RedditPost before __slots__."""
+    def __init__(self, id, title, content, author, subreddit, url, created_utc, score, num_comments):
+        self.id = id
+        self.title = title
+        self.content = content
+        self.author = author
+        self.subreddit = subreddit
+        self.url = url
+        self.created_utc = created_utc
+        self.score = score
+        self.num_comments = num_comments
+        self.sentiment = None
+        self.topics = []
+        self.pain_points = []
+        self.severity = None
+        self.cluster_id = None
+        self.duplicate_count = 1
+
+
+class _DictPainPoint:
+    """PainPoint before __slots__."""
+    def __init__(self, name, description, frequency=0, avg_sentiment=0, related_posts=None, product=None):
+        self.name = name
+        self.description = description
+        self.frequency = frequency
+        self.avg_sentiment = avg_sentiment
+        self.related_posts = related_posts or []
+        self.product = product
+        self.severity = 0
+
+
+def _post_id(index):
+    """A Reddit-style base36 id."""
+    digits = "0123456789abcdefghijklmnopqrstuvwxyz"
+    value, chars = 36 ** 5 + index * 7919, []
+    while value:
+        value, digit = divmod(value, 36)
+        chars.append(digits[digit])
+    return "".join(reversed(chars))
+
+
+def build_posts(post_class, count, seed=42):
+    """Posts of one variant, built from fresh strings as the scraper would."""
+    rng = random.Random(seed)
+    authors = [f"user{index}" for index in range(count // 20 + 1)]
+    start = datetime(2024, 1, 1)
+    posts = []
+    for index in range(count):
+        post = post_class(
+            id=_post_id(index), title="", content="",
+            # Fresh string objects per post, as JSON decoding produces them
+            author="".join(["", rng.choice(authors)]), subreddit="".join(["", rng.choice(SUBREDDITS)]),
+            url="", created_utc=start + timedelta(seconds=index), score=rng.randrange(500),
+            num_comments=rng.randrange(100)
+        )
+        post.sentiment = round(rng.uniform(-1, 1), 3)
+        post.sentiment_label = ("negative", "neutral", "positive")[rng.randrange(3)]
+        post.products = [rng.choice(PRODUCTS)]
+        posts.append(post)
+    return posts
+
+
+def build_pain_points(pain_point_class, count, related_count, post_count, seed=42):
+    """Pain points of one variant, with related post ids as loaded back from MongoDB."""
+    rng = random.Random(seed)
+    return [
+        pain_point_class(name=f"Pain point {index}", description="", frequency=related_count, avg_sentiment=-0.4,
+                         related_posts=[_post_id(rng.randrange(post_count)) for _ in range(related_count)],
+                         product=rng.choice(PRODUCTS))
+        for index in range(count)
+    ]
+
+
+def _traced_bytes(build):
+    """Bytes still allocated by build() once it returns (what its result retains)."""
+    tracemalloc.start()
+    try:
+        result = build()
+        retained = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del result
+    return retained
+
+
+def run_benchmark(post_count=200_000, pain_point_count=2_000, related_count=100):
+    """
+    Measure both variants.
+
+    Args:
+        post_count (int): Posts in memory
+        pain_point_count (int): Pain points in memory
+        related_count (int): Related post ids per pain point
+
+    Returns:
+        dict: Bytes per post, per pain point and in total for each variant, and the reduction
+    """
+    variants = {}
+    for name, (post_class, pain_point_class) in (("dict", (_DictRedditPost, _DictPainPoint)),
+                                                 ("slots", (RedditPost, PainPoint))):
+        post_bytes = _traced_bytes(lambda: build_posts(post_class, post_count))
+        pain_point_bytes = _traced_bytes(
+            lambda: build_pain_points(pain_point_class, pain_point_count, related_count, post_count))
+        variants[name] = {
+            "bytes_per_post": round(post_bytes / post_count),
+            "bytes_per_pain_point": round(pain_point_bytes / pain_point_count),
+            "total_mb": round((post_bytes + pain_point_bytes) / 1024 / 1024, 1),
+        }
+    return {
+        "posts": post_count,
+        "pain_points": pain_point_count,
+        "related_posts_per_pain_point": related_count,
+        "variants": variants,
+        "reduction": round(variants["dict"]["total_mb"] / variants["slots"]["total_mb"], 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=200_000, help="Posts in memory")
+    parser.add_argument("--pain-points", type=int, default=2_000, help="Pain points in memory")
+    parser.add_argument("--related", type=int, default=100, help="Related post ids per pain point")
+    parser.add_argument("--output", default="model_memory.json", help="Where to write results")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    results = run_benchmark(post_count=args.posts, pain_point_count=args.pain_points, related_count=args.related)
+    for name, variant in results["variants"].items():
+        logger.info(f"{name}: {variant['bytes_per_post']} B/post, {variant['bytes_per_pain_point']} B/pain point, "
+                    f"{variant['total_mb']:.1f} MB total")
+    logger.info(f"Reduction: {results['reduction']}x")
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    logger.info(f"Wrote results to {args.output}")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
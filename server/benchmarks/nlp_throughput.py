@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+NLP throughput benchmark on a synthetic Reddit-style corpus.
+
+Times each pipeline stage (preprocess_text, ensemble_sentiment,
+_extract_topics, _identify_pain_points and NLPAnalyzer.categorize_pain_points)
+and reports words/sec, posts/sec and peak RSS as JSON. Pass --baseline to
+compare against a stored result; the script exits non-zero on regression.
+
+Usage (from the server directory):
+    python -m benchmarks.nlp_throughput --words 3200000 --output nlp_benchmark.json
+    python -m benchmarks.nlp_throughput --baseline benchmarks/baseline.json
+"""
+import os
+import sys
+import gc
+import json
+import time
+import argparse
+import logging
+import platform
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# app must be imported before nlp_analyzer (nlp_analyzer -> app -> api -> nlp_analyzer)
+import app  # noqa: F401
+from advanced_nlp_analyzer import AdvancedNLPAnalyzer
+from nlp_analyzer import NLPAnalyzer
+from benchmarks.synthetic_corpus import generate_posts, PRODUCTS
+
+logger = logging.getLogger(__name__)
+
+# Stages compared against the baseline, in pipeline order
+STAGES = [
+    "preprocess_text",
+    "ensemble_sentiment",
+    "extract_topics",
+    "identify_pain_points",
+    "categorize_pain_points",
+]
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None if unavailable)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _timed(func):
+    """Run func once with GC disabled and return (result, seconds)."""
+    gc.collect()
+    gc.disable()
+    try:
+        started = time.perf_counter()
+        result = func()
+        return result, time.perf_counter() - started
+    finally:
+        gc.enable()
+
+
+def run_benchmark(total_words=3_200_000, seed=42):
+    """
+    Run every stage over a synthetic corpus.
+
+    Args:
+        total_words (int): Corpus size in words
+        seed (int): Corpus seed
+
+    Returns:
+        dict: Machine-readable benchmark results
+    """
+    posts, generation_time = _timed(lambda: generate_posts(total_words=total_words, seed=seed))
+    texts = [f"{post.title} {post.content}" for post in posts]
+    word_count = sum(len(text.split()) for text in texts)
+    products = [p.lower() for p in PRODUCTS]
+    logger.info(f"Generated {len(posts):,} posts ({word_count:,} words) in {generation_time:.2f}s")
+
+    advanced = AdvancedNLPAnalyzer()
+    legacy = NLPAnalyzer()
+
+    def sentiment():
+        for post, text in zip(posts, texts):
+            post.sentiment, post.sentiment_label = advanced.ensemble_sentiment(text)
+
+    stage_funcs = {
+        "preprocess_text": lambda: [advanced.preprocess_text(text) for text in texts],
+        "ensemble_sentiment": sentiment,
+        "extract_topics": lambda: advanced._extract_topics(texts),
+        "identify_pain_points": lambda: advanced._identify_pain_points(posts),
+        "categorize_pain_points": lambda: legacy.categorize_pain_points(posts, products),
+    }
+
+    stages = {}
+    for name in STAGES:
+        _, seconds = _timed(stage_funcs[name])
+        stages[name] = {
+            "seconds": round(seconds, 4),
+            "words_per_sec": round(word_count / seconds, 1) if seconds else None,
+            "posts_per_sec": round(len(posts) / seconds, 1) if seconds else None,
+            "rss_mb_after": peak_rss_mb(),
+        }
+        logger.info(f"{name:24} {seconds:8.2f}s  {stages[name]['words_per_sec'] or 0:>12,.0f} words/s")
+
+    total_seconds = sum(stage["seconds"] for stage in stages.values())
+    return {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": seed,
+            "posts": len(posts),
+            "words": word_count,
+            "corpus_generation_seconds": round(generation_time, 4),
+        },
+        "stages": stages,
+        "total": {
+            "seconds": round(total_seconds, 4),
+            "words_per_sec": round(word_count / total_seconds, 1) if total_seconds else None,
+            "posts_per_sec": round(len(posts) / total_seconds, 1) if total_seconds else None,
+        },
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def compare_to_baseline(results, baseline, tolerance=0.15):
+    """
+    Compare per-stage throughput against a baseline result.
+
+    Args:
+        results (dict): Output of run_benchmark
+        baseline (dict): A previously stored run_benchmark result
+        tolerance (float): Allowed fractional slowdown before a stage counts as a regression
+
+    Returns:
+        dict: Per-stage ratios (current / baseline words/sec) and the list of regressed stages
+    """
+    comparison = {"tolerance": tolerance, "stages": {}, "regressions": []}
+    for name in STAGES + ["total"]:
+        current = results["total"] if name == "total" else results["stages"].get(name)
+        previous = baseline.get("total") if name == "total" else baseline.get("stages", {}).get(name)
+        if not current or not previous or not previous.get("words_per_sec") or not current.get("words_per_sec"):
+            continue
+        ratio = current["words_per_sec"] / previous["words_per_sec"]
+        comparison["stages"][name] = round(ratio, 3)
+        if ratio < 1 - tolerance:
+            comparison["regressions"].append(name)
+    return comparison
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--words", type=int, default=3_200_000, help="Synthetic corpus size in words")
+    parser.add_argument("--seed", type=int, default=42, help="Corpus seed")
+    parser.add_argument("--output", default="nlp_benchmark.json", help="Where to write results")
+    parser.add_argument("--baseline", help="Baseline results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed slowdown per stage (fraction)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    # Keep per-post analyzer logging out of the timings
+    logging.getLogger("nlp_analyzer").setLevel(logging.WARNING)
+    logging.getLogger("advanced_nlp_analyzer").setLevel(logging.WARNING)
+
+    results = run_benchmark(total_words=args.words, seed=args.seed)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("meta", {}).get("words") != results["meta"]["words"]:
+            logger.warning("Baseline was recorded on a different corpus size; ratios are not comparable")
+        results["comparison"] = compare_to_baseline(results, baseline, args.tolerance)
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    logger.info(f"Wrote results to {args.output}")
+
+    regressions = results.get("comparison", {}).get("regressions", [])
+    if regressions:
+        logger.error(f"Throughput regressions: {', '.join(regressions)}")
+        return False
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
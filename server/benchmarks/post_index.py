@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+GetPosts in-memory fallback: list comprehensions vs the columnar PostIndex.
+
+Fills a post cache with synthetic posts (short titles, no bodies: the
+fallback never reads them) and times the same GetPosts queries both ways:
+
+- lists: the chained list-comprehension filters and page_items heap the
+  fallback used before
+- index: PostIndex.page over the cache snapshot (boolean masks, argpartition,
+  sort of the page only); the one-off index build after a publish is
+  reported separately
+
+Usage (from the server directory):
+    python -m benchmarks.post_index --posts 1000000 --output post_index.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import logging
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_corpus import PRODUCTS, SUBREDDITS
+from models import RedditPost
+from pagination import page_items
+from post_index import PostIndex
+
+logger = logging.getLogger(__name__)
+
+QUERIES = {
+    "newest": dict(sort_field="created_utc"),
+    "product_by_score": dict(sort_field="score", product=PRODUCTS[0]),
+    "subreddit_pain_points": dict(sort_field="num_comments", subreddit=SUBREDDITS[0].upper(), has_pain_points=True),
+    "thresholds_by_sentiment": dict(sort_field="sentiment", direction=1, min_score=50, min_comments=10),
+}
+
+
+def make_posts(count, seed=42):
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    posts = []
+    for index in range(count):
+        post = RedditPost(
+            id=f"t3_{index:08x}", title="", content="", author="user", subreddit=rng.choice(SUBREDDITS),
+            url="", created_utc=start + timedelta(seconds=rng.randrange(365 * 86400)),
+            score=rng.randrange(500), num_comments=rng.randrange(100)
+        )
+        post.sentiment = round(rng.uniform(-1, 1), 3) if rng.random() < 0.9 else None
+        post.products = rng.sample(PRODUCTS, rng.randint(0, 2))
+        post.pain_points = ["performance:slow"] if rng.random() < 0.3 else []
+        posts.append(post)
+    return tuple(posts)
+
+
+def list_page(posts, sort_field, direction=-1, limit=50, product=None, has_pain_points=False, subreddit=None,
+              min_score=0, min_comments=0):
+    """The fallback as GetPosts implemented it with list comprehensions."""
+    if product:
+        posts = [p for p in posts if hasattr(p, 'products') and product in p.products]
+    if has_pain_points:
+        posts = [p for p in posts if hasattr(p, 'pain_points') and p.pain_points]
+    if subreddit:
+        posts = [p for p in posts if hasattr(p, 'subreddit') and p.subreddit.lower() == subreddit.lower()]
+    if min_score > 0:
+        posts = [p for p in posts if hasattr(p, 'score') and p.score >= min_score]
+    if min_comments > 0:
+        posts = [p for p in posts if hasattr(p, 'num_comments') and p.num_comments >= min_comments]
+    return page_items(posts, lambda p: (getattr(p, sort_field, None), getattr(p, 'id', None)),
+                      limit, direction)
+
+
+def _time_ms(function, repeats):
+    started = time.perf_counter()
+    for _ in range(repeats):
+        result = function()
+    return round((time.perf_counter() - started) / repeats * 1000, 3), result
+
+
+def run_benchmark(post_count=1_000_000, limit=50, repeats=3, seed=42):
+    """
+    Time the fallback queries with and without the index.
+
+    Args:
+        post_count (int): Posts in the cache
+        limit (int): Page size
+        repeats (int): Timing repetitions per query
+        seed (int): Synthetic posts seed
+
+    Returns:
+        dict: Index build time and milliseconds per query for each variant
+    """
+    posts = make_posts(post_count, seed)
+    started = time.perf_counter()
+    index = PostIndex(posts)
+    build_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    queries = {}
+    for name, query in QUERIES.items():
+        query = dict(query, limit=limit)
+        lists_ms, (expected, _) = _time_ms(lambda: list_page(posts, **query), repeats)
+        index.page(**query)  # first use of a sort field computes its order once
+        index_ms, (page, _) = _time_ms(lambda: index.page(**query), repeats)
+        queries[name] = {
+            "lists_ms": lists_ms,
+            "index_ms": index_ms,
+            "speedup": round(lists_ms / index_ms, 1) if index_ms else None,
+            "same_page": [p.id for p in page] == [p.id for p in expected],
+        }
+    return {"posts": post_count, "page_size": limit, "index_build_ms": build_ms, "queries": queries}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=1_000_000, help="Posts in the cache")
+    parser.add_argument("--page-size", type=int, default=50, help="Posts per page")
+    parser.add_argument("--repeats", type=int, default=3, help="Timing repetitions per query")
+    parser.add_argument("--output", default="post_index.json", help="Where to write results")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    results = run_benchmark(post_count=args.posts, limit=args.page_size, repeats=args.repeats)
+    logger.info(f"Index build over {results['posts']:,} posts: {results['index_build_ms']:.0f} ms")
+    for name, query in results["queries"].items():
+        logger.info(f"{name}: lists {query['lists_ms']:.1f} ms, index {query['index_ms']:.2f} ms "
+                    f"({query['speedup']}x, same page: {query['same_page']})")
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    logger.info(f"Wrote results to {args.output}")
+    return all(query["same_page"] for query in results["queries"].values())
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
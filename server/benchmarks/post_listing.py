@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Post listing page cost: full documents vs POST_LIST_PROJECTION.
+
+Builds the documents MongoDBStore stores for a synthetic corpus and
+measures, per page, the BSON bytes a GetPosts query pulls over the wire and
+the CPU spent turning them into the response list:
+
+- full: whole documents decoded to dicts, then copied field by field into
+  response dicts (the previous response builder)
+- projection: the response-shaped documents POST_LIST_PROJECTION makes the
+  server return, decoded straight into the response
+- projection_raw: the same documents read as RawBSONDocument and decoded
+  in one bson.decode_all call for the response
+
+No database is needed: the server side of the projection is applied in
+Python, the client side runs exactly as pymongo would.
+
+Usage (from the server directory):
+    python -m benchmarks.post_listing --page-size 500 --output post_listing.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import logging
+from datetime import datetime
+
+import bson
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_corpus import generate_posts
+from mongodb_store import MongoDBStore, POST_LIST_PROJECTION
+
+logger = logging.getLogger(__name__)
+
+_RAW = CodecOptions(document_class=RawBSONDocument)
+
+
+def _project(document):
+    """Apply POST_LIST_PROJECTION the way the server does."""
+    projected = {}
+    for field, expression in POST_LIST_PROJECTION.items():
+        if field == "_id":
+            continue
+        if expression == "$_id":
+            projected[field] = document["_id"]
+        else:
+            source, default = expression["$ifNull"]
+            value = document.get(source[1:])
+            projected[field] = default if value is None else value
+    return projected
+
+
+def _copy_response(post):
+    """The field-by-field copy the response builder did for full documents."""
+    post_dict = {
+        "id": post.get("_id") or post.get("id"),
+        "title": post.get("title"),
+        "author": post.get("author"),
+        "subreddit": post.get("subreddit"),
+        "url": post.get("url"),
+        "created_utc": post.get("created_utc"),
+        "score": post.get("score"),
+        "num_comments": post.get("num_comments"),
+        "sentiment": post.get("sentiment"),
+        "topics": post.get("topics", []),
+        "pain_points": post.get("pain_points", []),
+        "products": post.get("products", [])
+    }
+    if isinstance(post_dict["created_utc"], datetime):
+        post_dict["created_utc"] = post_dict["created_utc"].isoformat()
+    return post_dict
+
+
+def _time_ms(function, repeats):
+    started = time.perf_counter()
+    for _ in range(repeats):
+        function()
+    return round((time.perf_counter() - started) / repeats * 1000, 3)
+
+
+def run_benchmark(page_size=500, repeats=20, seed=42):
+    """
+    Measure one page of posts with and without the projection.
+
+    Args:
+        page_size (int): Posts per page
+        repeats (int): Timing repetitions per variant
+        seed (int): Synthetic corpus seed
+
+    Returns:
+        dict: Wire bytes and milliseconds per page for each variant
+    """
+    store = MongoDBStore(None, lazy=True)
+    posts = generate_posts(total_words=page_size * 150, seed=seed)[:page_size]
+    documents = []
+    for post in posts:
+        post.sentiment = 0.1
+        post.topics = ["performance"]
+        post.pain_points = ["slow"]
+        post_id, document = store._post_document(post)
+        documents.append(dict(document, _id=post_id))
+
+    full = b"".join(bson.encode(document) for document in documents)
+    projected = b"".join(bson.encode(_project(document)) for document in documents)
+
+    variants = {
+        "full": (full, lambda: [_copy_response(post) for post in bson.decode_all(full)]),
+        "projection": (projected, lambda: bson.decode_all(projected)),
+        "projection_raw": (projected, lambda: bson.decode_all(
+            b"".join(doc.raw for doc in bson.decode_all(projected, _RAW)))),
+    }
+    return {
+        "page_size": len(documents),
+        "variants": {
+            name: {"wire_bytes": len(payload), "ms_per_page": _time_ms(build, repeats)}
+            for name, (payload, build) in variants.items()
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-size", type=int, default=500, help="Posts per page")
+    parser.add_argument("--repeats", type=int, default=20, help="Timing repetitions per variant")
+    parser.add_argument("--output", default="post_listing.json", help="Where to write results")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    results = run_benchmark(page_size=args.page_size, repeats=args.repeats)
+    for name, variant in results["variants"].items():
+        logger.info(f"{name}: {variant['wire_bytes'] / 1024:.1f} KB, {variant['ms_per_page']:.2f} ms "
+                    f"per page of {results['page_size']}")
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    logger.info(f"Wrote results to {args.output}")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Re-scrape write volume: full-document $set upserts vs fingerprinted diffs.
+
+Saves a synthetic corpus once, changes the score or comment count of a
+fraction of the posts (what a re-scrape of the same listing typically
+sees), saves it again and counts the write operations and the BSON bytes of
+the update documents sent for the second save:
+
+- full_set: one $set of the whole document per post (the previous behaviour)
+- fingerprinted: MongoDBStore.save_posts_bulk, which skips posts whose
+  fingerprint is unchanged and $sets only changed fields
+
+No database is needed: the posts collection is an in-process dict that
+applies $set/$setOnInsert upserts the way the server does.
+
+Usage (from the server directory):
+    python -m benchmarks.rescrape_writes --posts 5000 --changed 0.05 --output rescrape_writes.json
+"""
+import os
+import sys
+import json
+import random
+import argparse
+import logging
+from types import SimpleNamespace
+
+import bson
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_corpus import generate_posts
+from mongodb_store import MongoDBStore
+
+logger = logging.getLogger(__name__)
+
+
+class _PostsCollection:
+    """The posts collection operations save_posts_bulk uses, recording what is written."""
+    name = "posts"
+
+    def __init__(self):
+        self.docs = {}
+        self.operations = 0
+        self.update_bytes = 0
+
+    def find(self, query, projection=None):
+        for doc_id in query["_id"]["$in"]:
+            if doc_id in self.docs:
+                document = self.docs[doc_id]
+                yield dict({field: document[field] for field in projection or document if field in document},
+                           _id=doc_id)
+
+    def bulk_write(self, operations, ordered=True):
+        upserted = 0
+        for operation in operations:
+            doc_id, update = operation._filter["_id"], operation._doc
+            self.operations += 1
+            self.update_bytes += len(bson.encode(update))
+            if doc_id not in self.docs:
+                upserted += 1
+                self.docs[doc_id] = dict(update.get("$setOnInsert", {}))
+            self.docs[doc_id].update(update["$set"])
+        return SimpleNamespace(upserted_count=upserted)
+
+
+class _Metadata:
+    """Status counter updates are not part of the comparison."""
+    def update_one(self, query, update, upsert=False):
+        pass
+
+
+class _Catalog:
+    """Product catalog updates are not part of the comparison."""
+    def bulk_write(self, operations, ordered=True):
+        return SimpleNamespace(upserted_count=0)
+
+
+def _store():
+    store = MongoDBStore(None, lazy=True)
+    store.db = SimpleNamespace(posts=_PostsCollection(), archived_posts=_PostsCollection(),
+                               product_catalog=_Catalog(), metadata=_Metadata())
+    return store
+
+
+def run_benchmark(post_count=5000, changed=0.05, seed=42):
+    """
+    Measure the second save of a re-scraped corpus.
+
+    Args:
+        post_count (int): Posts in the corpus
+        changed (float): Fraction of posts whose score or comment count changes
+        seed (int): Synthetic corpus and change selection seed
+
+    Returns:
+        dict: Operations and update bytes of the re-scrape for each variant
+    """
+    posts = generate_posts(total_words=post_count * 150, seed=seed)[:post_count]
+    for post in posts:
+        post.sentiment = 0.1
+        post.topics = ["performance"]
+        post.pain_points = ["performance:slow"]
+        post.products = ["Cursor"]
+
+    store = _store()
+    store.save_posts_bulk(posts)
+    rng = random.Random(seed)
+    for post in rng.sample(posts, int(len(posts) * changed)):
+        if rng.random() < 0.5:
+            post.score += rng.randint(1, 50)
+        else:
+            post.num_comments += rng.randint(1, 10)
+
+    full_bytes = 0
+    for post in posts:
+        post_id, document = store._post_document(post)
+        full_bytes += len(bson.encode({"$set": document}))
+
+    collection = store.db.posts
+    collection.operations = collection.update_bytes = 0
+    store.save_posts_bulk(posts)
+
+    variants = {
+        "full_set": {"operations": len(posts), "update_bytes": full_bytes},
+        "fingerprinted": {"operations": collection.operations, "update_bytes": collection.update_bytes},
+    }
+    return {
+        "posts": len(posts),
+        "changed": changed,
+        "variants": variants,
+        "reduction": round(full_bytes / max(collection.update_bytes, 1), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=5000, help="Posts in the corpus")
+    parser.add_argument("--changed", type=float, default=0.05, help="Fraction of posts changed by the re-scrape")
+    parser.add_argument("--output", default="rescrape_writes.json", help="Where to write results")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    results = run_benchmark(post_count=args.posts, changed=args.changed)
+    for name, variant in results["variants"].items():
+        logger.info(f"{name}: {variant['operations']} writes, {variant['update_bytes'] / 1024:.1f} KB "
+                    f"for a re-scrape of {results['posts']} posts")
+    logger.info(f"Write volume reduced {results['reduction']}x")
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    logger.info(f"Wrote results to {args.output}")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
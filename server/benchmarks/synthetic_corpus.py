@@ -0,0 +1,151 @@
+"""
+Deterministic synthetic Reddit-style corpus for benchmarks.
+
+Posts mix product mentions, pain-point vocabulary, praise, markdown links,
+URLs, subreddit/user mentions and contractions so every NLP stage does
+realistic work. The same seed and scale always produce the same corpus.
+"""
+import random
+from datetime import datetime, timedelta
+
+from models import RedditPost
+
+PRODUCTS = ["Cursor", "Replit", "VSCode", "Copilot", "Zed"]
+
+SUBREDDITS = [
+    "programming", "webdev", "learnprogramming", "coding", "javascript",
+    "python", "reactjs", "vscode", "cursor_editor", "replit"
+]
+
+TITLE_TEMPLATES = [
+    "{product} keeps crashing when I open large files",
+    "Is {product} worth it for {topic}?",
+    "{product} is so slow after the last update",
+    "Feature request: {feature} in {product}",
+    "Why does {product} freeze on {topic}?",
+    "Switched from {other} to {product}, here's my experience",
+    "{product} autocomplete is amazing",
+    "Anyone else getting this error in {product}?",
+    "{product} vs {other} for {topic}",
+    "Frustrating bug with {feature} in {product}",
+]
+
+COMPLAINTS = [
+    "The app crashes every time I try to {action}.",
+    "It's been really slow and laggy since the update.",
+    "I keep getting an error when I {action}, which is frustrating.",
+    "The {feature} is broken and basically unusable right now.",
+    "Honestly it's confusing and difficult to {action}.",
+    "Sometimes the whole window is frozen for a minute.",
+    "I lost data twice because sync got corrupted.",
+    "There's a glitch where the editor gets stuck on {topic}.",
+    "It can't handle {topic} without hanging.",
+    "Support didn't respond and the bug is still there.",
+]
+
+PRAISE = [
+    "I love how fast the {feature} is.",
+    "Best tool I've used for {topic}, great work!",
+    "The new {feature} works perfectly and saves me hours.",
+    "Really impressed with how reliable it's been.",
+    "Amazing experience overall, highly recommend it.",
+]
+
+NEUTRAL = [
+    "I'm using version {version} on {os}.",
+    "My setup is {os} with {memory}GB of RAM.",
+    "I mostly work on {topic} projects.",
+    "Here's the config I'm using: `{feature}: true`.",
+    "See [the docs]({url}) for details.",
+    "Related thread: {url}",
+    "Crossposted from /r/{subreddit}, thanks /u/{user} for the tip.",
+    "Edit: I wish they would improve {feature}, it could be better.",
+    "Would be nice if {feature} was configurable.",
+    "Not sure if this should be a feature request or a bug report.",
+]
+
+FEATURES = [
+    "autocomplete", "dark mode", "git integration", "terminal", "debugger",
+    "multiplayer", "AI chat", "extension marketplace", "file search", "deployments"
+]
+
+TOPICS = [
+    "React apps", "Python scripts", "large monorepos", "data science notebooks",
+    "TypeScript", "remote development", "Rust crates", "school projects"
+]
+
+ACTIONS = [
+    "open a project", "run tests", "save a file", "push to GitHub",
+    "install an extension", "use the terminal", "deploy", "rename a symbol"
+]
+
+OPERATING_SYSTEMS = ["Windows 11", "macOS Sonoma", "Ubuntu 22.04", "Arch Linux"]
+
+
+def _fill(template, rng, product):
+    """Fill a sentence template with random (seeded) values."""
+    return template.format(
+        product=product,
+        other=rng.choice([p for p in PRODUCTS if p != product]),
+        feature=rng.choice(FEATURES),
+        topic=rng.choice(TOPICS),
+        action=rng.choice(ACTIONS),
+        os=rng.choice(OPERATING_SYSTEMS),
+        version=f"{rng.randint(0, 3)}.{rng.randint(0, 40)}.{rng.randint(0, 9)}",
+        memory=rng.choice([8, 16, 32, 64]),
+        url=f"https://example.com/{rng.choice(FEATURES).replace(' ', '-')}/{rng.randint(1, 9999)}",
+        subreddit=rng.choice(SUBREDDITS),
+        user=f"dev_{rng.randint(1, 5000)}",
+    )
+
+
+def generate_posts(total_words=3_200_000, seed=42, mean_sentences=8):
+    """
+    Generate RedditPost objects until the corpus reaches total_words.
+
+    Args:
+        total_words (int): Approximate number of words (title + content) to generate
+        seed (int): Random seed; the same seed always yields the same corpus
+        mean_sentences (int): Average number of sentences per post body
+
+    Returns:
+        list: List of RedditPost objects
+    """
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    posts = []
+    words = 0
+
+    while words < total_words:
+        product = rng.choice(PRODUCTS)
+        # Skew each post towards complaints, praise or neutral chatter
+        mood = rng.choices(["negative", "positive", "neutral"], weights=[5, 2, 3])[0]
+        pools = {
+            "negative": [COMPLAINTS] * 3 + [NEUTRAL],
+            "positive": [PRAISE] * 3 + [NEUTRAL],
+            "neutral": [NEUTRAL] * 3 + [COMPLAINTS, PRAISE],
+        }[mood]
+
+        sentence_count = max(1, int(rng.gauss(mean_sentences, mean_sentences / 3)))
+        sentences = [_fill(rng.choice(rng.choice(pools)), rng, product) for _ in range(sentence_count)]
+        if rng.random() < 0.5:
+            sentences.insert(rng.randrange(len(sentences) + 1), f"Using {product} daily.")
+
+        title = _fill(rng.choice(TITLE_TEMPLATES), rng, product)
+        content = " ".join(sentences)
+        index = len(posts)
+
+        posts.append(RedditPost(
+            id=f"syn{seed}_{index}",
+            title=title,
+            content=content,
+            author=f"user_{rng.randint(1, 20000)}",
+            subreddit=rng.choice(SUBREDDITS),
+            url=f"https://reddit.com/r/synthetic/comments/{index}",
+            created_utc=start + timedelta(minutes=index * 7),
+            score=int(rng.expovariate(1 / 40)),
+            num_comments=int(rng.expovariate(1 / 12))
+        ))
+        words += len(title.split()) + len(content.split())
+
+    return posts
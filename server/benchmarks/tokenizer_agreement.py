@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Agreement and speed harness for the regex tokenizer against NLTK.
+
+Tokenizes a synthetic Reddit corpus with both implementations and reports:
+
+- token_agreement: aligned token overlap (2 * matches / total tokens), with
+  NLTK's `` and '' quote tokens normalised to '"'
+- content_token_agreement: overlap of the lowercased alphanumeric tokens the
+  analyzers actually count (keywords, topics)
+- sentence_count_agreement: share of posts with the same sentence count
+- per-implementation timings and the speedup
+
+Usage (from the server directory):
+    python -m benchmarks.tokenizer_agreement --words 200000 --output tokenizer_agreement.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import logging
+from collections import Counter
+from difflib import SequenceMatcher
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fast_tokenizer import get_tokenizer
+from benchmarks.synthetic_corpus import generate_posts
+
+logger = logging.getLogger(__name__)
+
+_QUOTE_TOKENS = {'``': '"', "''": '"'}
+
+
+def _normalise(tokens):
+    return [_QUOTE_TOKENS.get(token, token) for token in tokens]
+
+
+def _content_tokens(tokens):
+    return Counter(token.lower() for token in tokens if token.isalnum())
+
+
+def _time(func, texts):
+    started = time.perf_counter()
+    results = [func(text) for text in texts]
+    return results, time.perf_counter() - started
+
+
+def measure_agreement(texts, reference='nltk', candidate='regex'):
+    """
+    Compare two tokenizer implementations on a list of texts.
+
+    Args:
+        texts (list): Texts to tokenize
+        reference (str): Reference tokenizer name
+        candidate (str): Candidate tokenizer name
+
+    Returns:
+        dict: Agreement ratios, timings and speedups
+    """
+    ref, cand = get_tokenizer(reference), get_tokenizer(candidate)
+
+    ref_tokens, ref_token_time = _time(ref.word_tokenize, texts)
+    cand_tokens, cand_token_time = _time(cand.word_tokenize, texts)
+    ref_sentences, ref_sentence_time = _time(ref.count_sentences, texts)
+    cand_sentences, cand_sentence_time = _time(cand.count_sentences, texts)
+
+    matched = total = content_matched = content_total = 0
+    for expected, actual in zip(ref_tokens, cand_tokens):
+        expected, actual = _normalise(expected), _normalise(actual)
+        matcher = SequenceMatcher(None, expected, actual, autojunk=False)
+        matched += sum(block.size for block in matcher.get_matching_blocks())
+        total += len(expected) + len(actual)
+
+        expected_content, actual_content = _content_tokens(expected), _content_tokens(actual)
+        content_matched += sum((expected_content & actual_content).values())
+        content_total += sum(expected_content.values()) + sum(actual_content.values())
+
+    same_sentences = sum(1 for a, b in zip(ref_sentences, cand_sentences) if a == b)
+
+    return {
+        'texts': len(texts),
+        'tokens': {reference: sum(map(len, ref_tokens)), candidate: sum(map(len, cand_tokens))},
+        'token_agreement': round(2 * matched / total, 4) if total else 1.0,
+        'content_token_agreement': round(2 * content_matched / content_total, 4) if content_total else 1.0,
+        'sentence_count_agreement': round(same_sentences / len(texts), 4) if texts else 1.0,
+        'seconds': {
+            'word_tokenize': {reference: round(ref_token_time, 4), candidate: round(cand_token_time, 4)},
+            'count_sentences': {reference: round(ref_sentence_time, 4), candidate: round(cand_sentence_time, 4)},
+        },
+        'speedup': {
+            'word_tokenize': round(ref_token_time / cand_token_time, 1) if cand_token_time else None,
+            'count_sentences': round(ref_sentence_time / cand_sentence_time, 1) if cand_sentence_time else None,
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--words', type=int, default=200_000, help='Synthetic corpus size in words')
+    parser.add_argument('--seed', type=int, default=42, help='Corpus seed')
+    parser.add_argument('--output', default='tokenizer_agreement.json', help='Where to write results')
+    parser.add_argument('--min-agreement', type=float, default=0.95,
+                        help='Fail if content token agreement falls below this ratio')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    posts = generate_posts(total_words=args.words, seed=args.seed)
+    texts = [f"{post.title} {post.content}" for post in posts]
+    results = measure_agreement(texts)
+
+    logger.info(f"Token agreement: {results['token_agreement']:.2%}, "
+                f"content tokens: {results['content_token_agreement']:.2%}, "
+                f"sentence counts: {results['sentence_count_agreement']:.2%}")
+    logger.info(f"Speedup: word_tokenize {results['speedup']['word_tokenize']}x, "
+                f"count_sentences {results['speedup']['count_sentences']}x")
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    logger.info(f"Wrote results to {args.output}")
+
+    if results['content_token_agreement'] < args.min_agreement:
+        logger.error(f"Content token agreement below {args.min_agreement:.0%}")
+        return False
+    return True
+
+
+if __name__ == '__main__':
+    success = main()
+    sys.exit(0 if success else 1)
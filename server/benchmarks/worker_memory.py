@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Shared vs private memory of gunicorn workers.
+
+Reads /proc/<pid>/smaps_rollup (Linux) for the master and each worker and
+reports RSS, PSS, shared and private memory. Private memory is what every
+additional worker costs, so it decides how many workers fit on a box.
+
+Either measure a running server or let the script start gunicorn itself,
+with and without preloading (the pre-fork warm-up in gunicorn.conf.py):
+
+Usage (from the server directory):
+    python -m benchmarks.worker_memory --pid <gunicorn master pid>
+    python -m benchmarks.worker_memory --workers 4 --output worker_memory.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import logging
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.cold_start import SERVER_DIR, _free_port, _wait_for_response
+
+logger = logging.getLogger(__name__)
+
+_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+
+
+def smaps_rollup(pid):
+    """
+    Memory summary of a process in MB.
+
+    Args:
+        pid (int): Process id
+
+    Returns:
+        dict: rss, pss, shared and private memory in MB
+    """
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if parts and parts[0].rstrip(":") in _FIELDS:
+                values[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {
+        "pid": pid,
+        "rss_mb": round(values.get("Rss", 0), 1),
+        "pss_mb": round(values.get("Pss", 0), 1),
+        "shared_mb": round(values.get("Shared_Clean", 0) + values.get("Shared_Dirty", 0), 1),
+        "private_mb": round(values.get("Private_Clean", 0) + values.get("Private_Dirty", 0), 1),
+    }
+
+
+def child_pids(pid):
+    """Direct children of a process (the gunicorn workers of a master)."""
+    children = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # Field 4 is the parent pid; the command name (field 2) may contain spaces
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        if ppid == pid:
+            children.append(int(entry))
+    return sorted(children)
+
+
+def memory_report(master_pid):
+    """
+    Memory of a gunicorn master and its workers.
+
+    Args:
+        master_pid (int): Pid of the gunicorn master
+
+    Returns:
+        dict: Per-process figures plus per-worker averages and totals
+    """
+    workers = [smaps_rollup(pid) for pid in child_pids(master_pid)]
+    count = len(workers) or 1
+    return {
+        "master": smaps_rollup(master_pid),
+        "workers": workers,
+        "per_worker": {
+            key: round(sum(worker[key] for worker in workers) / count, 1)
+            for key in ("rss_mb", "pss_mb", "shared_mb", "private_mb")
+        },
+        "total_pss_mb": round(smaps_rollup(master_pid)["pss_mb"] + sum(w["pss_mb"] for w in workers), 1),
+    }
+
+
+def measure_gunicorn(preload=True, workers=4, settle=3.0, timeout=180):
+    """
+    Start gunicorn, wait for the workers to boot, and report their memory.
+
+    Args:
+        preload (bool): Pre-warm in the master and fork (True) or warm in each worker (False)
+        workers (int): Number of workers
+        settle (float): Seconds to wait after the first response for the remaining workers
+        timeout (int): Seconds to wait for the first response
+
+    Returns:
+        dict: memory_report output plus the settings used
+    """
+    port = _free_port()
+    env = dict(os.environ, GUNICORN_PRELOAD="true" if preload else "false")
+    env.setdefault("JWT_SECRET_KEY", "worker-memory-benchmark-secret-key-0123456789")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "main:app", "--bind", f"127.0.0.1:{port}", "--workers", str(workers)],
+        cwd=SERVER_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        _wait_for_response(port, timeout)
+        deadline = time.perf_counter() + timeout
+        while len(child_pids(process.pid)) < workers and time.perf_counter() < deadline:
+            time.sleep(0.1)
+        time.sleep(settle)
+        report = memory_report(process.pid)
+        report.update({"preload": preload, "workers_requested": workers})
+        return report
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pid", type=int, help="Measure an already running gunicorn master")
+    parser.add_argument("--workers", type=int, default=4, help="Workers to start when --pid is not given")
+    parser.add_argument("--settle", type=float, default=3.0, help="Seconds to let workers finish booting")
+    parser.add_argument("--output", default="worker_memory.json", help="Where to write results")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    if not os.path.exists("/proc/self/smaps_rollup"):
+        logger.error("/proc/<pid>/smaps_rollup is not available (Linux 4.14+ required)")
+        return False
+
+    if args.pid:
+        results = {"running": memory_report(args.pid)}
+    else:
+        results = {
+            "per_worker_warmup": measure_gunicorn(preload=False, workers=args.workers, settle=args.settle),
+            "preload": measure_gunicorn(preload=True, workers=args.workers, settle=args.settle),
+        }
+
+    for name, report in results.items():
+        per_worker = report["per_worker"]
+        logger.info(f"{name}: {len(report['workers'])} workers, per worker {per_worker['private_mb']:.1f} MB private / "
+                    f"{per_worker['shared_mb']:.1f} MB shared, total PSS {report['total_pss_mb']:.1f} MB")
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    logger.info(f"Wrote results to {args.output}")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,134 @@
+"""
+Compiled-regex tokenizer for Reddit text.
+
+NLTK's word_tokenize runs Punkt sentence splitting followed by the Treebank
+tokenizer's chain of regex substitutions, which makes it one of the slowest
+calls in the pipeline. The regex tokenizer below produces Treebank-style
+tokens (contractions split as "do" + "n't", clitics as "'s", punctuation
+separated, numbers like 1,000 and 3.5 kept whole, runs of periods kept
+together) in a single findall without backtracking over long runs, and
+count_sentences counts sentence boundaries without building sentence lists.
+
+The implementation is chosen with the NLP_TOKENIZER environment variable
+('regex', the default, or 'nltk') or per analyzer via get_tokenizer().
+benchmarks/tokenizer_agreement.py measures token-level agreement with NLTK.
+"""
+import os
+import re
+import logging
+from collections import namedtuple
+from typing import List, Optional
+
+from nltk_resources import require
+
+logger = logging.getLogger(__name__)
+
+TOKENIZER_BACKENDS = ('regex', 'nltk')
+DEFAULT_TOKENIZER = os.getenv('NLP_TOKENIZER', 'regex')
+
+# Abbreviations that do not end a sentence (and keep their period as a token)
+_ABBREVIATIONS = ('mr', 'mrs', 'ms', 'dr', 'vs', 'etc', 'e.g', 'i.e', 'approx')
+
+# Characters the Treebank tokenizer always splits off as separate tokens
+_SPLIT_CHARS = r"""\s,;:@#$%&?!()\[\]{}<>"'`"""
+
+# One character of a plain word: anything but split characters and periods, plus
+# commas and colons inside numbers (1,000 / 10:30) and apostrophes inside names (O'Neil)
+_WORD_CHAR = r"""(?:[^.""" + _SPLIT_CHARS + r"""]|[,:](?=\d)|'(?=\w)(?!(?:s|m|d|ll|re|ve|t)\b))"""
+
+_WORD_TOKEN_RE = re.compile(
+    r"""
+    \w+(?=n't\b)                                    # "do" in "don't", "ca" in "can't"
+    | n't\b
+    | '(?:s|m|d|ll|re|ve)\b                         # clitics: 's 'm 'd 'll 're 've
+    | (?:""" + '|'.join(re.escape(a) for a in _ABBREVIATIONS) + r""")\.(?=\s+\w)
+    | \.{2,}                                         # ellipses: "..", "...", "....."
+    | --
+    | \.?""" + _WORD_CHAR + r"""+(?:\.""" + _WORD_CHAR + r"""+)*   # words, single periods inside (v1.2.3, .5); a trailing period is its own token
+    | [^\w\s]
+    """,
+    re.VERBOSE | re.IGNORECASE
+)
+
+# A boundary starts at the first terminator of a run (not inside one), so a long run
+# that ends in a non-space is rejected once rather than retried from every character
+_SENTENCE_END_RE = re.compile(
+    r'(?<![.!?])[.!?]'
+    + ''.join(r'(?<!\b' + re.escape(a + '.') + r')' for a in _ABBREVIATIONS)
+    + r"""[.!?]*["')\]]*(?=\s|$)""",
+    re.IGNORECASE
+)
+
+Tokenizer = namedtuple('Tokenizer', ['name', 'word_tokenize', 'count_sentences'])
+
+
+def regex_word_tokenize(text: str) -> List[str]:
+    """
+    Split text into Treebank-style word tokens with a single compiled regex.
+
+    Unlike NLTK, double quotes are returned as '"' rather than rewritten to
+    `` and ''.
+
+    Args:
+        text: Input text
+
+    Returns:
+        List of tokens
+    """
+    return _WORD_TOKEN_RE.findall(text) if text else []
+
+
+def regex_count_sentences(text: str) -> int:
+    """
+    Count sentences by their boundaries (., ! or ? followed by whitespace or the end).
+
+    Args:
+        text: Input text
+
+    Returns:
+        Number of sentences (0 for empty text)
+    """
+    text = text.strip() if text else ''
+    if not text:
+        return 0
+    # Every boundary before the end of the text starts a new sentence
+    return 1 + sum(1 for match in _SENTENCE_END_RE.finditer(text) if match.end() < len(text))
+
+
+def nltk_word_tokenize(text: str) -> List[str]:
+    """NLTK's Punkt + Treebank word tokenizer."""
+    require('punkt_tab')
+    from nltk.tokenize import word_tokenize
+    return word_tokenize(text)
+
+
+def nltk_count_sentences(text: str) -> int:
+    """Number of sentences found by NLTK's Punkt sentence tokenizer."""
+    require('punkt_tab')
+    from nltk.tokenize import sent_tokenize
+    return len(sent_tokenize(text))
+
+
+_TOKENIZERS = {
+    'regex': Tokenizer('regex', regex_word_tokenize, regex_count_sentences),
+    'nltk': Tokenizer('nltk', nltk_word_tokenize, nltk_count_sentences),
+}
+
+
+def get_tokenizer(name: Optional[str] = None) -> Tokenizer:
+    """
+    Get a tokenizer implementation.
+
+    Args:
+        name: 'regex' or 'nltk' (default: the NLP_TOKENIZER environment variable, else 'regex')
+
+    Returns:
+        Tokenizer with word_tokenize and count_sentences functions
+
+    Raises:
+        ValueError: If the name is not a known tokenizer
+    """
+    name = (name or DEFAULT_TOKENIZER).lower()
+    if name not in _TOKENIZERS:
+        raise ValueError(f"Unknown tokenizer '{name}', expected one of {', '.join(TOKENIZER_BACKENDS)}")
+    return _TOKENIZERS[name]
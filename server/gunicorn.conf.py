@@ -0,0 +1,86 @@
+"""
+Gunicorn configuration.
+
+Gunicorn picks this file up automatically when started from the server
+directory. The app is preloaded in the master and every read-only NLP asset
+(the analyzers, any trained model from NLP_MODEL_PATH, the VADER lexicon,
+stopwords and WordNet) is built there before workers fork. The master then
+calls gc.freeze() so the collector in each worker never writes to those
+objects' pages, and they stay shared copy-on-write across all workers.
+The MongoDB client is only opened after the fork, inside each worker; the
+master only clears the previous deployment's scrape flag, with a short-lived
+client, before it starts them.
+
+Environment:
+    GUNICORN_PRELOAD: 'false' to load the app (and pre-warm) in each worker instead
+    GUNICORN_PREWARM: Comma-separated services to build before serving
+        (default: analyzer,advanced_analyzer,deduplicator). The scraper and
+        OpenAI analyzer hold HTTP sessions, so they are left to each worker.
+
+benchmarks/worker_memory.py reports shared vs private memory per worker.
+"""
+import gc
+import os
+import sys
+import logging
+
+logger = logging.getLogger("gunicorn.error")
+
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() != "false"
+
+PREWARM_SERVICES = [
+    name.strip()
+    for name in os.getenv("GUNICORN_PREWARM", "analyzer,advanced_analyzer,deduplicator").split(",")
+    if name.strip()
+]
+
+
+def _prewarm():
+    """Build the pre-warmed services and load the bundled NLTK data."""
+    import api
+    from nltk_resources import warm_resources
+
+    timings = api.services.warm(PREWARM_SERVICES)
+    resources = warm_resources()
+    summary = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in timings.items())
+    logger.info(f"Pre-warmed services: {summary}; NLTK data: {', '.join(resources) or 'none'}")
+
+
+def on_starting(server):
+    """In the master, once per deployment and before any worker starts: clear a stale scrape flag."""
+    from dotenv import load_dotenv
+    from mongodb_store import reset_scrape_state
+
+    load_dotenv()
+    reset_scrape_state()
+
+
+def when_ready(server):
+    """In the master, once the app is loaded and before workers fork: pre-warm, then freeze the heap."""
+    if not preload_app:
+        return
+
+    _prewarm()
+
+    # Nothing may hold a MongoClient across fork
+    from app import data_store
+    data_store.close()
+    data_store.reset_connection()
+
+    # Move everything allocated so far into the permanent generation, so garbage
+    # collections in the workers don't touch (and un-share) the pre-warmed objects
+    gc.collect()
+    gc.freeze()
+    logger.info(f"Froze {gc.get_freeze_count()} objects before forking workers")
+
+
+def post_fork(server, worker):
+    """In each worker right after fork: make sure MongoDB is reconnected from this process."""
+    if "app" in sys.modules:
+        sys.modules["app"].data_store.reset_connection()
+
+
+def post_worker_init(worker):
+    """Without preloading, each worker pre-warms its own copy at boot."""
+    if not preload_app:
+        _prewarm()
@@ -1,5 +1,7 @@
 from app import app
+from mongodb_store import reset_scrape_state
 
 if __name__ == "__main__":
+    reset_scrape_state()
     # Enable debug mode for auto-reload on file changes
     app.run(host="0.0.0.0", port=5000, debug=True)
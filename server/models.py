@@ -1,25 +1,142 @@
 # Define data models (for in-memory storage)
+#
+# Both models declare their attributes in __slots__, so instances carry no
+# per-instance __dict__; with hundreds of thousands of posts in memory the
+# dicts were most of the footprint. Assigning an undeclared attribute raises
+# AttributeError: add new analysis fields to the schema below.
+import sys
+from array import array
+
+# Longest base36 id whose value fits an int64
+_MAX_BASE36_DIGITS = 12
+_BASE36_DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+
+def _intern(value):
+    """Share one copy of a frequently repeated string (subreddit and author names)."""
+    return sys.intern(value) if type(value) is str else value
+
+
+def _encode_id(post_id):
+    """Integer value of a canonical base36 post id (as Reddit issues them), or None."""
+    if (type(post_id) is not str or not 0 < len(post_id) <= _MAX_BASE36_DIGITS or not post_id.isascii()
+            or not post_id.isalnum() or post_id != post_id.lower() or (post_id[0] == "0" and post_id != "0")):
+        return None
+    return int(post_id, 36)
+
+
+def _decode_id(value):
+    digits = []
+    while True:
+        value, digit = divmod(value, 36)
+        digits.append(_BASE36_DIGITS[digit])
+        if not value:
+            return "".join(reversed(digits))
+
+
+class RelatedPosts:
+    """
+    Compact list of post ids.
+
+    Reddit post ids are base36 strings; each is stored as its integer value
+    in an int64 array (8 bytes instead of a string object and a list slot).
+    Other ids are kept as they are in a side list, referenced by negative
+    codes. Reads like a list of ids: len(), iteration, indexing, slicing,
+    + and == against lists.
+    """
+    __slots__ = ("_codes", "_other")
+
+    def __init__(self, post_ids=()):
+        self._codes = array("q")
+        self._other = []
+        self.extend(post_ids)
+
+    def append(self, post_id):
+        code = _encode_id(post_id)
+        if code is None:
+            self._other.append(post_id)
+            code = -len(self._other)
+        self._codes.append(code)
+
+    def extend(self, post_ids):
+        for post_id in post_ids:
+            self.append(post_id)
+
+    def _decode(self, code):
+        return _decode_id(code) if code >= 0 else self._other[-code - 1]
+
+    def __len__(self):
+        return len(self._codes)
+
+    def __iter__(self):
+        return (self._decode(code) for code in self._codes)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return RelatedPosts(self._decode(code) for code in self._codes[index])
+        return self._decode(self._codes[index])
+
+    def __add__(self, other):
+        combined = RelatedPosts(self)
+        combined.extend(other)
+        return combined
+
+    def __radd__(self, other):
+        combined = RelatedPosts(other)
+        combined.extend(self)
+        return combined
+
+    def __eq__(self, other):
+        if isinstance(other, (RelatedPosts, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"RelatedPosts({list(self)!r})"
+
 
 class RedditPost:
     """Model for storing Reddit post data"""
+    __slots__ = (
+        # Scraped fields
+        "id", "title", "content", "author", "subreddit", "url", "created_utc", "score", "num_comments",
+        # Analysis results (filled in by the analyzers)
+        "sentiment", "sentiment_label", "topics", "pain_points", "products", "severity",
+        # Near-duplicate cluster (set by near_duplicates.apply_clusters)
+        "cluster_id", "duplicate_count",
+    )
+
     def __init__(self, id, title, content, author, subreddit, url, created_utc, score, num_comments):
         self.id = id
         self.title = title
         self.content = content
-        self.author = author
-        self.subreddit = subreddit
+        self.author = _intern(author)
+        self.subreddit = _intern(subreddit)
         self.url = url
         self.created_utc = created_utc
         self.score = score
         self.num_comments = num_comments
         # Analysis results (to be filled later)
         self.sentiment = None
+        self.sentiment_label = None
         self.topics = []
         self.pain_points = []
+        self.products = []
         self.severity = None
+        # Near-duplicate cluster (set by near_duplicates.apply_clusters)
+        self.cluster_id = None
+        self.duplicate_count = 1
+
+    def to_dict(self):
+        """All declared fields (the post document MongoDBStore stores)"""
+        return {name: getattr(self, name) for name in self.__slots__}
 
 class PainPoint:
     """Model for categorized pain points"""
+    __slots__ = ("name", "description", "frequency", "avg_sentiment", "_related_posts", "product", "severity")
+
     def __init__(self, name, description, frequency=0, avg_sentiment=0, related_posts=None, product=None):
         self.name = name
         self.description = description
@@ -28,7 +145,16 @@ class PainPoint:
         self.related_posts = related_posts or []
         self.product = product  # e.g., "Cursor", "Replit"
         self.severity = 0  # Calculated based on frequency and sentiment
-        
+
+    @property
+    def related_posts(self):
+        """Ids of the posts mentioning this pain point (a compact RelatedPosts)"""
+        return self._related_posts
+
+    @related_posts.setter
+    def related_posts(self, post_ids):
+        self._related_posts = post_ids if isinstance(post_ids, RelatedPosts) else RelatedPosts(post_ids)
+
     def calculate_severity(self):
         """Calculate severity score based on frequency and sentiment"""
         # Negative sentiment is typically between -1 and 0
@@ -36,7 +162,7 @@ class PainPoint:
         sentiment_factor = abs(min(0, self.avg_sentiment))
         self.severity = self.frequency * sentiment_factor
         return self.severity
-    
+
     def to_dict(self):
         """Convert to dictionary for API responses"""
         return {
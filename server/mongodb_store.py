@@ -1,33 +1,272 @@
 import os
+import copy
 import logging
+import threading
+import time
 from datetime import datetime
-from pymongo import MongoClient
-from pymongo.errors import ConnectionFailure, OperationFailure
+from bson.binary import Binary
+import numpy as np
+from pymongo import ASCENDING, DESCENDING, IndexModel, MongoClient, UpdateOne
+from pymongo.errors import BulkWriteError, ConnectionFailure, OperationFailure
+from pain_point_rollups import (apply_to_pain_point, collect_rollups, new_pain_point,
+                                pain_point_from_document, rollup_update)
+from post_cache import PostCache
+from post_fingerprints import FINGERPRINT_FIELD, post_update
+from snapshots import SnapshotDict
+from spike_detection import SeriesState, SpikeDetector
+from time_series import bucket_update, collect_buckets
+from write_behind import WRITE_BEHIND_MAX_RETRIES, WriteBehindQueue, is_transient, retry_delay
 
 logger = logging.getLogger(__name__)
 
+# Documents per bulk_write call in the bulk save methods
+BULK_BATCH_SIZE = int(os.getenv("MONGODB_BULK_BATCH_SIZE", 1000))
+
+# Metadata document holding the figures /api/status reports, maintained by the save methods
+STATUS_COUNTERS_ID = "status_counters"
+
+# Seconds after which the status counters are recounted from the collections
+STATUS_RECONCILE_SECONDS = int(os.getenv("STATUS_RECONCILE_SECONDS", 3600))
+# GetAllProducts reads the product_catalog collection, which the post writes keep up to date;
+# it is recounted from the posts in the background after this many seconds
+PRODUCT_CATALOG_RECONCILE_SECONDS = int(os.getenv("PRODUCT_CATALOG_RECONCILE_SECONDS", 86400))
+PRODUCT_CATALOG_ID = "product_catalog"  # metadata document recording the last recount
+
+# Analyzed posts are the ones with a sentiment score (unanalyzed posts store sentiment: null)
+ANALYZED_POSTS_FILTER = {"sentiment": {"$ne": None}}
+
+# Case-insensitive string comparison; queries must pass the same collation to use the indexes built with it
+CASE_INSENSITIVE = {"locale": "en", "strength": 2}
+
+# Fields GetPosts can sort on (API name -> document field)
+POST_SORT_FIELDS = {"date": "created_utc", "score": "score", "comments": "num_comments", "sentiment": "sentiment"}
+
+# A post as the list endpoints return it, computed by the server: no content body or
+# comments, _id exposed as id and absent fields filled in, so a page needs no reshaping
+# in Python. Aggregation expressions in find projections need MongoDB 4.4+.
+POST_LIST_PROJECTION = {
+    "_id": 0,
+    "id": "$_id",
+    **{field: {"$ifNull": [f"${field}", None]}
+       for field in ("title", "author", "subreddit", "url", "created_utc", "score", "num_comments", "sentiment")},
+    **{field: {"$ifNull": [f"${field}", []]} for field in ("topics", "pain_points", "products")},
+}
+
+
+def _post_indexes():
+    """
+    Indexes for every GetPosts filter + sort combination.
+
+    Following equality-sort-range, each sort field gets an index on its own
+    (no filter, or min_score/min_comments range filters applied while walking
+    it) and one behind each equality filter (product, case-insensitive subreddit).
+    Each ends in _id, the keyset pagination tie-breaker, so pages are plain
+    range scans.
+    """
+    indexes = []
+    for field in POST_SORT_FIELDS.values():
+        indexes.append(IndexModel([(field, DESCENDING), ("_id", DESCENDING)], name=f"sort_{field}"))
+        indexes.append(IndexModel([("products", ASCENDING), (field, DESCENDING), ("_id", DESCENDING)],
+                                  name=f"products_{field}"))
+        indexes.append(IndexModel([("subreddit", ASCENDING), (field, DESCENDING), ("_id", DESCENDING)],
+                                  name=f"subreddit_ci_{field}", collation=CASE_INSENSITIVE))
+    return indexes
+
+
+# Declarative index specification, reconciled by MongoDBStore.ensure_indexes() on connect
+INDEX_SPEC = {
+    "posts": _post_indexes(),
+    "users": [IndexModel([("username", ASCENDING)], unique=True)],
+    "openai_analysis": [IndexModel([("product", ASCENDING)])],
+    "recommendations": [IndexModel([("product", ASCENDING)])],
+    "nlp_analyses": [IndexModel([("timestamp", DESCENDING)])],
+    # LSH band lookups for near-duplicate detection
+    "post_signatures": [IndexModel([("bands", ASCENDING)])],
+    # /api/trends: one series over a bucket range, summed over subreddits or for one subreddit
+    "pain_point_series": [
+        IndexModel([("granularity", ASCENDING), ("product", ASCENDING), ("pain_point", ASCENDING),
+                    ("bucket", ASCENDING)], name="series_bucket"),
+        IndexModel([("granularity", ASCENDING), ("product", ASCENDING), ("pain_point", ASCENDING),
+                    ("subreddit", ASCENDING), ("bucket", ASCENDING)], name="series_subreddit_bucket"),
+        # Hourly buckets carry expires_at; daily ones don't and are kept
+        IndexModel([("expires_at", ASCENDING)], name="series_ttl", expireAfterSeconds=0),
+    ],
+    # GetAllProducts: the maintained catalog, listed by name
+    "product_catalog": [IndexModel([("name", ASCENDING)], name="catalog_name")],
+    # /api/spikes: anomalous series whose open bucket is recent
+    "pain_point_spikes": [
+        IndexModel([("anomalous", ASCENDING), ("current_bucket", DESCENDING)], name="spikes_current"),
+    ],
+}
+
+
+def _index_matches(existing, wanted):
+    """Whether an index from index_information() has the keys and options of an IndexModel document."""
+    if list(existing.get("key", [])) != list(wanted["key"].items()):
+        return False
+    if bool(existing.get("unique")) != bool(wanted.get("unique")):
+        return False
+    wanted_collation = wanted.get("collation") or {}
+    existing_collation = existing.get("collation") or {}
+    return all(existing_collation.get(option) == value for option, value in wanted_collation.items())
+
+
+def catalog_names(products):
+    """
+    Catalog keys of a post's products.
+
+    Returns:
+        dict: Lowercased name -> name as spelled (trimmed, non-empty strings; first spelling wins)
+    """
+    names = {}
+    for product in products or ():
+        if isinstance(product, str) and product.strip():
+            names.setdefault(product.strip().lower(), product.strip())
+    return names
+
+
+def _unique_by_id(posts):
+    """The last post of each id, in order of first appearance (posts without an id are all kept)."""
+    by_id, without_id = {}, []
+    for post in posts:
+        post_id = getattr(post, 'id', None)
+        if post_id is None:
+            without_id.append(post)
+        else:
+            by_id[post_id] = post
+    return list(by_id.values()) + without_id
+
+def reset_scrape_state(mongodb_uri=None):
+    """
+    Clear a scrape_in_progress flag left behind by a previous deployment.
+
+    Call once per deployment, before any worker serves (gunicorn's on_starting,
+    or main.py for the development server). Never on a (re)connect: a worker
+    connecting while another one scrapes would clear the live flag.
+
+    Args:
+        mongodb_uri: MongoDB connection string (default: MONGODB_URI env var)
+
+    Returns:
+        bool: True if the flag was cleared (or no database is configured)
+    """
+    mongodb_uri = mongodb_uri or os.getenv("MONGODB_URI")
+    if not mongodb_uri:
+        return True
+    # A short-lived client: nothing may hold a MongoClient across the workers' fork
+    client = MongoClient(mongodb_uri)
+    try:
+        client.reddit_scraper.metadata.update_one({"_id": "scraper_metadata"},
+                                                  {"$set": {"scrape_in_progress": False}})
+        logger.info("Cleared scrape_in_progress for the new deployment")
+        return True
+    except Exception as e:
+        logger.error(f"Error clearing scrape_in_progress: {str(e)}")
+        return False
+    finally:
+        client.close()
+
+
 class MongoDBStore:
     """MongoDB data store for Reddit scraper application"""
     
-    def __init__(self, mongodb_uri=None):
-        """Initialize MongoDB connection"""
+    def __init__(self, mongodb_uri=None, lazy=False):
+        """
+        Initialize the store.
+
+        Args:
+            mongodb_uri: MongoDB connection string (default: MONGODB_URI env var)
+            lazy: Defer connecting until the database or the pain point cache is first used
+        """
         self.mongodb_uri = mongodb_uri or os.getenv("MONGODB_URI")
         self.client = None
-        self.db = None
+        self._db = None
+        self._connect_attempted = False
+        self._connect_lock = threading.RLock()
+        self._on_connect = []
         self.scrape_in_progress = False
-        self.pain_points = {}
-        self.raw_posts = []
-        self.analyzed_posts = []
-        self.subreddits_scraped = set()
+        # Shared with request threads: published as immutable snapshots (see snapshots)
+        self._pain_points = SnapshotDict()
+        # Bounded caches of the posts seen by this process (the API's no-database fallback)
+        self.raw_posts = PostCache(name="raw posts")
+        self.analyzed_posts = PostCache(name="analyzed posts")
+        self.subreddits_scraped = frozenset()
         self.last_scrape_time = None
-        self.openai_analyses = {}
+        self._openai_analyses = SnapshotDict()
+        self._reconcile_lock = threading.Lock()
+        self._catalog_lock = threading.Lock()
+        self._rolled_up_post_ids = set()  # posts already in the in-memory rollups (no-database mode)
+        self.spike_detector = SpikeDetector()
+        self.spike_states = {}  # series key -> SeriesState (no-database mode)
+        self._spike_post_ids = set()  # posts already fed to the in-memory spike detector
+        self._post_writer = None
+        self._post_writer_lock = threading.Lock()
         
         # Connect to MongoDB if URI is provided
-        if self.mongodb_uri:
+        if self.mongodb_uri and not lazy:
             self.connect()
+
+    @property
+    def db(self):
+        """Database handle (None when not connected); a lazy store connects on first access."""
+        self.ensure_connected()
+        return self._db
+
+    @db.setter
+    def db(self, value):
+        self._db = value
+
+    @property
+    def pain_points(self):
+        """
+        In-memory pain point cache; loaded from the database on first access.
+        
+        A read-only snapshot: the store publishes a new one per batch of
+        changes, so hold on to it for a consistent view.
+        """
+        self.ensure_connected()
+        return self._pain_points.snapshot
+
+    @pain_points.setter
+    def pain_points(self, value):
+        self._pain_points.publish(value, replace=True)
+
+    @property
+    def openai_analyses(self):
+        """In-memory OpenAI analyses by product (a read-only snapshot, like pain_points)."""
+        return self._openai_analyses.snapshot
+
+    @openai_analyses.setter
+    def openai_analyses(self, value):
+        self._openai_analyses.publish(value, replace=True)
+
+    def ensure_connected(self):
+        """
+        Connect on first use if a URI is configured and no attempt has been made yet.
+
+        Returns:
+            bool: True if the database is available
+        """
+        if self._db is None and not self._connect_attempted and self.mongodb_uri:
+            with self._connect_lock:
+                if self._db is None and not self._connect_attempted:
+                    self.connect()
+        return self._db is not None
+
+    def on_connect(self, callback):
+        """
+        Run a callback with the store once the database connection is established.
+
+        Runs immediately if the store is already connected.
+        """
+        if self._db is not None:
+            callback(self)
+        else:
+            self._on_connect.append(callback)
     
     def connect(self):
         """Connect to MongoDB database"""
+        self._connect_attempted = True
         try:
             self.client = MongoClient(self.mongodb_uri)
             # Test connection
@@ -36,9 +275,15 @@ class MongoDBStore:
             self.db = self.client.reddit_scraper
             logger.info("Connected to MongoDB successfully")
             
+            # Make sure every API query shape is index-backed
+            self.ensure_indexes()
+            
             # Load current metadata if available
             self._load_metadata()
             self.load_pain_points()
+
+            for callback in self._on_connect:
+                callback(self)
             return True
         except ConnectionFailure as e:
             logger.error(f"Failed to connect to MongoDB: {str(e)}")
@@ -47,6 +292,121 @@ class MongoDBStore:
             logger.error(f"Error connecting to MongoDB: {str(e)}")
             return False
     
+    def ensure_indexes(self, spec=None, drop_stale=False):
+        """
+        Reconcile the collections' indexes with the declarative specification.
+        
+        Idempotent: missing indexes are created, indexes whose keys or options
+        changed are rebuilt, matching ones are left alone.
+        
+        Args:
+            spec (dict): Collection name -> list of IndexModel (default: INDEX_SPEC)
+            drop_stale (bool): Also drop indexes that are not in the specification
+            
+        Returns:
+            dict: Names of created, rebuilt and dropped indexes and the unchanged count
+        """
+        summary = {"created": [], "rebuilt": [], "dropped": [], "unchanged": 0}
+        if self._db is None:
+            logger.error("Cannot ensure indexes: Database connection not established")
+            return summary
+        
+        for collection_name, models in (spec or INDEX_SPEC).items():
+            collection = self._db[collection_name]
+            try:
+                existing = collection.index_information()
+                to_create = []
+                for model in models:
+                    wanted = model.document
+                    current = existing.get(wanted["name"])
+                    if current is None:
+                        to_create.append(model)
+                        summary["created"].append(f"{collection_name}.{wanted['name']}")
+                    elif not _index_matches(current, wanted):
+                        collection.drop_index(wanted["name"])
+                        to_create.append(model)
+                        summary["rebuilt"].append(f"{collection_name}.{wanted['name']}")
+                    else:
+                        summary["unchanged"] += 1
+                if to_create:
+                    collection.create_indexes(to_create)
+                
+                if drop_stale:
+                    wanted_names = {model.document["name"] for model in models}
+                    for name in existing:
+                        if name != "_id_" and name not in wanted_names:
+                            collection.drop_index(name)
+                            summary["dropped"].append(f"{collection_name}.{name}")
+            except Exception as e:
+                logger.error(f"Error ensuring indexes on {collection_name}: {str(e)}")
+        
+        if summary["created"] or summary["rebuilt"] or summary["dropped"]:
+            logger.info(f"Indexes created: {summary['created']}, rebuilt: {summary['rebuilt']}, "
+                        f"dropped: {summary['dropped']}")
+        return summary
+
+    @staticmethod
+    def product_catalog_pipeline():
+        """
+        Aggregation over posts recounting the product catalog.
+        
+        Products are grouped case-insensitively (first spelling seen wins) with
+        their post count and newest post date. This scans every post, so it only
+        runs in reconcile_product_catalog(); requests read the maintained catalog.
+        
+        Returns:
+            list: Pipeline stages for db.posts.aggregate()
+        """
+        return [
+            {"$project": {"products": 1, "created_utc": 1}},
+            {"$unwind": "$products"},
+            {"$match": {"products": {"$type": "string"}}},
+            {"$set": {"name": {"$trim": {"input": "$products"}}}},
+            {"$match": {"name": {"$ne": ""}}},
+            # One count per post, however often it lists a product
+            {"$group": {
+                "_id": {"post": "$_id", "key": {"$toLower": "$name"}},
+                "name": {"$first": "$name"},
+                "created_utc": {"$first": "$created_utc"},
+            }},
+            {"$group": {
+                "_id": "$_id.key",
+                "name": {"$first": "$name"},
+                "post_count": {"$sum": 1},
+                "last_seen": {"$max": "$created_utc"},
+            }},
+        ]
+    
+    @staticmethod
+    def posts_query(product=None, has_pain_points=False, subreddit=None, min_score=0, min_comments=0):
+        """
+        Build the posts filter used by GetPosts.
+        
+        Returns:
+            tuple: (filter, collation) - collation is set when filtering by subreddit,
+            which is matched case-insensitively through the subreddit_ci_* indexes
+        """
+        query = {}
+        collation = None
+        
+        if product:
+            query["products"] = product
+        
+        if has_pain_points:
+            query["pain_points"] = {"$exists": True, "$ne": []}
+            
+        if subreddit:
+            query["subreddit"] = subreddit
+            collation = CASE_INSENSITIVE
+            
+        if min_score > 0:
+            query["score"] = {"$gte": min_score}
+            
+        if min_comments > 0:
+            query["num_comments"] = {"$gte": min_comments}
+        
+        return query, collation
+    
     def _load_metadata(self):
         """Load metadata from database"""
         try:
@@ -82,7 +442,7 @@ class MongoDBStore:
             if subreddits:
                 update_data["subreddits"] = subreddits
                 if subreddits:
-                    self.subreddits_scraped.update(subreddits)
+                    self.subreddits_scraped = self.subreddits_scraped | frozenset(subreddits)
                 
             if time_filter:
                 update_data["time_filter"] = time_filter
@@ -101,6 +461,49 @@ class MongoDBStore:
         except Exception as e:
             logger.error(f"Error updating metadata: {str(e)}")
             return False
+    def _post_document(self, post):
+        """
+        Build the MongoDB document for a post.
+
+        Returns:
+            tuple: (post_id, document), or (None, None) if the post has no ID
+        """
+        # Convert post object to dictionary if needed
+        if hasattr(post, 'to_dict'):
+            post_data = post.to_dict()
+        elif isinstance(post, dict):
+            post_data = post
+        else:
+            # Try to convert object attributes to dictionary
+            post_data = {}
+            for attr in dir(post):
+                if not attr.startswith('__') and not callable(getattr(post, attr)):
+                    post_data[attr] = getattr(post, attr)
+        
+        # Add timestamp if not present
+        if 'created_at' not in post_data:
+            post_data['created_at'] = datetime.utcnow()
+        
+        # Get post ID - either from id attribute or from the 'id' key
+        post_id = None
+        if hasattr(post, 'id'):
+            post_id = post.id
+        elif 'id' in post_data:
+            post_id = post_data['id']
+            
+        if not post_id:
+            return None, None
+            
+        # Use post ID as document ID
+        post_data['_id'] = post_id
+        
+        # Convert any non-serializable objects to strings
+        for key, value in post_data.items():
+            if not isinstance(value, (str, int, float, bool, list, dict, datetime, type(None))):
+                post_data[key] = str(value)
+        
+        return post_id, post_data
+
     def save_post(self, post):
         """Save Reddit post to database"""
         # Fix the comparison with None instead of bool testing
@@ -109,56 +512,207 @@ class MongoDBStore:
             return False
         
         try:
-            # Convert post object to dictionary if needed
-            if hasattr(post, 'to_dict'):
-                post_data = post.to_dict()
-            elif isinstance(post, dict):
-                post_data = post
-            else:
-                # Try to convert object attributes to dictionary
-                post_data = {}
-                for attr in dir(post):
-                    if not attr.startswith('__') and not callable(getattr(post, attr)):
-                        post_data[attr] = getattr(post, attr)
-            
-            # Add timestamp if not present
-            if 'created_at' not in post_data:
-                post_data['created_at'] = datetime.utcnow()
-            
-            # Get post ID - either from id attribute or from the 'id' key
-            post_id = None
-            if hasattr(post, 'id'):
-                post_id = post.id
-            elif 'id' in post_data:
-                post_id = post_data['id']
-                
+            post_id, post_data = self._post_document(post)
             if not post_id:
                 logger.error("Cannot save post: No ID available")
                 return False
-                
-            # Use post ID as document ID
-            post_data['_id'] = post_id
-            
-            # Convert any non-serializable objects to strings
-            for key, value in post_data.items():
-                if not isinstance(value, (str, int, float, bool, list, dict, datetime, type(None))):
-                    post_data[key] = str(value)
-            
-            # Insert or update post
-            result = self.db.posts.update_one(
-                {"_id": post_data['_id']},
-                {"$set": post_data},
-                upsert=True
-            )
             
-            # Add to raw_posts list if it's not already there
-            if post_id not in [p.id if hasattr(p, 'id') else p.get('id', None) for p in self.raw_posts]:
-                self.raw_posts.append(post)
+            stored = self._stored_posts([post_id]).get(post_id)
+            newly_analyzed = post_data.get('sentiment') is not None and (stored or {}).get('sentiment') is None
+            
+            # Insert the post, or update just its changed fields (archived posts stay in the archive)
+            update = post_update(post_data, stored and stored.get(FINGERPRINT_FIELD), exists=stored is not None)
+            if update is not None and 'archived_at' not in (stored or {}):
+                result = self.db.posts.update_one({"_id": post_id}, update, upsert=True)
+                self.increment_status_counters(posts=int(result.upserted_id is not None),
+                                               analyzed_posts=int(newly_analyzed))
+                if stored is None or catalog_names(stored.get('products')) != catalog_names(post_data.get('products')):
+                    self.update_product_catalog([((stored or {}).get('products'), post_data.get('products'),
+                                                  post_data.get('created_utc'))])
+            
+            self.raw_posts.put(post)
             
             return True
         except Exception as e:
             logger.error(f"Error saving post: {str(e)}")
             return False
+
+    def save_posts_bulk(self, posts, batch_size=None):
+        """
+        Upsert many posts with unordered bulk writes.
+        
+        Posts whose fingerprint matches the stored one are not written; changed
+        posts get a $set of just the changed fields (see post_fingerprints).
+        
+        Args:
+            posts (list): RedditPost objects or post dicts
+            batch_size (int): Documents per bulk_write call (default: MONGODB_BULK_BATCH_SIZE)
+            
+        Returns:
+            dict: saved (count), saved_ids, written (how many saved posts actually needed a
+            write), newly_analyzed_ids (saved posts that had no sentiment score stored before)
+            and errors (list of {"id", "error"} per failed post)
+        """
+        if self.db is None:
+            logger.error("Cannot save posts: Database connection not established")
+            return {"saved": 0, "saved_ids": [], "written": 0, "newly_analyzed_ids": [],
+                    "errors": [{"id": None, "error": "Database connection not established"}]}
+        
+        documents, errors = [], []
+        for post in posts:
+            try:
+                post_id, post_data = self._post_document(post)
+            except Exception as e:
+                errors.append({"id": getattr(post, 'id', None), "error": str(e)})
+                continue
+            if not post_id:
+                errors.append({"id": None, "error": "No ID available"})
+                continue
+            documents.append((post_id, post_data, post))
+        
+        # Compare with the stored fingerprints and write only what changed
+        # (archived posts stay in the archive)
+        stored = self._stored_posts([post_id for post_id, _, _ in documents])
+        updates = []
+        for post_id, post_data, _ in documents:
+            state = stored.get(post_id)
+            if state and 'archived_at' in state:
+                continue
+            update = post_update(post_data, state and state.get(FINGERPRINT_FIELD), exists=state is not None)
+            if update is not None:
+                updates.append((post_id, update))
+        
+        result = self._bulk_update(self.db.posts, updates, batch_size)
+        errors.extend(result["errors"])
+        failed = {error["id"] for error in result["errors"]}
+        
+        # Product catalog: the products each written post gained or lost (last document per id);
+        # a re-scraped post with the same products leaves it alone
+        written = {post_id for post_id, _ in updates} - failed
+        catalog_changes = {}
+        for post_id, post_data, _ in documents:
+            before = stored.get(post_id)
+            if post_id in written and (before is None or catalog_names(before.get('products'))
+                                       != catalog_names(post_data.get('products'))):
+                catalog_changes[post_id] = ((before or {}).get('products'), post_data.get('products'),
+                                            post_data.get('created_utc'))
+        self.update_product_catalog(catalog_changes.values())
+        saved = [document for document in documents if document[0] not in failed]
+        
+        # Unique ids: a post passed twice in one batch is still analyzed once
+        newly_analyzed_ids = list(dict.fromkeys(
+            post_id for post_id, post_data, _ in saved
+            if post_data.get('sentiment') is not None and (stored.get(post_id) or {}).get('sentiment') is None
+        ))
+        self.increment_status_counters(posts=result["inserted"], analyzed_posts=len(newly_analyzed_ids))
+        
+        self.raw_posts.extend(post for _, _, post in saved)
+        
+        saved_ids = [post_id for post_id, _, _ in saved]
+        logger.info(f"Bulk saved {len(saved_ids)}/{len(posts)} posts: {len(updates)} written, "
+                    f"{len(documents) - len(updates)} unchanged ({len(errors)} errors)")
+        return {"saved": len(saved_ids), "saved_ids": saved_ids, "written": len(updates) - len(failed),
+                "newly_analyzed_ids": newly_analyzed_ids, "errors": errors}
+    
+    @property
+    def post_writer(self):
+        """Write-behind queue persisting analyzed posts on a writer thread (created on first use)."""
+        with self._post_writer_lock:
+            if self._post_writer is None:
+                self._post_writer = WriteBehindQueue(self._persist_posts, name="post-writer")
+            return self._post_writer
+
+    def enqueue_posts(self, posts):
+        """
+        Hand analyzed posts to the write-behind queue and return immediately.
+        
+        The writer thread saves them in batches (save_posts_bulk) and adds the
+        newly analyzed ones to the pain point rollups, trend series and spike
+        detector. Call flush_posts() to wait for them.
+        """
+        self.post_writer.put(posts)
+
+    def flush_posts(self, timeout=None):
+        """
+        Wait until every enqueued post has been persisted.
+        
+        Args:
+            timeout (float): Seconds to wait at most (default: no limit)
+            
+        Returns:
+            dict: saved, written, newly_analyzed, pain_points_updated and errors
+            since the previous flush, plus pending (posts still queued on timeout)
+        """
+        if self._post_writer is None:
+            return {"saved": 0, "written": 0, "newly_analyzed": 0, "pain_points_updated": 0, "errors": [],
+                    "pending": 0}
+        totals = self._post_writer.flush(timeout)
+        for key, default in (("saved", 0), ("written", 0), ("newly_analyzed", 0), ("pain_points_updated", 0),
+                             ("errors", [])):
+            totals.setdefault(key, default)
+        return totals
+
+    def _apply_aggregates(self, posts):
+        """
+        Add newly analyzed posts to the rollups, trend series and spike detector.
+        
+        A step whose every write failed transiently (the database is
+        unreachable) applied nothing and is retried with backoff, up to
+        WRITE_BEHIND_MAX_RETRIES times; after that, and for partial failures
+        (retrying them would count posts twice), the errors are reported.
+        """
+        totals = {"pain_points_updated": 0, "errors": []}
+        for name, apply in (("pain point", self.apply_pain_point_rollups), ("series bucket", self.apply_time_series),
+                            ("spike detector series", self.apply_spike_detection)):
+            attempt = 0
+            while True:
+                result = apply(posts)
+                errors = result["errors"]
+                if not errors or result["updated"] or not all(error.get("transient") for error in errors):
+                    break
+                if attempt >= WRITE_BEHIND_MAX_RETRIES:
+                    logger.error(f"Giving up on {name}s of {len(posts)} posts after {attempt} retries")
+                    break
+                attempt += 1
+                delay = retry_delay(attempt)
+                logger.warning(f"Transient database error updating {name}s, retrying in {delay:.1f}s")
+                time.sleep(delay)
+            if apply == self.apply_pain_point_rollups:
+                totals["pain_points_updated"] += result["updated"]
+            for error in errors[:10]:
+                logger.warning(f"Failed to update {name} {error['id']}: {error['error']}")
+            totals["errors"].extend(errors)
+        return totals
+
+    def _persist_posts(self, posts):
+        """
+        Flush function of the post writer.
+        
+        Returns:
+            tuple: (posts to retry after a transient error, totals)
+        """
+        if self.db is None:
+            # Nothing to save; keep the in-memory aggregates current
+            posts = _unique_by_id(posts)
+            totals = self._apply_aggregates(posts)
+            return [], dict(totals, newly_analyzed=len(posts))
+        
+        result = self.save_posts_bulk(posts)
+        retry_ids = {error["id"] for error in result["errors"] if error.get("transient")}
+        errors = [error for error in result["errors"] if not error.get("transient")]
+        
+        saved_ids = set(result["saved_ids"])
+        self.analyzed_posts.extend(post for post in posts if getattr(post, 'id', None) in saved_ids)
+        
+        # One post per id (the last one queued, as saved): a post queued twice is aggregated once
+        newly_analyzed = set(result["newly_analyzed_ids"])
+        totals = self._apply_aggregates(
+            [post for post in _unique_by_id(posts) if getattr(post, 'id', None) in newly_analyzed]
+        )
+        totals["errors"] = errors + totals["errors"]
+        totals.update(saved=result["saved"], written=result["written"], newly_analyzed=len(newly_analyzed))
+        return [post for post in posts if getattr(post, 'id', None) in retry_ids], totals
+
     def save_recommendations(self, product, recommendations):
         """Save recommendations to database"""
         if self.db is None:
@@ -189,6 +743,26 @@ class MongoDBStore:
             logger.error(f"Error saving recommendations: {str(e)}")
             return False
     
+    def _pain_point_document(self, pain_point):
+        """
+        Build the MongoDB document for a pain point.
+
+        Returns:
+            tuple: (pain_id, document)
+        """
+        # Convert pain point object to dictionary if needed
+        pain_data = pain_point.to_dict() if hasattr(pain_point, 'to_dict') else pain_point
+        
+        # Add timestamp if not present
+        if 'created_at' not in pain_data:
+            pain_data['created_at'] = datetime.utcnow()
+        
+        # Use custom ID or derive a stable one from product and topic/name
+        pain_id = (pain_data.get('id') or pain_data.get('_id')
+                   or f"{pain_data.get('product')}_{pain_data.get('topic') or pain_data.get('name')}")
+        pain_data['_id'] = pain_id
+        return pain_id, pain_data
+
     def save_pain_point(self, pain_point):
         """Save pain point to database and local cache"""
         # Fix the comparison with None instead of bool testing
@@ -197,19 +771,10 @@ class MongoDBStore:
             return False
         
         try:
-            # Convert pain point object to dictionary if needed
-            pain_data = pain_point.to_dict() if hasattr(pain_point, 'to_dict') else pain_point
-            
-            # Add timestamp if not present
-            if 'created_at' not in pain_data:
-                pain_data['created_at'] = datetime.utcnow()
-            
-            # Use custom ID or generate one
-            pain_id = pain_data.get('id', str(hash(f"{pain_data['product']}_{pain_data['topic']}")))
-            pain_data['_id'] = pain_id
+            pain_id, pain_data = self._pain_point_document(pain_point)
             
             # Update local cache
-            self.pain_points[pain_id] = pain_point
+            self._pain_points.publish({pain_id: pain_point})
             
             # Insert or update in database
             result = self.db.pain_points.update_one(
@@ -217,12 +782,455 @@ class MongoDBStore:
                 {"$set": pain_data},
                 upsert=True
             )
+            self.increment_status_counters(pain_points=int(result.upserted_id is not None))
             
             return True
         except Exception as e:
             logger.error(f"Error saving pain point: {str(e)}")
             return False
+
+    def save_pain_points_bulk(self, pain_points, batch_size=None):
+        """
+        Upsert many pain points with unordered bulk writes and update the local cache.
+        
+        Args:
+            pain_points (list): PainPoint objects or pain point dicts
+            batch_size (int): Documents per bulk_write call (default: MONGODB_BULK_BATCH_SIZE)
+            
+        Returns:
+            dict: saved (count), saved_ids and errors (list of {"id", "error"} per failed pain point)
+        """
+        if self.db is None:
+            logger.error("Cannot save pain points: Database connection not established")
+            return {"saved": 0, "saved_ids": [], "errors": [{"id": None, "error": "Database connection not established"}]}
+        
+        documents, errors = [], []
+        for pain_point in pain_points:
+            try:
+                pain_id, pain_data = self._pain_point_document(pain_point)
+            except Exception as e:
+                errors.append({"id": None, "error": str(e)})
+                continue
+            documents.append((pain_id, pain_data, pain_point))
+        
+        result = self._bulk_upsert(self.db.pain_points, documents, batch_size)
+        errors.extend(result["errors"])
+        
+        self._pain_points.publish({pain_id: pain_point for pain_id, _, pain_point in result["saved"]})
+        self.increment_status_counters(pain_points=result["inserted"])
+        
+        saved_ids = [pain_id for pain_id, _, _ in result["saved"]]
+        logger.info(f"Bulk saved {len(saved_ids)}/{len(pain_points)} pain points ({len(errors)} errors)")
+        return {"saved": len(saved_ids), "saved_ids": saved_ids, "errors": errors}
+
+    def apply_pain_point_rollups(self, posts, batch_size=None):
+        """
+        Add newly analyzed posts to the incremental pain-point aggregates.
+        
+        Each post must be passed once, when it is first analyzed (see
+        save_posts_bulk's newly_analyzed_ids); its pain points, products and
+        sentiment are added to the stored aggregates with one $inc upsert per
+        (pain point, product) key, and the cache entries for those keys are
+        refreshed. Without a database the in-memory cache is updated instead.
+        
+        Args:
+            posts (list): Newly analyzed posts
+            batch_size (int): Updates per bulk_write call (default: MONGODB_BULK_BATCH_SIZE)
+            
+        Returns:
+            dict: updated (number of pain point aggregates touched) and errors
+        """
+        if self.db is None:
+            posts = [post for post in posts if post.id not in self._rolled_up_post_ids]
+            self._rolled_up_post_ids.update(post.id for post in posts)
+        
+        rollups = collect_rollups(posts)
+        if not rollups:
+            return {"updated": 0, "errors": []}
+        
+        if self.db is None:
+            # Update copies: published pain points are never mutated
+            current = self._pain_points.snapshot
+            self._pain_points.publish({
+                key: apply_to_pain_point(copy.copy(current[key]), rollup) if key in current else new_pain_point(rollup)
+                for key, rollup in rollups.items()
+            })
+            return {"updated": len(rollups), "errors": []}
+        
+        now = datetime.utcnow()
+        keys = list(rollups)
+        result = self._bulk_update(
+            self.db.pain_points, [(key, rollup_update(rollups[key], now)) for key in keys], batch_size
+        )
+        errors = result["errors"]
+        self.increment_status_counters(pain_points=result["inserted"])
+        
+        # Refresh the cached aggregates that changed, published together
+        refreshed = {}
+        try:
+            step = batch_size or BULK_BATCH_SIZE
+            for start in range(0, len(keys), step):
+                for document in self.db.pain_points.find({"_id": {"$in": keys[start:start + step]}}):
+                    refreshed[document["_id"]] = pain_point_from_document(document)
+        except Exception as e:
+            logger.error(f"Error refreshing pain point cache: {str(e)}")
+        self._pain_points.publish(refreshed)
+        
+        logger.info(f"Applied {len(posts)} posts to {len(rollups)} pain point aggregates ({len(errors)} errors)")
+        return {"updated": len(rollups) - len(errors), "errors": errors}
+
+    def apply_time_series(self, posts, batch_size=None):
+        """
+        Add newly analyzed posts to the daily and hourly pain point / sentiment series.
+        
+        Like apply_pain_point_rollups, each post must be passed once, when it is
+        first analyzed. Without a database nothing is stored; trends are then
+        computed from the in-memory posts.
+        
+        Args:
+            posts (list): Newly analyzed posts
+            batch_size (int): Updates per bulk_write call (default: MONGODB_BULK_BATCH_SIZE)
+            
+        Returns:
+            dict: updated (number of buckets touched) and errors
+        """
+        if self.db is None:
+            return {"updated": 0, "errors": []}
+        
+        buckets = collect_buckets(posts)
+        result = self._bulk_update(
+            self.db.pain_point_series, [(key, bucket_update(bucket)) for key, bucket in buckets.items()], batch_size
+        )
+        logger.info(f"Applied {len(posts)} posts to {len(buckets)} series buckets ({len(result['errors'])} errors)")
+        return {"updated": len(buckets) - len(result["errors"]), "errors": result["errors"]}
+
+    def apply_spike_detection(self, posts, batch_size=None):
+        """
+        Feed newly analyzed posts to the streaming spike detector.
+        
+        Like apply_pain_point_rollups, each post must be passed once, when it
+        is first analyzed. The states of the series the batch touches are read
+        with one $in query, updated in O(1) per post and pain point, and
+        written back with $set upserts. Scrapes run one at a time, so the
+        read-modify-write needs no locking. Without a database the states are
+        kept in spike_states.
+        
+        Args:
+            posts (list): Newly analyzed posts
+            batch_size (int): Updates per bulk_write call (default: MONGODB_BULK_BATCH_SIZE)
+            
+        Returns:
+            dict: updated (number of series touched), anomalous (keys of the
+            touched series now spiking) and errors
+        """
+        if self.db is None:
+            posts = [post for post in posts if post.id not in self._spike_post_ids]
+            self._spike_post_ids.update(post.id for post in posts)
+            changed = self.spike_detector.update(self.spike_states, posts)
+            anomalous = sorted(key for key in changed if self.spike_states[key].anomalous)
+            return {"updated": len(changed), "anomalous": anomalous, "errors": []}
+        
+        keys = sorted({event[0] for event in self.spike_detector.events(posts)})
+        if not keys:
+            return {"updated": 0, "anomalous": [], "errors": []}
+        
+        states = {}
+        try:
+            step = batch_size or BULK_BATCH_SIZE
+            for start in range(0, len(keys), step):
+                for document in self.db.pain_point_spikes.find({"_id": {"$in": keys[start:start + step]}}):
+                    states[document["_id"]] = SeriesState.from_document(document)
+        except Exception as e:
+            logger.error(f"Error loading spike detector state: {str(e)}")
+            return {"updated": 0, "anomalous": [],
+                    "errors": [{"id": key, "error": str(e), "transient": is_transient(e)} for key in keys]}
+        
+        changed = sorted(self.spike_detector.update(states, posts))
+        now = datetime.utcnow()
+        result = self._bulk_update(
+            self.db.pain_point_spikes,
+            [(key, {"$set": dict(states[key].to_document(), updated_at=now)}) for key in changed],
+            batch_size
+        )
+        failed = {error["id"] for error in result["errors"]}
+        anomalous = [key for key in changed if states[key].anomalous and key not in failed]
+        if anomalous:
+            logger.warning(f"Pain point spikes detected: {', '.join(anomalous)}")
+        logger.info(f"Applied {len(posts)} posts to {len(changed)} spike detector series "
+                    f"({len(result['errors'])} errors)")
+        return {"updated": len(changed) - len(failed), "anomalous": anomalous, "errors": result["errors"]}
+
+    def _bulk_update(self, collection, updates, batch_size=None):
+        """
+        Apply (id, update document) pairs as unordered upserts.
+        
+        Returns:
+            dict: inserted (documents created) and errors (list of {"id", "error"})
+        """
+        batch_size = batch_size or BULK_BATCH_SIZE
+        errors, inserted = [], 0
+        for start in range(0, len(updates), batch_size):
+            batch = updates[start:start + batch_size]
+            operations = [UpdateOne({"_id": doc_id}, update, upsert=True) for doc_id, update in batch]
+            try:
+                inserted += collection.bulk_write(operations, ordered=False).upserted_count
+            except BulkWriteError as e:
+                inserted += e.details.get("nUpserted", 0)
+                errors.extend({"id": batch[write_error["index"]][0], "error": write_error.get("errmsg", "")}
+                              for write_error in e.details.get("writeErrors", []))
+            except Exception as e:
+                logger.error(f"Error in bulk update of {collection.name}: {str(e)}")
+                errors.extend({"id": doc_id, "error": str(e), "transient": is_transient(e)} for doc_id, _ in batch)
+        return {"inserted": inserted, "errors": errors}
+
+    def _bulk_upsert(self, collection, documents, batch_size=None):
+        """
+        Upsert (id, document, source) triples with unordered bulk_write calls.
+        
+        Unordered batches keep going past failing documents; each failure is
+        reported with its ID instead of failing the whole batch.
+        
+        Returns:
+            dict: saved (triples written), inserted (how many of them were new)
+            and errors (list of {"id", "error"})
+        """
+        batch_size = batch_size or BULK_BATCH_SIZE
+        saved, errors = [], []
+        inserted = 0
+        for start in range(0, len(documents), batch_size):
+            batch = documents[start:start + batch_size]
+            operations = [UpdateOne({"_id": doc_id}, {"$set": data}, upsert=True) for doc_id, data, _ in batch]
+            failed = set()
+            try:
+                inserted += collection.bulk_write(operations, ordered=False).upserted_count
+            except BulkWriteError as e:
+                inserted += e.details.get("nUpserted", 0)
+                for write_error in e.details.get("writeErrors", []):
+                    failed.add(write_error["index"])
+                    errors.append({"id": batch[write_error["index"]][0], "error": write_error.get("errmsg", "")})
+            except Exception as e:
+                logger.error(f"Error in bulk write to {collection.name}: {str(e)}")
+                failed = set(range(len(batch)))
+                errors.extend({"id": doc_id, "error": str(e)} for doc_id, _, _ in batch)
+            saved.extend(doc for index, doc in enumerate(batch) if index not in failed)
+        return {"saved": saved, "inserted": inserted, "errors": errors}
     
+    def _stored_posts(self, post_ids):
+        """
+        Fingerprint, sentiment and products of the stored posts among post_ids (id -> partial document).
+        
+        Posts moved to the archive (see post_archive) are found by their stub,
+        which carries archived_at.
+        """
+        stored = {}
+        for start in range(0, len(post_ids), BULK_BATCH_SIZE):
+            chunk = post_ids[start:start + BULK_BATCH_SIZE]
+            for document in self.db.posts.find({"_id": {"$in": chunk}},
+                                               {FINGERPRINT_FIELD: 1, "sentiment": 1, "products": 1}):
+                stored[document["_id"]] = document
+            missing = [post_id for post_id in chunk if post_id not in stored]
+            if missing:
+                for stub in self.db.archived_posts.find({"_id": {"$in": missing}},
+                                                        {FINGERPRINT_FIELD: 1, "sentiment": 1, "archived_at": 1}):
+                    stored[stub["_id"]] = stub
+        return stored
+
+    def increment_status_counters(self, **deltas):
+        """
+        Add to the maintained status counters.
+        
+        Called by the save methods with what their writes changed (new
+        documents from the upsert results, posts that gained a sentiment
+        score). Drift, e.g. from concurrent writers or manual edits, is
+        corrected by reconcile_status_counters().
+        
+        Args:
+            **deltas: Counter name -> increment (posts, analyzed_posts, pain_points, openai_analyses)
+        """
+        deltas = {name: delta for name, delta in deltas.items() if delta}
+        if not deltas or self.db is None:
+            return
+        try:
+            self.db.metadata.update_one({"_id": STATUS_COUNTERS_ID}, {"$inc": deltas}, upsert=True)
+        except Exception as e:
+            logger.error(f"Error updating status counters: {str(e)}")
+
+    def reconcile_status_counters(self):
+        """
+        Recount the status counters from the collections and store them.
+        
+        Returns:
+            dict: The recounted counters, or None if the database is unavailable
+        """
+        if self.db is None:
+            logger.error("Cannot reconcile status counters: Database connection not established")
+            return None
+        
+        with self._reconcile_lock:
+            try:
+                # Archived posts (post_archive) still count
+                counters = {
+                    "posts": self.db.posts.count_documents({}) + self.db.archived_posts.count_documents({}),
+                    "analyzed_posts": (self.db.posts.count_documents(ANALYZED_POSTS_FILTER)
+                                       + self.db.archived_posts.count_documents(ANALYZED_POSTS_FILTER)),
+                    "pain_points": self.db.pain_points.count_documents({}),
+                    "openai_analyses": self.db.openai_analysis.count_documents({}),
+                }
+                self.db.metadata.update_one(
+                    {"_id": STATUS_COUNTERS_ID},
+                    {"$set": dict(counters, reconciled_at=datetime.utcnow())},
+                    upsert=True
+                )
+                logger.info(f"Reconciled status counters: {counters}")
+                return counters
+            except Exception as e:
+                logger.error(f"Error reconciling status counters: {str(e)}")
+                return None
+
+    def get_status_counters(self):
+        """
+        Read the maintained status counters (a single document read).
+        
+        The first read reconciles them if they were never counted, and a read
+        after STATUS_RECONCILE_SECONDS starts a background reconciliation.
+        
+        Returns:
+            dict: posts, analyzed_posts, pain_points and openai_analyses counts,
+            or None if the database is unavailable
+        """
+        if self.db is None:
+            return None
+        
+        counters = self.db.metadata.find_one({"_id": STATUS_COUNTERS_ID})
+        if not counters or "reconciled_at" not in counters:
+            return self.reconcile_status_counters()
+        
+        age = (datetime.utcnow() - counters["reconciled_at"]).total_seconds()
+        if age > STATUS_RECONCILE_SECONDS and not self._reconcile_lock.locked():
+            threading.Thread(target=self.reconcile_status_counters, daemon=True).start()
+        
+        return {name: counters.get(name, 0) for name in ("posts", "analyzed_posts", "pain_points", "openai_analyses")}
+
+    def update_product_catalog(self, changes):
+        """
+        Apply post writes to the maintained product catalog.
+        
+        Each changed product gets one upsert: $inc of its post count by the
+        posts that gained it minus those that lost it, and $max of its newest
+        post date. Drift (e.g. a product removed from the newest post) is
+        corrected by reconcile_product_catalog().
+        
+        Args:
+            changes (iterable): (products before or None, products after or None, created_utc) per written
+                or deleted post
+        """
+        if self.db is None:
+            return
+        deltas, names, last_seen = {}, {}, {}
+        for before, after, created in changes:
+            before, after = catalog_names(before), catalog_names(after)
+            for key in before.keys() - after.keys():
+                deltas[key] = deltas.get(key, 0) - 1
+            for key, name in after.items():
+                names.setdefault(key, name)
+                if key not in before:
+                    deltas[key] = deltas.get(key, 0) + 1
+                if isinstance(created, datetime) and (key not in last_seen or created > last_seen[key]):
+                    last_seen[key] = created
+        
+        updates = []
+        for key in sorted(deltas.keys() | last_seen.keys()):
+            update = {}
+            if deltas.get(key):
+                update["$inc"] = {"post_count": deltas[key]}
+            if key in last_seen:
+                update["$max"] = {"last_seen": last_seen[key]}
+            if update:
+                update["$setOnInsert"] = {"name": names.get(key, key)}
+                updates.append((key, update))
+        if not updates:
+            return
+        result = self._bulk_update(self.db.product_catalog, updates)
+        for error in result["errors"][:10]:
+            logger.warning(f"Failed to update product catalog entry {error['id']}: {error['error']}")
+
+    def reconcile_product_catalog(self):
+        """
+        Recount the product catalog from the posts (one aggregation over the collection).
+        
+        Returns:
+            int: Products in the catalog, or None if the database is unavailable
+        """
+        if self.db is None:
+            logger.error("Cannot reconcile product catalog: Database connection not established")
+            return None
+        
+        with self._catalog_lock:
+            try:
+                entries = list(self.db.posts.aggregate(self.product_catalog_pipeline()))
+                self._bulk_update(self.db.product_catalog, [
+                    (entry["_id"], {"$set": {"name": entry["name"], "post_count": entry["post_count"],
+                                             "last_seen": entry["last_seen"]}})
+                    for entry in entries
+                ])
+                self.db.product_catalog.delete_many({"_id": {"$nin": [entry["_id"] for entry in entries]}})
+                self.db.metadata.update_one({"_id": PRODUCT_CATALOG_ID},
+                                            {"$set": {"reconciled_at": datetime.utcnow()}}, upsert=True)
+                logger.info(f"Reconciled product catalog: {len(entries)} products")
+                return len(entries)
+            except Exception as e:
+                logger.error(f"Error reconciling product catalog: {str(e)}")
+                return None
+
+    def get_product_catalog(self):
+        """
+        Every product with posts, read from the maintained catalog.
+        
+        One indexed find on product_catalog, plus one $in query each on
+        openai_analysis and recommendations (by _id or product, as they are
+        keyed) for the analysis status. The first read recounts the catalog if
+        it was never counted, and a read after PRODUCT_CATALOG_RECONCILE_SECONDS
+        starts a background recount.
+        
+        Returns:
+            list: name, has_analysis, has_recommendations, post_count and last_seen per product,
+            sorted by name, or None if the database is unavailable
+        """
+        if self.db is None:
+            return None
+        
+        reconciled = self.db.metadata.find_one({"_id": PRODUCT_CATALOG_ID})
+        if not reconciled or "reconciled_at" not in reconciled:
+            self.reconcile_product_catalog()
+        elif ((datetime.utcnow() - reconciled["reconciled_at"]).total_seconds() > PRODUCT_CATALOG_RECONCILE_SECONDS
+              and not self._catalog_lock.locked()):
+            threading.Thread(target=self.reconcile_product_catalog, daemon=True).start()
+        
+        entries = list(self.db.product_catalog.find(
+            {"post_count": {"$gt": 0}}, {"name": 1, "post_count": 1, "last_seen": 1}
+        ).sort("name", ASCENDING))
+        keys = [entry["_id"] for entry in entries]
+        
+        def keyed(collection):
+            found = set()
+            for document in collection.find({"$or": [{"_id": {"$in": keys}}, {"product": {"$in": keys}}]},
+                                            {"product": 1}):
+                found.update((document.get("_id"), document.get("product")))
+            return found
+        
+        analyzed = keyed(self.db.openai_analysis) if keys else set()
+        recommended = keyed(self.db.recommendations) if keys else set()
+        return [
+            {
+                "name": entry["name"],
+                "has_analysis": entry["_id"] in analyzed,
+                "has_recommendations": entry["_id"] in recommended,
+                "post_count": entry["post_count"],
+                "last_seen": entry.get("last_seen"),
+            }
+            for entry in entries
+        ]
+
     def save_openai_analysis(self, product, analysis):
         """Save OpenAI analysis to database"""
         if self.db is None:
@@ -249,17 +1257,75 @@ class MongoDBStore:
                 {"$set": analysis_data},
                 upsert=True
             )
+            self.increment_status_counters(openai_analyses=int(result.upserted_id is not None))
             
             logger.info(f"Saved OpenAI analysis for {product}")
             
             # Update local cache with original product name as key
-            self.openai_analyses[product] = analysis
+            self._openai_analyses.publish({product: analysis})
             
             return True
         except Exception as e:
             logger.error(f"Error saving OpenAI analysis: {str(e)}")
             return False
     
+    def save_post_signatures(self, signatures):
+        """
+        Persist MinHash signatures and LSH band keys for near-duplicate detection
+        
+        Args:
+            signatures (list): Dicts with _id, signature (numpy uint32 array), bands and cluster_id
+        """
+        if self.db is None:
+            logger.error("Cannot save post signatures: Database connection not established")
+            return False
+        
+        try:
+            operations = [
+                UpdateOne(
+                    {"_id": doc["_id"]},
+                    {"$set": {
+                        "signature": Binary(np.asarray(doc["signature"], dtype=np.uint32).tobytes()),
+                        "bands": doc["bands"],
+                        "cluster_id": doc["cluster_id"],
+                        "updated_at": datetime.utcnow()
+                    }},
+                    upsert=True
+                )
+                for doc in signatures
+            ]
+            if operations:
+                self.db.post_signatures.bulk_write(operations, ordered=False)
+            return True
+        except Exception as e:
+            logger.error(f"Error saving post signatures: {str(e)}")
+            return False
+    
+    def find_signature_candidates(self, band_keys, chunk_size=5000):
+        """
+        Find stored posts sharing at least one LSH band with the given keys
+        
+        Args:
+            band_keys (list): LSH band keys to look up
+            chunk_size (int): Maximum keys per $in query
+            
+        Returns:
+            list: Candidate dicts with _id, signature (numpy uint32 array), bands and cluster_id
+        """
+        if self.db is None:
+            return []
+        
+        candidates = {}
+        try:
+            for start in range(0, len(band_keys), chunk_size):
+                cursor = self.db.post_signatures.find({"bands": {"$in": band_keys[start:start + chunk_size]}})
+                for doc in cursor:
+                    doc["signature"] = np.frombuffer(doc["signature"], dtype=np.uint32)
+                    candidates[doc["_id"]] = doc
+        except Exception as e:
+            logger.error(f"Error querying post signatures: {str(e)}")
+        return list(candidates.values())
+    
     def load_pain_points(self):
         """Load pain points from database to local cache"""
         # Fix the comparison with None instead of bool testing
@@ -268,18 +1334,15 @@ class MongoDBStore:
             return
         
         try:
-            # Clear current cache
-            self.pain_points = {}
-            
             # Query all pain points from database
             pain_points_cursor = self.db.pain_points.find({})
             
-            # Rebuild cache
-            for pain_point in pain_points_cursor:
-                pain_id = pain_point['_id']
-                self.pain_points[pain_id] = pain_point
+            # Rebuild cache (avg_sentiment and severity are derived from the stored sums),
+            # replacing the old one in a single swap
+            loaded = {pain_point['_id']: pain_point_from_document(pain_point) for pain_point in pain_points_cursor}
+            self._pain_points.publish(loaded, replace=True)
                 
-            logger.info(f"Loaded {len(self.pain_points)} pain points from database")
+            logger.info(f"Loaded {len(loaded)} pain points from database")
         except Exception as e:
             logger.error(f"Error loading pain points: {str(e)}")
     
@@ -287,4 +1350,15 @@ class MongoDBStore:
         """Close MongoDB connection"""
         if self.client:
             self.client.close()
-            logger.info("Closed MongoDB connection")
\ No newline at end of file
+            logger.info("Closed MongoDB connection")
+
+    def reset_connection(self):
+        """
+        Drop the current client so the next use opens a new connection.
+
+        MongoClient is not fork-safe: call this in a forked child (e.g. a
+        gunicorn worker) so it never reuses the parent's sockets or monitor threads.
+        """
+        self.client = None
+        self._db = None
+        self._connect_attempted = False
\ No newline at end of file
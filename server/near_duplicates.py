@@ -0,0 +1,305 @@
+"""
+Near-duplicate detection for Reddit posts using MinHash + LSH.
+
+Crossposts and copy-pasted complaints show up many times across subreddits
+and search queries. Posts are shingled into word n-grams, summarised as
+MinHash signatures and bucketed with banded LSH; candidate pairs whose
+estimated Jaccard similarity clears the threshold are merged into clusters.
+One representative per cluster is analyzed and carries the cluster size as
+its weight.
+"""
+import hashlib
+import logging
+import re
+import zlib
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Mersenne prime used for the universal hash family (a * x + b) mod p
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+class PostCluster:
+    """A group of near-identical posts with one representative."""
+    def __init__(self, cluster_id, representative, members):
+        self.cluster_id = cluster_id
+        self.representative = representative
+        self.members = members  # includes the representative
+
+    @property
+    def size(self):
+        """Number of posts in the cluster (members are distinct posts)."""
+        return len(self.members)
+
+
+class NearDuplicateDetector:
+    """
+    MinHash/LSH near-duplicate detector.
+
+    With the defaults (128 permutations in 16 bands of 8 rows) pairs above
+    roughly 0.7 Jaccard similarity become LSH candidates, and candidates are
+    then verified against `threshold` using the full signatures.
+    """
+
+    def __init__(self, num_perm: int = 128, bands: int = 16, shingle_size: int = 3,
+                 threshold: float = 0.8, seed: int = 1):
+        if num_perm % bands != 0:
+            raise ValueError("num_perm must be divisible by bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+
+        # Fixed seed so signatures stay comparable with the persisted index
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 1 << 31, size=num_perm, dtype=np.int64).astype(np.uint64)
+        self._b = rng.randint(0, 1 << 31, size=num_perm, dtype=np.int64).astype(np.uint64)
+
+    @staticmethod
+    def post_text(post) -> str:
+        """Title and body of a post (object or Mongo document)."""
+        if isinstance(post, dict):
+            return f"{post.get('title', '')} {post.get('content', '')}"
+        return f"{getattr(post, 'title', '')} {getattr(post, 'content', '')}"
+
+    def shingles(self, text: str) -> np.ndarray:
+        """
+        Hash the word n-gram shingles of a text.
+
+        Args:
+            text: Raw post text
+
+        Returns:
+            Array of unique 32-bit shingle hashes
+        """
+        text = re.sub(r'http\S+|www\.\S+', ' ', (text or '').lower())
+        words = re.findall(r'\w+', text)
+        if not words:
+            return np.empty(0, dtype=np.uint64)
+        k = min(self.shingle_size, len(words))
+        hashes = {
+            zlib.crc32(' '.join(words[i:i + k]).encode('utf-8'))
+            for i in range(len(words) - k + 1)
+        }
+        return np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """
+        Compute the MinHash signature of a text.
+
+        Returns:
+            Array of num_perm uint32 values, or None for texts without words
+        """
+        shingle_hashes = self.shingles(text)
+        if shingle_hashes.size == 0:
+            return None
+        permuted = (np.outer(self._a, shingle_hashes) + self._b[:, None]) % _MERSENNE_PRIME
+        return (permuted & _MAX_HASH).min(axis=1).astype(np.uint32)
+
+    def band_keys(self, signature: np.ndarray) -> List[int]:
+        """
+        LSH bucket keys for a signature, one per band.
+
+        Keys are signed 64-bit integers so they can be stored and indexed in MongoDB.
+        """
+        keys = []
+        for band in range(self.bands):
+            chunk = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            digest = hashlib.blake2b(band.to_bytes(2, 'little') + chunk, digest_size=8).digest()
+            keys.append(int.from_bytes(digest, 'little', signed=True))
+        return keys
+
+    def similarity(self, first: np.ndarray, second: np.ndarray) -> float:
+        """Estimated Jaccard similarity of two signatures."""
+        return float(np.mean(first == second))
+
+    def cluster_posts(self, posts: List, store=None) -> List[PostCluster]:
+        """
+        Group near-identical posts into clusters.
+
+        Posts repeated by id are collapsed first (see unique_posts), then
+        every post ends up in exactly one cluster. The representative is the
+        highest-scoring member, which becomes the cluster id unless the cluster
+        matches posts already in the persisted index, in which case the
+        existing cluster id is reused.
+
+        Args:
+            posts: List of RedditPost objects (or post dicts)
+            store: Optional MongoDBStore used to match against and extend the persisted LSH index
+
+        Returns:
+            list: PostCluster objects in input order of their first member
+        """
+        # The same submission returned by several searches is one post
+        posts = unique_posts(posts)
+        signatures = [self.signature(self.post_text(post)) for post in posts]
+        band_keys = [self.band_keys(sig) if sig is not None else [] for sig in signatures]
+
+        parent = list(range(len(posts)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        # Bucket posts by band key and verify candidate pairs
+        buckets: Dict[int, List[int]] = {}
+        for index, keys in enumerate(band_keys):
+            for key in keys:
+                buckets.setdefault(key, []).append(index)
+
+        # Each member is checked against the components formed so far in its bucket: it joins
+        # every component holding a similar post (or already sharing its root), so clusters do
+        # not depend on arrival order, and a burst of near-identical posts costs one comparison
+        # per post (against its component's first member) rather than one per pair
+        for members in buckets.values():
+            components: List[List[int]] = []
+            for member in members:
+                joined, rest = [], []
+                for component in components:
+                    if find(component[0]) == find(member) or any(
+                            self.similarity(signatures[member], signatures[other]) >= self.threshold
+                            for other in component):
+                        joined.append(component)
+                    else:
+                        rest.append(component)
+                joined.sort(key=len, reverse=True)
+                merged = joined[0] if joined else []
+                for component in joined[1:]:
+                    merged.extend(component)
+                for component in joined:
+                    parent[find(component[0])] = find(member)
+                merged.append(member)
+                components = rest + [merged]
+
+        groups: Dict[int, List[int]] = {}
+        for index in range(len(posts)):
+            groups.setdefault(find(index), []).append(index)
+
+        # Reuse cluster ids of matching posts that were stored by earlier scrapes
+        existing_ids: Dict[int, str] = {}
+        if store is not None:
+            existing_ids = self._match_persisted(store, signatures, band_keys, groups)
+
+        clusters = []
+        signature_docs = []
+        for root, indexes in sorted(groups.items(), key=lambda item: item[1][0]):
+            members = [posts[i] for i in indexes]
+            representative = max(members, key=lambda p: (_field(p, 'score') or 0))
+            cluster_id = existing_ids.get(root) or _field(representative, 'id')
+            clusters.append(PostCluster(cluster_id, representative, members))
+            for i in indexes:
+                if signatures[i] is not None:
+                    signature_docs.append({
+                        '_id': _field(posts[i], 'id'),
+                        'signature': signatures[i],
+                        'bands': band_keys[i],
+                        'cluster_id': cluster_id
+                    })
+
+        if store is not None and signature_docs:
+            store.save_post_signatures(signature_docs)
+
+        duplicates = len(posts) - len(clusters)
+        if duplicates:
+            logger.info(f"Near-duplicate detection: {len(posts)} posts -> {len(clusters)} clusters "
+                        f"({duplicates} duplicates)")
+        return clusters
+
+    def _match_persisted(self, store, signatures, band_keys, groups) -> Dict[int, str]:
+        """Find persisted cluster ids for in-batch groups via the stored LSH index."""
+        all_keys = {key for keys in band_keys for key in keys}
+        if not all_keys:
+            return {}
+        candidates = store.find_signature_candidates(list(all_keys))
+        if not candidates:
+            return {}
+
+        by_band: Dict[int, List[dict]] = {}
+        for candidate in candidates:
+            for key in candidate.get('bands', []):
+                by_band.setdefault(key, []).append(candidate)
+
+        matches = {}
+        for root, indexes in groups.items():
+            for index in indexes:
+                match = self._best_candidate(signatures[index], band_keys[index], by_band)
+                if match:
+                    matches[root] = match
+                    break
+        return matches
+
+    def _best_candidate(self, signature, keys, by_band) -> Optional[str]:
+        """Cluster id of the first stored candidate similar enough to a signature."""
+        if signature is None:
+            return None
+        for key in keys:
+            for candidate in by_band.get(key, []):
+                if self.similarity(signature, candidate['signature']) >= self.threshold:
+                    return candidate.get('cluster_id') or candidate['_id']
+        return None
+
+
+def _field(post, name):
+    """Read a field from a post object or dict."""
+    if isinstance(post, dict):
+        return post.get(name) if name != 'id' else (post.get('id') or post.get('_id'))
+    return getattr(post, name, None)
+
+
+def unique_posts(posts: List) -> List:
+    """
+    Drop repeated posts, keeping the first object for each id.
+
+    A post matching several product searches is returned once per search;
+    posts without an id are all kept.
+    """
+    seen = set()
+    unique = []
+    for post in posts:
+        post_id = _field(post, 'id')
+        if post_id is not None:
+            if post_id in seen:
+                continue
+            seen.add(post_id)
+        unique.append(post)
+    return unique
+
+
+def apply_clusters(clusters: List[PostCluster]) -> List:
+    """
+    Annotate posts with their cluster and return one representative per cluster.
+
+    Every member gets `cluster_id`; the representative's `duplicate_count` is the
+    cluster size and the other members get 0 so weighted aggregates count each
+    cluster exactly once at its full weight.
+
+    Returns:
+        list: Representative posts
+    """
+    representatives = []
+    for cluster in clusters:
+        for member in cluster.members:
+            member.cluster_id = cluster.cluster_id
+            member.duplicate_count = 0
+        cluster.representative.duplicate_count = cluster.size
+        representatives.append(cluster.representative)
+    return representatives
+
+
+def propagate_analysis(clusters: List[PostCluster],
+                       fields=('sentiment', 'sentiment_label', 'topics', 'pain_points', 'products')):
+    """Copy analysis results from each representative onto its duplicates."""
+    for cluster in clusters:
+        for member in cluster.members:
+            if member is cluster.representative:
+                continue
+            for name in fields:
+                if hasattr(cluster.representative, name):
+                    setattr(member, name, getattr(cluster.representative, name))
@@ -1,17 +1,11 @@
-import nltk
 import logging
 import re
-
-# Download necessary NLTK data
-nltk.download('vader_lexicon', quiet=True)
-nltk.download('punkt', quiet=True)
-nltk.download('stopwords', quiet=True)
-nltk.download('punkt_tab')
-from nltk.sentiment import SentimentIntensityAnalyzer
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
 from collections import Counter
+from functools import cached_property
 from models import PainPoint
+from pain_point_matrix import incidence_matrix, group_columns, pair_columns, PainPointAggregates
+from fast_tokenizer import get_tokenizer
+from nltk_resources import get_sentiment_analyzer, get_stopwords
 from app import data_store
 
 
@@ -22,9 +16,8 @@ class NLPAnalyzer:
     Uses NLP techniques to analyze Reddit posts and identify pain points.
     """
     
-    def __init__(self):
-        self.sia = SentimentIntensityAnalyzer()
-        self.stop_words = set(stopwords.words('english'))
+    def __init__(self, tokenizer=None):
+        self.tokenizer = get_tokenizer(tokenizer)
         
         # Keywords that might indicate pain points
         self.pain_point_indicators = [
@@ -44,6 +37,16 @@ class NLPAnalyzer:
             'reliability': ['bug', 'error', 'crash', 'stable', 'unstable', 'reliable', 'consistency'],
             'usability': ['difficult', 'confusing', 'intuitive', 'learn', 'usability', 'workflow', 'productivity']
         }
+
+    @cached_property
+    def sia(self):
+        """VADER analyzer, loaded from the bundled NLTK data on first use."""
+        return get_sentiment_analyzer()
+
+    @cached_property
+    def stop_words(self):
+        """English stopwords, loaded from the bundled NLTK data on first use."""
+        return set(get_stopwords('english'))
         
     def analyze_sentiment(self, text):
         """
@@ -77,7 +80,7 @@ class NLPAnalyzer:
             return []
             
         # Tokenize and clean
-        words = word_tokenize(text.lower())
+        words = self.tokenizer.word_tokenize(text.lower())
         words = [word for word in words if word.isalnum() and len(word) >= min_length and word not in self.stop_words]
         
         # Count occurrences
@@ -146,61 +149,82 @@ class NLPAnalyzer:
         """
         logger.info(f"Starting categorize_pain_points for {len(posts)} posts")
         
-        pain_point_map = {}
-        
+        texts = []
         for idx, post in enumerate(posts):
             if (idx + 1) % 100 == 0:
                 logger.info(f"Processing post {idx + 1}/{len(posts)}")
             
-            # Analyze sentiment
-            post.sentiment = self.analyze_sentiment(f"{post.title} {post.content}")
-            
-            # Identify pain points
-            post.pain_points = self.identify_pain_points(post)
+            full_text = f"{post.title} {post.content}"
             
-            # Get all matching products for this post
-            matching_products = self.get_product_from_post(post, products)
+            # Analyze sentiment
+            post.sentiment = self.analyze_sentiment(full_text)
             
             # Extract topics/keywords
-            post.topics = self.extract_keywords(f"{post.title} {post.content}")
+            post.topics = self.extract_keywords(full_text)
             
-            # Only process posts that mention pain points and matched products
-            if post.pain_points and matching_products:
-                for pain_point in post.pain_points:
-                    try:
-                        category, indicator = pain_point.split(":", 1)
-                    except ValueError:
-                        logger.warning(f"Skipping malformed pain point: {pain_point}")
-                        continue
-
-                    base_key = f"{category}:{indicator}"
-                    
-                    for product in matching_products:
-                        product_key = f"{base_key}:{product}"
-                        
-                        if product_key not in pain_point_map:
-                            description = f"Issues with {category} described as '{indicator}' in {product}"
-                            pain_point_map[product_key] = PainPoint(
-                                name=f"{category.title()}: {indicator}",
-                                description=description,
-                                product=product
-                            )
-                        
-                        pain_point_obj = pain_point_map[product_key]
-                        pain_point_obj.frequency += 1
-                        pain_point_obj.related_posts.append(post.id)
-                        
-                        current_total = pain_point_obj.avg_sentiment * (len(pain_point_obj.related_posts) - 1)
-                        pain_point_obj.avg_sentiment = (current_total + post.sentiment) / len(pain_point_obj.related_posts)
-                        
-                        pain_point_obj.calculate_severity()
+            texts.append(full_text.lower())
+        
+        # Sparse post x term matrices, built in one pass over the texts
+        indicators = self.pain_point_indicators
+        categories = list(self.pain_point_categories)
+        keywords = [keyword.lower() for category in categories for keyword in self.pain_point_categories[category]]
+        keyword_groups, offset = [], 0
+        for category in categories:
+            count = len(self.pain_point_categories[category])
+            keyword_groups.append(range(offset, offset + count))
+            offset += count
+        
+        indicator_matrix = incidence_matrix(texts, [indicator.lower() for indicator in indicators])
+        category_matrix = group_columns(incidence_matrix(texts, keywords), keyword_groups)
+        # Column category_index * len(indicators) + indicator_index, i.e. "category:indicator"
+        pain_matrix = pair_columns(category_matrix, indicator_matrix)
+        product_matrix = incidence_matrix(texts, [product.lower() for product in products])
+        
+        def column_label(col):
+            return categories[col // len(indicators)], indicators[col % len(indicators)]
+        
+        # Identify pain points
+        for row, post in enumerate(posts):
+            columns = pain_matrix.indices[pain_matrix.indptr[row]:pain_matrix.indptr[row + 1]]
+            post.pain_points = [":".join(column_label(col)) for col in columns]
+        
+        # Near-duplicate representatives count for their whole cluster
+        aggregates = PainPointAggregates(
+            pain_matrix,
+            [post.sentiment for post in posts],
+            [getattr(post, 'duplicate_count', 1) for post in posts]
+        )
+        breakdown = aggregates.by_group(product_matrix)
+        
+        pain_point_map = {}
+        for product_index, product in enumerate(products):
+            frequencies = breakdown['frequency'].getrow(product_index)
+            if frequencies.nnz == 0:
+                continue
+            sentiment_sums = breakdown['sentiment_sum'].getrow(product_index).toarray().ravel()
+            product_mask = product_matrix.getcol(product_index).toarray().ravel() > 0
+            related_rows = aggregates.rows_by_column(product_mask)
+            
+            for col, frequency in zip(frequencies.indices, frequencies.data):
+                if frequency <= 0:
+                    continue
+                category, indicator = column_label(col)
+                pain_point_obj = PainPoint(
+                    name=f"{category.title()}: {indicator}",
+                    description=f"Issues with {category} described as '{indicator}' in {product}",
+                    frequency=int(frequency),
+                    avg_sentiment=float(sentiment_sums[col] / frequency),
+                    related_posts=[posts[row].id for row in related_rows[col]],
+                    product=product
+                )
+                pain_point_obj.calculate_severity()
+                pain_point_map[f"{category}:{indicator}:{product}"] = pain_point_obj
         
         logger.info(f"Finalized pain point map: {len(pain_point_map)} unique pain points")
         
-        # Add to data store
-        data_store.pain_points = pain_point_map
-        data_store.analyzed_posts = posts
-        logger.info("Data store updated with pain points")
+        # Pain points are persisted incrementally from the analyzed posts
+        # (MongoDBStore.apply_pain_point_rollups), not replaced per batch
+        data_store.analyzed_posts.extend(posts)
 
         return pain_point_map
 
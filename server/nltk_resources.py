@@ -0,0 +1,158 @@
+"""
+NLTK resource manager.
+
+NLTK data (VADER lexicon, stopwords, Punkt tables, WordNet) is resolved from a
+single pinned directory that is bundled with the deployment, and every
+resource is loaded lazily on first use. Nothing is ever downloaded at import
+or request time: a missing resource raises NLTKResourceError naming the
+command that bundles it (scripts/fetch_nltk_data.py, run at build time).
+
+The directory defaults to server/nltk_data and can be overridden with the
+NLTK_DATA_DIR environment variable.
+"""
+import os
+import logging
+import threading
+from functools import lru_cache
+from typing import Dict, FrozenSet, List
+
+logger = logging.getLogger(__name__)
+
+NLTK_DATA_DIR = os.getenv(
+    'NLTK_DATA_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'nltk_data')
+)
+
+# NLTK package name -> resource path checked inside the data directory
+NLTK_RESOURCES: Dict[str, str] = {
+    'vader_lexicon': 'sentiment/vader_lexicon.zip',
+    'stopwords': 'corpora/stopwords',
+    'punkt_tab': 'tokenizers/punkt_tab/english',
+    'wordnet': 'corpora/wordnet',
+}
+
+# Resources the analyzers cannot work without (wordnet is only needed for lemmatization)
+REQUIRED_RESOURCES = ('vader_lexicon', 'stopwords', 'punkt_tab')
+
+_configure_lock = threading.Lock()
+_configured = False
+
+
+class NLTKResourceError(LookupError):
+    """Raised when a bundled NLTK resource is missing."""
+
+    def __init__(self, name: str, data_dir: str):
+        self.name = name
+        self.data_dir = data_dir
+        super().__init__(
+            f"NLTK resource '{name}' not found in {data_dir}. Bundle it at build time with "
+            f"'python scripts/fetch_nltk_data.py' (or point NLTK_DATA_DIR at a directory that has it); "
+            f"resources are never downloaded at runtime."
+        )
+
+
+def configure():
+    """Pin NLTK's search path to the bundled data directory (idempotent)."""
+    global _configured
+    if _configured:
+        return
+    with _configure_lock:
+        if _configured:
+            return
+        import nltk
+        nltk.data.path[:] = [NLTK_DATA_DIR]
+        _configured = True
+        logger.debug(f"NLTK data path pinned to {NLTK_DATA_DIR}")
+
+
+@lru_cache(maxsize=None)
+def require(name: str) -> str:
+    """
+    Make sure a bundled NLTK resource is available.
+
+    Args:
+        name: NLTK package name (a key of NLTK_RESOURCES)
+
+    Returns:
+        str: Resolved path of the resource
+
+    Raises:
+        NLTKResourceError: If the resource is not in the data directory
+    """
+    configure()
+    import nltk
+    try:
+        return str(nltk.data.find(NLTK_RESOURCES[name]))
+    except LookupError:
+        raise NLTKResourceError(name, NLTK_DATA_DIR) from None
+
+
+def missing_resources(names=REQUIRED_RESOURCES) -> List[str]:
+    """
+    List resources that are not bundled, without raising.
+
+    Args:
+        names: Package names to check
+
+    Returns:
+        list: Names of the missing resources
+    """
+    missing = []
+    for name in names:
+        try:
+            require(name)
+        except NLTKResourceError:
+            missing.append(name)
+    return missing
+
+
+@lru_cache(maxsize=None)
+def get_sentiment_analyzer():
+    """Shared VADER SentimentIntensityAnalyzer, loaded on first use."""
+    require('vader_lexicon')
+    from nltk.sentiment import SentimentIntensityAnalyzer
+    return SentimentIntensityAnalyzer()
+
+
+@lru_cache(maxsize=None)
+def get_stopwords(language: str = 'english') -> FrozenSet[str]:
+    """Stopword list for a language, loaded on first use."""
+    require('stopwords')
+    from nltk.corpus import stopwords
+    return frozenset(stopwords.words(language))
+
+
+@lru_cache(maxsize=None)
+def get_lemmatizer():
+    """Shared WordNetLemmatizer, loaded on first use."""
+    require('wordnet')
+    from nltk.stem import WordNetLemmatizer
+    return WordNetLemmatizer()
+
+
+
+def warm_resources() -> List[str]:
+    """
+    Load every bundled resource now instead of on first use.
+
+    Used to pre-load NLTK data in the gunicorn master before forking so
+    workers share it. Missing optional resources are logged and skipped.
+
+    Returns:
+        list: Names of the resources that were loaded
+    """
+    loaded = []
+    loaders = {
+        'vader_lexicon': get_sentiment_analyzer,
+        'stopwords': get_stopwords,
+        # WordNet is read lazily by NLTK, so lemmatize once to pull it in
+        'wordnet': lambda: get_lemmatizer().lemmatize('posts'),
+        'punkt_tab': lambda: require('punkt_tab'),
+    }
+    for name, load in loaders.items():
+        try:
+            load()
+            loaded.append(name)
+        except NLTKResourceError as e:
+            logger.warning(f"Not pre-loading {name}: {str(e)}")
+    return loaded
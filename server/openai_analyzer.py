@@ -3,6 +3,7 @@ import logging
 import os
 from openai import OpenAI
 from datetime import datetime
+from near_duplicates import NearDuplicateDetector
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +26,9 @@ class OpenAIAnalyzer:
         # Do not change this unless explicitly requested by the user
         self.model = "gpt-4o-mini"
         
+        # Collapses crossposts/copy-pastes so each complaint is sent once
+        self.deduplicator = NearDuplicateDetector()
+        
         # Initialize client if API key is available
         if self.api_key:
             self.initialize_client(self.api_key)
@@ -82,14 +86,20 @@ class OpenAIAnalyzer:
                 "analysis_summary": "No posts to analyze"
             }
             
+        # Send one representative per near-duplicate cluster, weighted by cluster size
+        clusters = self.deduplicator.cluster_posts(posts)
+        logger.info(f"Sending {len(clusters)} distinct posts to OpenAI ({len(posts)} before near-duplicate removal)")
+        
         # Prepare post data for the API
         post_texts = []
-        for idx, post in enumerate(posts):
+        for cluster in clusters:
+            post = cluster.representative
             post_data = {
                 "title": post.title,
                 "content": post.content,
                 "score": post.score,
-                "num_comments": post.num_comments
+                "num_comments": post.num_comments,
+                "similar_posts": cluster.size
             }
             post_texts.append(post_data)
         
@@ -99,6 +109,8 @@ class OpenAIAnalyzer:
 
         {json.dumps(post_texts, indent=2)}
 
+        Near-identical posts (crossposts, copy-pasted complaints) have been merged; "similar_posts" is how many users posted essentially the same text, so weight each post by it when judging how common and severe an issue is.
+
         From these posts, extract only the pain points that are genuinely and explicitly relevant to {product_name}.
 
         For each pain point, provide:
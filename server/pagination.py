@@ -0,0 +1,123 @@
+"""
+Keyset (cursor) pagination.
+
+A page ends at a (sort value, id) pair; the next page starts strictly after
+it in the order (sort field, then id, both in the requested direction).
+Against MongoDB that is an index range scan on {sort field, _id}, so every
+page costs the same no matter how deep the client has paged. The in-memory
+fallback selects a page with a bounded heap instead of sorting everything.
+
+Cursors are opaque to clients: URL-safe base64 of the extended JSON of the
+sort field, direction, last sort value and last id.
+"""
+import base64
+import binascii
+import heapq
+
+from bson import json_util
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a cursor is malformed or was issued for a different sort."""
+
+
+def encode_cursor(sort_field, direction, value, item_id):
+    """
+    Build the opaque cursor for the item a page ended on.
+
+    Args:
+        sort_field (str): Field the listing is sorted by
+        direction (int): 1 for ascending, -1 for descending
+        value: Sort value of the last item on the page
+        item_id: Id of the last item on the page
+
+    Returns:
+        str: Cursor to pass back as the `after` parameter
+    """
+    payload = json_util.dumps({"f": sort_field, "d": direction, "v": value, "id": item_id},
+                              json_options=json_util.CANONICAL_JSON_OPTIONS)
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, sort_field, direction):
+    """
+    Read a cursor back and check it belongs to the requested ordering.
+
+    Args:
+        cursor (str): Value of the `after` parameter
+        sort_field (str): Field the listing is sorted by
+        direction (int): 1 for ascending, -1 for descending
+
+    Returns:
+        tuple: (sort value, id) of the last item of the previous page
+
+    Raises:
+        InvalidCursorError: If the cursor cannot be decoded or was issued for another sort
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json_util.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+        value, item_id = payload["v"], payload["id"]
+        issued_for = (payload["f"], payload["d"])
+    except (binascii.Error, UnicodeError, ValueError, TypeError, KeyError) as e:
+        raise InvalidCursorError(f"Malformed cursor: {str(e)}") from None
+    if issued_for != (sort_field, direction):
+        raise InvalidCursorError("Cursor was issued for a different sort order")
+    return value, item_id
+
+
+def keyset_filter(sort_field, direction, value, item_id):
+    """
+    MongoDB filter for the items after (value, item_id) in (sort_field, _id) order.
+
+    Missing and null sort values sort lowest, so they come last when
+    descending and first when ascending.
+
+    Args:
+        sort_field (str): Field the listing is sorted by
+        direction (int): 1 for ascending, -1 for descending
+        value: Sort value of the last item on the previous page
+        item_id: Id of the last item on the previous page
+
+    Returns:
+        dict: Filter to combine with the listing's own filter
+    """
+    op = "$lt" if direction < 0 else "$gt"
+    if value is None:
+        if direction < 0:
+            return {sort_field: None, "_id": {op: item_id}}
+        return {"$or": [{sort_field: {"$ne": None}}, {sort_field: None, "_id": {op: item_id}}]}
+
+    clauses = [{sort_field: {op: value}}, {sort_field: value, "_id": {op: item_id}}]
+    if direction < 0:
+        clauses.append({sort_field: None})
+    return {"$or": clauses}
+
+
+def _sort_key(value, item_id):
+    # None sorts lowest, as in MongoDB
+    return (value is not None, value if value is not None else 0, item_id)
+
+
+def page_items(items, key, limit, direction=-1, after=None):
+    """
+    Select one page from an unsorted collection without sorting all of it.
+
+    Args:
+        items (iterable): Items to page through
+        key (callable): item -> (sort value, id)
+        limit (int): Page size
+        direction (int): 1 for ascending, -1 for descending
+        after (tuple): (sort value, id) the previous page ended on, if any
+
+    Returns:
+        tuple: (items on this page in order, whether more items follow)
+    """
+    keyed = ((_sort_key(*key(item)), item) for item in items)
+    if after is not None:
+        bound = _sort_key(*after)
+        keyed = (pair for pair in keyed if (pair[0] < bound if direction < 0 else pair[0] > bound))
+
+    select = heapq.nlargest if direction < 0 else heapq.nsmallest
+    page = select(limit + 1, keyed, key=lambda pair: pair[0])
+    return [item for _, item in page[:limit]], len(page) > limit
@@ -0,0 +1,159 @@
+"""
+Sparse document-term aggregation engine for pain points.
+
+Posts are matched against indicator / category / product vocabularies in a
+single pass, producing sparse post x term incidence matrices. Frequencies,
+sentiment means, severities and per-product breakdowns are then computed with
+sparse matrix-vector products instead of per-post, per-indicator Python
+arithmetic.
+"""
+import logging
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from scipy import sparse
+
+logger = logging.getLogger(__name__)
+
+
+def incidence_matrix(texts: Sequence[str], terms: Sequence[str]) -> sparse.csr_matrix:
+    """
+    Build a binary post x term incidence matrix in one pass.
+
+    A term matches a text when it occurs as a substring (the same rule the
+    analyzers have always used), so texts should already be lowercased.
+
+    Args:
+        texts: Lowercased post texts
+        terms: Lowercased terms (column order)
+
+    Returns:
+        CSR matrix of shape (len(texts), len(terms)) with 1.0 where the term occurs
+    """
+    indptr = [0]
+    indices = []
+    for text in texts:
+        indices.extend(col for col, term in enumerate(terms) if term in text)
+        indptr.append(len(indices))
+    data = np.ones(len(indices), dtype=np.float64)
+    return sparse.csr_matrix(
+        (data, np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+        shape=(len(texts), len(terms))
+    )
+
+
+def group_columns(matrix: sparse.csr_matrix, groups: Sequence[Sequence[int]]) -> sparse.csr_matrix:
+    """
+    OR together groups of columns (e.g. all keywords of one category).
+
+    Args:
+        matrix: Post x term incidence matrix
+        groups: For each output column, the input column indexes to combine
+
+    Returns:
+        CSR matrix of shape (rows, len(groups)) with 1.0 where any column of the group matched
+    """
+    rows, cols = [], []
+    for group_index, members in enumerate(groups):
+        for member in members:
+            rows.append(member)
+            cols.append(group_index)
+    mapping = sparse.csr_matrix(
+        (np.ones(len(rows)), (rows, cols)), shape=(matrix.shape[1], len(groups))
+    )
+    grouped = (matrix @ mapping).tocsr()
+    grouped.data[:] = 1.0
+    return grouped
+
+
+def pair_columns(left: sparse.csr_matrix, right: sparse.csr_matrix) -> sparse.csr_matrix:
+    """
+    Row-wise pairing of two incidence matrices.
+
+    Column `l * right.shape[1] + r` is set for a row when both left column l and
+    right column r are set.
+
+    Returns:
+        CSR matrix of shape (rows, left_cols * right_cols)
+    """
+    blocks = [right.multiply(left[:, l]).tocsr() for l in range(left.shape[1])]
+    if not blocks:
+        return sparse.csr_matrix((left.shape[0], 0))
+    return sparse.hstack(blocks, format='csr')
+
+
+class PainPointAggregates:
+    """
+    Vectorized aggregates over a post x pain point incidence matrix.
+
+    Args:
+        matrix: Post x pain point incidence matrix
+        sentiments: Per-post sentiment scores (None/NaN are treated as 0)
+        weights: Per-post weights, e.g. near-duplicate cluster sizes (default 1);
+            rows with weight 0 are ignored
+    """
+
+    def __init__(self, matrix: sparse.csr_matrix, sentiments: Sequence, weights: Optional[Sequence] = None):
+        n_posts = matrix.shape[0]
+        self.sentiments = np.nan_to_num(np.asarray(
+            [0.0 if s is None else s for s in sentiments], dtype=np.float64
+        ))
+        self.weights = (np.ones(n_posts) if weights is None
+                        else np.asarray([1 if w is None else w for w in weights], dtype=np.float64))
+        # Drop weight-0 rows (duplicates represented elsewhere) from every aggregate
+        active = sparse.diags((self.weights > 0).astype(np.float64))
+        self.matrix = (active @ matrix).tocsr()
+        self.matrix.eliminate_zeros()
+
+    @property
+    def frequency(self) -> np.ndarray:
+        """Weighted number of posts per pain point."""
+        return self.matrix.T @ self.weights
+
+    @property
+    def post_count(self) -> np.ndarray:
+        """Number of distinct matching posts per pain point."""
+        return np.asarray(self.matrix.sum(axis=0)).ravel()
+
+    @property
+    def sentiment_sum(self) -> np.ndarray:
+        """Weighted sum of sentiment per pain point."""
+        return self.matrix.T @ (self.weights * self.sentiments)
+
+    @property
+    def avg_sentiment(self) -> np.ndarray:
+        """Weighted mean sentiment per pain point (0 where there are no posts)."""
+        frequency = self.frequency
+        return np.divide(self.sentiment_sum, frequency, out=np.zeros_like(frequency), where=frequency > 0)
+
+    def max_abs_sentiment(self) -> np.ndarray:
+        """Largest |sentiment| among the posts matching each pain point."""
+        if self.matrix.shape[0] == 0:
+            return np.zeros(self.matrix.shape[1])
+        scaled = self.matrix.multiply(np.abs(self.sentiments)[:, None]).tocsc()
+        return scaled.max(axis=0).toarray().ravel()
+
+    def by_group(self, groups: sparse.csr_matrix) -> Dict[str, sparse.csr_matrix]:
+        """
+        Break aggregates down by a post x group matrix (e.g. post x product).
+
+        Returns:
+            dict: 'frequency' and 'sentiment_sum' as group x pain point sparse matrices
+        """
+        groups_t = groups.T.tocsr()
+        return {
+            'frequency': (groups_t @ sparse.diags(self.weights) @ self.matrix).tocsr(),
+            'sentiment_sum': (groups_t @ sparse.diags(self.weights * self.sentiments) @ self.matrix).tocsr(),
+        }
+
+    def rows_by_column(self, mask: Optional[np.ndarray] = None) -> List[np.ndarray]:
+        """
+        Matching post indexes for every pain point column.
+
+        Args:
+            mask: Optional boolean row mask (e.g. posts mentioning one product)
+        """
+        matrix = self.matrix if mask is None else sparse.diags(mask.astype(np.float64)) @ self.matrix
+        csc = sparse.csc_matrix(matrix)
+        csc.eliminate_zeros()
+        return [csc.indices[csc.indptr[col]:csc.indptr[col + 1]] for col in range(csc.shape[1])]
@@ -0,0 +1,139 @@
+"""
+Incremental pain-point rollups.
+
+Each analyzed post contributes once to the running aggregates of every
+(pain point, product) pair it mentions: frequency and sentiment sums are
+added with $inc and its id is pushed onto a capped related-posts list.
+Average sentiment and severity are derived from the sums when a rollup is
+read, so the aggregates stay correct across scrapes while each scrape only
+costs O(batch).
+"""
+import os
+from datetime import datetime
+from typing import Dict
+
+from models import PainPoint
+
+# Most recent related post ids kept per pain point
+RELATED_POSTS_CAP = int(os.getenv("PAIN_POINT_RELATED_POSTS_CAP", 100))
+
+
+class Rollup:
+    """Contribution of a batch of posts to one (pain point, product) aggregate."""
+    def __init__(self, category, indicator, product):
+        self.category = category
+        self.indicator = indicator
+        self.product = product
+        self.frequency = 0
+        self.sentiment_sum = 0.0
+        self.related_posts = []
+
+    @property
+    def key(self):
+        return pain_point_key(self.category, self.indicator, self.product)
+
+
+def pain_point_key(category, indicator, product):
+    """Document id of a pain point aggregate ("category:indicator:product")."""
+    return f"{category}:{indicator}:{product}"
+
+
+def collect_rollups(posts) -> Dict[str, Rollup]:
+    """
+    Group the pain-point contributions of analyzed posts.
+
+    Args:
+        posts (list): Posts with sentiment, pain_points ("category:indicator"
+            labels) and products set; a post repeated by id counts once
+
+    Returns:
+        dict: Pain point key -> Rollup
+    """
+    rollups = {}
+    seen = set()
+    for post in posts:
+        sentiment = getattr(post, 'sentiment', None)
+        labels = getattr(post, 'pain_points', None)
+        products = getattr(post, 'products', None)
+        if sentiment is None or not labels or not products or post.id in seen:
+            continue
+        seen.add(post.id)
+        for label in labels:
+            category, _, indicator = label.partition(":")
+            for product in products:
+                key = pain_point_key(category, indicator, product)
+                rollup = rollups.get(key)
+                if rollup is None:
+                    rollup = rollups[key] = Rollup(category, indicator, product)
+                rollup.frequency += 1
+                rollup.sentiment_sum += sentiment
+                rollup.related_posts.append(post.id)
+    return rollups
+
+
+def rollup_update(rollup: Rollup, now=None):
+    """
+    Update document applying a rollup to its stored aggregate (for an upsert).
+
+    Args:
+        rollup (Rollup): Contribution of the batch
+        now (datetime): Update time (default: utcnow)
+
+    Returns:
+        dict: $inc/$push/$set/$setOnInsert update
+    """
+    now = now or datetime.utcnow()
+    return {
+        "$inc": {"frequency": rollup.frequency, "sentiment_sum": rollup.sentiment_sum},
+        "$push": {"related_posts": {"$each": rollup.related_posts, "$slice": -RELATED_POSTS_CAP}},
+        "$set": {"updated_at": now},
+        "$setOnInsert": {
+            "name": f"{rollup.category.title()}: {rollup.indicator}",
+            "description": f"Issues with {rollup.category} described as '{rollup.indicator}' in {rollup.product}",
+            "category": rollup.category,
+            "indicator": rollup.indicator,
+            "product": rollup.product,
+            "created_at": now,
+        },
+    }
+
+
+def apply_to_pain_point(pain_point: PainPoint, rollup: Rollup):
+    """Add a rollup to an in-memory PainPoint (the no-database fallback)."""
+    sentiment_sum = pain_point.avg_sentiment * pain_point.frequency + rollup.sentiment_sum
+    pain_point.frequency += rollup.frequency
+    pain_point.avg_sentiment = sentiment_sum / pain_point.frequency if pain_point.frequency else 0
+    pain_point.related_posts = (pain_point.related_posts + rollup.related_posts)[-RELATED_POSTS_CAP:]
+    pain_point.calculate_severity()
+    return pain_point
+
+
+def new_pain_point(rollup: Rollup):
+    """In-memory PainPoint for a rollup seen for the first time."""
+    update = rollup_update(rollup)["$setOnInsert"]
+    pain_point = PainPoint(name=update["name"], description=update["description"], product=rollup.product)
+    return apply_to_pain_point(pain_point, rollup)
+
+
+def pain_point_from_document(document):
+    """
+    Build a PainPoint from a stored document, deriving avg_sentiment and severity.
+
+    Documents written before rollups (avg_sentiment stored, no sentiment_sum)
+    are read as they are.
+    """
+    frequency = document.get("frequency", 0)
+    if "sentiment_sum" in document:
+        avg_sentiment = document["sentiment_sum"] / frequency if frequency else 0
+    else:
+        avg_sentiment = document.get("avg_sentiment", 0)
+    pain_point = PainPoint(
+        name=document.get("name"),
+        description=document.get("description"),
+        frequency=frequency,
+        avg_sentiment=avg_sentiment,
+        related_posts=document.get("related_posts", []),
+        product=document.get("product"),
+    )
+    pain_point.calculate_severity()
+    return pain_point
@@ -0,0 +1,229 @@
+"""
+Hot/cold tiering of posts.
+
+Posts older than POST_ARCHIVE_AFTER_DAYS are moved out of the posts
+collection into zstd-compressed Parquet files partitioned by creation month
+(year=YYYY/month=MM under POST_ARCHIVE_DIR). Each archived post leaves a
+slim stub in archived_posts (id, sentiment, fingerprint, partition) so a
+re-scrape recognizes it instead of inserting it again and counting it twice
+in the pain point aggregates, trends and spike detection, which are kept in
+MongoDB as they are. The hot posts collection then only holds the recent
+posts the API lists.
+
+Scripts read both tiers with iter_posts(), which yields the hot documents
+followed by the archived rows in the same document shape.
+"""
+import os
+import uuid
+import logging
+from datetime import datetime, timedelta
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from post_fingerprints import FINGERPRINT_FIELD
+
+logger = logging.getLogger(__name__)
+
+POST_ARCHIVE_DIR = os.getenv("POST_ARCHIVE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                               "archive", "posts"))
+POST_ARCHIVE_AFTER_DAYS = int(os.getenv("POST_ARCHIVE_AFTER_DAYS", 180))
+ARCHIVE_BATCH_SIZE = int(os.getenv("POST_ARCHIVE_BATCH_SIZE", 5000))
+
+# Columns of an archived post (partition columns year/month are derived from created_utc)
+ARCHIVE_SCHEMA = pa.schema([
+    ("_id", pa.string()),
+    ("title", pa.string()),
+    ("content", pa.string()),
+    ("author", pa.string()),
+    ("subreddit", pa.string()),
+    ("url", pa.string()),
+    ("created_utc", pa.timestamp("ms")),
+    ("score", pa.int64()),
+    ("num_comments", pa.int64()),
+    ("sentiment", pa.float64()),
+    ("topics", pa.list_(pa.string())),
+    ("pain_points", pa.list_(pa.string())),
+    ("products", pa.list_(pa.string())),
+    ("severity", pa.float64()),
+    ("cluster_id", pa.string()),
+    ("duplicate_count", pa.int64()),
+    ("archived_at", pa.timestamp("ms")),
+])
+
+_LIST_FIELDS = ("topics", "pain_points", "products")
+
+
+def partition_path(root, created):
+    """Directory of the partition holding posts created at a given time."""
+    return os.path.join(root, f"year={created.year:04d}", f"month={created.month:02d}")
+
+
+def _row(document, archived_at):
+    row = {}
+    for field in ARCHIVE_SCHEMA.names:
+        value = document.get(field)
+        if field in _LIST_FIELDS:
+            value = [str(item) for item in value or []]
+        elif field in ("_id", "cluster_id") and value is not None:
+            value = str(value)
+        row[field] = value
+    row["archived_at"] = archived_at
+    return row
+
+
+def write_archive(documents, root=POST_ARCHIVE_DIR, archived_at=None):
+    """
+    Append post documents to the archive, one new file per partition touched.
+
+    Files are written under a temporary name and renamed, so readers never
+    see a partial file.
+
+    Args:
+        documents (list): Post documents with a datetime created_utc
+        root (str): Archive directory
+        archived_at (datetime): Archive time (default: utcnow)
+
+    Returns:
+        dict: Post id -> partition directory (relative to root)
+    """
+    archived_at = archived_at or datetime.utcnow()
+    partitions = {}
+    for document in documents:
+        path = partition_path(root, document["created_utc"])
+        partitions.setdefault(path, []).append(document)
+
+    locations = {}
+    for path, partition in partitions.items():
+        os.makedirs(path, exist_ok=True)
+        table = pa.Table.from_pylist([_row(document, archived_at) for document in partition], schema=ARCHIVE_SCHEMA)
+        name = f"part-{archived_at:%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}.parquet"
+        # Dot-prefixed files are ignored by dataset readers
+        temporary = os.path.join(path, f".{name}.tmp")
+        pq.write_table(table, temporary, compression="zstd")
+        os.replace(temporary, os.path.join(path, name))
+        relative = os.path.relpath(path, root)
+        locations.update((str(document["_id"]), relative) for document in partition)
+    return locations
+
+
+def read_archive(root=POST_ARCHIVE_DIR, columns=None, since=None, until=None, ids=None):
+    """
+    Archived posts as documents (dicts keyed like the posts collection).
+
+    Args:
+        root (str): Archive directory
+        columns (list): Columns to read (default: all)
+        since (datetime): Only posts created at or after this time
+        until (datetime): Only posts created before this time
+        ids (list): Only these posts
+
+    Yields:
+        dict: Archived post documents
+    """
+    if not os.path.isdir(root):
+        return
+    dataset = ds.dataset(root, format="parquet", schema=ARCHIVE_SCHEMA, partitioning="hive")
+    condition = None
+    if since is not None:
+        condition = ds.field("created_utc") >= pa.scalar(since, pa.timestamp("ms"))
+    if until is not None:
+        before = ds.field("created_utc") < pa.scalar(until, pa.timestamp("ms"))
+        condition = before if condition is None else condition & before
+    if ids is not None:
+        selected = ds.field("_id").isin([str(post_id) for post_id in ids])
+        condition = selected if condition is None else condition & selected
+    for batch in dataset.to_batches(columns=columns, filter=condition):
+        yield from batch.to_pylist()
+
+
+def iter_posts(store, query=None, root=POST_ARCHIVE_DIR, include_archive=True):
+    """
+    Posts from both tiers: the hot collection first, then the archive.
+
+    A post archived by an interrupted run can sit in both tiers until the
+    next run removes it from the hot collection; it is yielded once.
+
+    Args:
+        store (MongoDBStore): Connected store
+        query (dict): Filter on the hot collection (archived rows are not filtered)
+        root (str): Archive directory
+        include_archive (bool): Also read the archive
+
+    Yields:
+        dict: Post documents
+    """
+    seen = set()
+    for document in store.db.posts.find(query or {}):
+        seen.add(str(document["_id"]))
+        yield document
+    if include_archive:
+        for document in read_archive(root):
+            if document["_id"] not in seen:
+                seen.add(document["_id"])
+                yield document
+
+
+def archive_posts(store, older_than_days=POST_ARCHIVE_AFTER_DAYS, root=POST_ARCHIVE_DIR,
+                  batch_size=ARCHIVE_BATCH_SIZE, now=None):
+    """
+    Move posts older than a given age from the posts collection to the archive.
+
+    Each batch is written to Parquet first, then its stubs are saved, then
+    the posts are deleted, so an interruption never loses a post; a re-run
+    deletes posts whose stubs already exist without archiving them again.
+
+    Args:
+        store (MongoDBStore): Connected store
+        older_than_days (int): Age (by created_utc) at which posts are archived
+        root (str): Archive directory
+        batch_size (int): Posts per Parquet write / delete
+        now (datetime): Reference time (default: utcnow)
+
+    Returns:
+        dict: archived (posts moved), partitions (written to) and errors
+    """
+    cutoff = (now or datetime.utcnow()) - timedelta(days=older_than_days)
+    archived, partitions, errors = 0, set(), []
+    while True:
+        try:
+            documents = list(store.db.posts.find({"created_utc": {"$lt": cutoff}})
+                             .sort([("created_utc", 1), ("_id", 1)]).limit(batch_size))
+        except Exception as e:
+            logger.error(f"Error reading posts to archive: {str(e)}")
+            errors.append({"id": None, "error": str(e)})
+            break
+        if not documents:
+            break
+
+        ids = [document["_id"] for document in documents]
+        locations = {}
+        try:
+            stubbed = {stub["_id"] for stub in store.db.archived_posts.find({"_id": {"$in": ids}}, {"_id": 1})}
+            fresh = [document for document in documents if document["_id"] not in stubbed]
+            if fresh:
+                locations = write_archive(fresh, root)
+                store.db.archived_posts.insert_many([
+                    {
+                        "_id": document["_id"],
+                        "sentiment": document.get("sentiment"),
+                        FINGERPRINT_FIELD: document.get(FINGERPRINT_FIELD),
+                        "created_utc": document["created_utc"],
+                        "partition": locations[str(document["_id"])],
+                        "archived_at": datetime.utcnow(),
+                    }
+                    for document in fresh
+                ], ordered=False)
+            store.db.posts.delete_many({"_id": {"$in": ids}})
+            # The catalog counts hot posts only
+            store.update_product_catalog((document.get("products"), None, None) for document in documents)
+        except Exception as e:
+            logger.error(f"Error archiving posts: {str(e)}")
+            errors.append({"id": None, "error": str(e)})
+            break
+        archived += len(fresh)
+        partitions.update(locations.values())
+        logger.info(f"Archived {len(fresh)} posts ({archived} so far)")
+
+    return {"archived": archived, "partitions": sorted(partitions), "errors": errors}
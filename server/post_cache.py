@@ -0,0 +1,265 @@
+"""
+Bounded in-process post cache.
+
+MongoDBStore keeps the posts it has scraped and analyzed in memory for the
+no-database fallback paths of the API (raw_posts, analyzed_posts). A
+PostCache holds them under an entry budget and an (estimated) memory
+budget and evicts the least recently used post (policy "lru") or the least
+frequently used one, oldest first among equals (policy "lfu"), so a
+long-running worker's memory stays flat however many scrapes it runs.
+A post is used when it is (re)inserted and when the API serves it from
+the cache (record_reads(), get()). Request threads only queue the ids they
+served; the writer applies them to the eviction order on its next write.
+
+Lookups, inserts and LRU evictions are O(1). Readers iterate like the
+lists it replaces (in LRU order, least recent first, or insertion order for
+LFU) over an immutable tuple snapshot that each put() / extend() publishes
+once, so request threads read without a lock and never see a batch half
+inserted.
+"""
+import os
+import sys
+import logging
+import threading
+from collections import OrderedDict, deque
+
+from post_index import PostIndex
+
+logger = logging.getLogger(__name__)
+
+POST_CACHE_MAX_ENTRIES = int(os.getenv("POST_CACHE_MAX_ENTRIES", 20000))
+POST_CACHE_MAX_MB = int(os.getenv("POST_CACHE_MAX_MB", 64))
+POST_CACHE_POLICY = os.getenv("POST_CACHE_POLICY", "lru")
+
+POLICIES = ("lru", "lfu")
+
+
+def post_key(post):
+    """Cache key of a post object or post dict."""
+    if isinstance(post, dict):
+        return post.get('id', post.get('_id'))
+    return getattr(post, 'id', None)
+
+
+def _value_size(value):
+    size = sys.getsizeof(value)
+    if isinstance(value, (list, tuple, set)):
+        size += sum(sys.getsizeof(item) for item in value)
+    return size
+
+
+def post_size(post):
+    """Approximate memory footprint of a post in bytes (the object and its field values)."""
+    if isinstance(post, dict):
+        fields, size = post, sys.getsizeof(post)
+    elif hasattr(post, '__dict__'):
+        fields = vars(post)
+        size = sys.getsizeof(post) + sys.getsizeof(fields)
+    else:
+        fields = {name: getattr(post, name, None) for name in getattr(post, '__slots__', ())}
+        size = sys.getsizeof(post)
+    return size + sum(_value_size(value) for value in fields.values())
+
+
+class PostCache:
+    """
+    Posts by id under an entry and memory budget.
+
+    Args:
+        max_entries (int): Most posts held
+        max_mb (float): Most memory held, in MB (as estimated by post_size)
+        policy (str): Eviction policy, "lru" or "lfu"
+        name (str): Name used in log messages
+    """
+    def __init__(self, max_entries=POST_CACHE_MAX_ENTRIES, max_mb=POST_CACHE_MAX_MB, policy=POST_CACHE_POLICY,
+                 name="posts"):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown post cache policy: {policy} (expected one of {', '.join(POLICIES)})")
+        self.max_entries = max_entries
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.policy = policy
+        self.name = name
+        self._entries = OrderedDict()  # id -> [post, size, uses]; LRU order for "lru", insertion order for "lfu"
+        self._by_uses = {}  # "lfu": use count -> OrderedDict of ids, oldest first
+        self._min_uses = 0
+        self._lock = threading.RLock()  # writers only
+        self._snapshot = ()
+        self._index = ((), None)  # (snapshot, PostIndex over it)
+        # Ids served by readers since the last write (appended without the lock; the oldest
+        # are dropped beyond max_entries, as they could not change the order any more)
+        self._pending_reads = deque(maxlen=max(1, max_entries))
+        self.bytes = 0
+        self.reads = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._snapshot)
+
+    def __bool__(self):
+        return bool(self._snapshot)
+
+    def __contains__(self, post_id):
+        """Whether a post id (or post) is cached; does not count as a use."""
+        if not isinstance(post_id, (str, int)):
+            post_id = post_key(post_id)
+        return post_id in self._entries
+
+    def __iter__(self):
+        return iter(self._snapshot)
+
+    def snapshot(self):
+        """The cached posts as published by the last write (an immutable tuple)."""
+        return self._snapshot
+
+    def index(self):
+        """
+        Columnar PostIndex over the current snapshot.
+
+        Built on first use after each publish and shared by readers until the
+        next one (readers racing to build it each build one; the last wins).
+        """
+        snapshot = self._snapshot
+        indexed, index = self._index
+        if indexed is not snapshot or index is None:
+            index = PostIndex(snapshot)
+            self._index = (snapshot, index)
+        return index
+
+    def get(self, post_id, default=None):
+        """The cached post with this id (counts as a read), or default."""
+        with self._lock:
+            entry = self._entries.get(post_id)
+            if entry is None:
+                return default
+            self.reads += 1
+            self._touch(post_id, entry)
+            return entry[0]
+
+    def record_reads(self, posts):
+        """
+        Count posts served from a snapshot as reads.
+
+        Lock-free: the ids are queued, and on the next put / extend / discard
+        each post still cached becomes the most recently used ("lru") or gains
+        a use ("lfu"), so the posts the API serves are the last to be evicted.
+        """
+        self._pending_reads.extend(post_key(post) for post in posts)
+
+    def put(self, post):
+        """Insert or replace a post, evicting others as needed to stay within budget."""
+        with self._lock:
+            self._apply_reads()
+            self._put(post)
+            self._publish()
+
+    append = put
+
+    def extend(self, posts):
+        """put() each post, publishing one snapshot for the whole batch."""
+        with self._lock:
+            self._apply_reads()
+            for post in posts:
+                self._put(post)
+            self._publish()
+
+    def discard(self, post_id):
+        """Remove a post if it is cached."""
+        with self._lock:
+            self._apply_reads()
+            entry = self._entries.pop(post_id, None)
+            if entry is not None:
+                self._forget(post_id, entry)
+                self._publish()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_uses.clear()
+            self._min_uses = 0
+            self._pending_reads.clear()
+            self.bytes = 0
+            self._snapshot = ()
+
+    def stats(self):
+        """Budget use and read / eviction counters (read without locking; may be a write behind)."""
+        return {
+            "policy": self.policy,
+            "entries": len(self._snapshot),
+            "max_entries": self.max_entries,
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "reads": self.reads + len(self._pending_reads),
+            "evictions": self.evictions,
+        }
+
+    def _put(self, post):
+        post_id = post_key(post)
+        if post_id is None:
+            return
+        size = post_size(post)
+        entry = self._entries.get(post_id)
+        if entry is not None:
+            self.bytes += size - entry[1]
+            entry[0], entry[1] = post, size
+            self._touch(post_id, entry)
+        else:
+            # Make room first, so a new post is never its own victim
+            while self._entries and (len(self._entries) >= self.max_entries
+                                     or self.bytes + size > self.max_bytes):
+                self._evict()
+            self._entries[post_id] = [post, size, 1]
+            self.bytes += size
+            if self.policy == "lfu":
+                self._by_uses.setdefault(1, OrderedDict())[post_id] = None
+                self._min_uses = 1
+        while len(self._entries) > 1 and self.bytes > self.max_bytes:
+            self._evict()
+
+    def _apply_reads(self):
+        """Apply the reads queued by record_reads() to the eviction order (writers only)."""
+        while True:
+            try:
+                post_id = self._pending_reads.popleft()
+            except IndexError:
+                return
+            entry = self._entries.get(post_id)
+            if entry is not None:
+                self.reads += 1
+                self._touch(post_id, entry)
+
+    def _publish(self):
+        self._snapshot = tuple(entry[0] for entry in self._entries.values())
+
+    def _touch(self, post_id, entry):
+        if self.policy == "lru":
+            self._entries.move_to_end(post_id)
+            return
+        uses = entry[2]
+        bucket = self._by_uses[uses]
+        del bucket[post_id]
+        if not bucket:
+            del self._by_uses[uses]
+            if self._min_uses == uses:
+                self._min_uses = uses + 1
+        entry[2] = uses + 1
+        self._by_uses.setdefault(uses + 1, OrderedDict())[post_id] = None
+
+    def _forget(self, post_id, entry):
+        self.bytes -= entry[1]
+        if self.policy == "lfu":
+            bucket = self._by_uses[entry[2]]
+            del bucket[post_id]
+            if not bucket:
+                del self._by_uses[entry[2]]
+                if self._min_uses == entry[2]:
+                    self._min_uses = min(self._by_uses) if self._by_uses else 0
+
+    def _evict(self):
+        if self.policy == "lru":
+            post_id, entry = self._entries.popitem(last=False)
+        else:
+            post_id = next(iter(self._by_uses[self._min_uses]))
+            entry = self._entries.pop(post_id)
+        self._forget(post_id, entry)
+        self.evictions += 1
+        logger.debug(f"Evicted post {post_id} from the {self.name} cache")
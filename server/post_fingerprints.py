@@ -0,0 +1,88 @@
+"""
+Change detection for post upserts.
+
+Every stored post carries a compact fingerprint of its mutable state:
+[score, num_comments, content hash, analysis hash]. Before a batch is
+written, the stored fingerprints are read with one $in query and compared
+with the fingerprints of the incoming documents: unchanged posts are not
+written at all, and changed posts get a $set of only the field groups that
+differ. A re-scrape of mostly unchanged posts therefore produces a handful of
+small updates instead of a full-document $set per post.
+"""
+import hashlib
+import json
+
+# Stored post field holding the fingerprint
+FINGERPRINT_FIELD = "fingerprint"
+
+# Bump to rewrite every post's analysis fields on its next save (e.g. after an analyzer change)
+ANALYSIS_VERSION = 1
+
+# Fields written by the analysis pipeline; everything else (bar the fields below) is content
+ANALYSIS_FIELDS = ("sentiment", "topics", "pain_points", "products", "severity", "cluster_id", "duplicate_count")
+
+# Never compared: the id, the insertion time (set once on insert) and the fingerprint itself
+_UNFINGERPRINTED = {"_id", "id", "created_at", FINGERPRINT_FIELD}
+
+# Fingerprint position -> the fields it covers (None: all content fields)
+_GROUPS = (("score",), ("num_comments",), None, ANALYSIS_FIELDS)
+
+
+def _digest(document, fields, version=0):
+    """Signed 64-bit hash of some fields of a document (fits a BSON int64)."""
+    canonical = json.dumps([version] + [document.get(field) for field in fields], sort_keys=True, default=str)
+    return int.from_bytes(hashlib.blake2b(canonical.encode(), digest_size=8).digest(), "big", signed=True)
+
+
+def content_fields(document):
+    """Fields of a post document that are neither analysis results nor bookkeeping."""
+    return sorted(field for field in document
+                  if field not in _UNFINGERPRINTED and field not in ANALYSIS_FIELDS
+                  and field not in ("score", "num_comments"))
+
+
+def post_fingerprint(document):
+    """
+    Fingerprint of a post document's mutable state.
+
+    Returns:
+        list: [score, num_comments, content hash, analysis hash]
+    """
+    return [
+        document.get("score"),
+        document.get("num_comments"),
+        _digest(document, content_fields(document)),
+        _digest(document, ANALYSIS_FIELDS, ANALYSIS_VERSION),
+    ]
+
+
+def post_update(document, stored_fingerprint, exists=True):
+    """
+    Minimal update bringing a stored post up to date with a new document.
+
+    Args:
+        document (dict): New post document (from MongoDBStore._post_document)
+        stored_fingerprint (list): Fingerprint of the stored post (None if it has none)
+        exists (bool): Whether the post is stored at all
+
+    Returns:
+        dict: Update document, or None when nothing changed
+    """
+    fingerprint = post_fingerprint(document)
+    if exists and stored_fingerprint == fingerprint:
+        return None
+
+    if not exists or not stored_fingerprint or len(stored_fingerprint) != len(fingerprint):
+        # New post, or one written before fingerprints: set every field
+        changed = [field for field in document if field not in ("_id", "created_at")]
+    else:
+        changed = []
+        for position, fields in enumerate(_GROUPS):
+            if stored_fingerprint[position] != fingerprint[position]:
+                changed.extend(content_fields(document) if fields is None else fields)
+
+    update = {"$set": {field: document[field] for field in changed if field in document}}
+    update["$set"][FINGERPRINT_FIELD] = fingerprint
+    if "created_at" in document:
+        update["$setOnInsert"] = {"created_at": document["created_at"]}
+    return update
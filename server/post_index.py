@@ -0,0 +1,184 @@
+"""
+Columnar in-memory index of cached posts.
+
+GetPosts falls back to the in-memory post cache when MongoDB is unavailable.
+A PostIndex turns one published snapshot of the cache into NumPy columns
+once, so each fallback query costs a few vectorized passes instead of
+Python loops over every post:
+
+- score, num_comments, created_utc (microseconds since the epoch) and
+  sentiment as float64 columns, NaN where a post has no value
+- subreddit dictionary-encoded (lowercased, as the filter is
+  case-insensitive) and products as (row, product code) pairs
+- filters become boolean masks, the keyset cursor bound becomes a mask, the
+  page is picked with argpartition and only the page is sorted
+
+The order matches pagination.page_items and MongoDB: by sort value with
+missing values lowest, then by id, both in the requested direction.
+"""
+import logging
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+NUMERIC_FIELDS = ("score", "num_comments", "created_utc", "sentiment")
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _number(value):
+    """Sortable float of a column value (datetimes as microseconds since the epoch), NaN if missing."""
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return float((value - _EPOCH) // _MICROSECOND)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return np.nan
+
+
+def _field(post, name, default=None):
+    if isinstance(post, dict):
+        return post.get(name, default)
+    return getattr(post, name, default)
+
+
+def _values(posts, name, dicts):
+    """One field of every post (plain attribute lookups in one comprehension unless there are dicts)."""
+    if dicts:
+        return [_field(post, name) for post in posts]
+    return [getattr(post, name, None) for post in posts]
+
+
+class PostIndex:
+    """
+    Read-only columns over a sequence of posts.
+
+    Args:
+        posts (sequence): Post objects or dicts (e.g. a PostCache snapshot);
+            must not change while the index is used
+    """
+    def __init__(self, posts):
+        self.posts = posts
+        count = len(posts)
+        dicts = any(isinstance(post, dict) for post in posts)
+        self.columns = {name: self._numeric_column(_values(posts, name, dicts)) for name in NUMERIC_FIELDS}
+        self.has_pain_points = np.array([bool(labels) for labels in _values(posts, 'pain_points', dicts)], dtype=bool)
+
+        self.subreddits = {}  # lowercased subreddit -> code
+        codes = self.subreddits
+        self.subreddit_codes = np.array([codes.setdefault((subreddit or '').lower(), len(codes))
+                                         for subreddit in _values(posts, 'subreddit', dicts)], dtype=np.int32)
+
+        self.products = {}  # product -> code
+        codes = self.products
+        product_rows, product_codes = [], []
+        for row, products in enumerate(_values(posts, 'products', dicts)):
+            for product in products or ():
+                product_rows.append(row)
+                product_codes.append(codes.setdefault(product, len(codes)))
+        self.product_rows = np.array(product_rows, dtype=np.int64)
+        self.product_codes = np.array(product_codes, dtype=np.int32)
+
+        ids = [post.get('id', post.get('_id')) if isinstance(post, dict) else getattr(post, 'id', None)
+               for post in posts]
+        # Ids are compared through their rank in sorted order
+        self.ids = np.array(['' if post_id is None else str(post_id) for post_id in ids], dtype=str)
+        id_order = np.argsort(self.ids, kind="stable")
+        self.sorted_ids = self.ids[id_order]
+        self.id_rank = np.empty(count, dtype=np.int64)
+        self.id_rank[id_order] = np.arange(count)
+        self._positions = {}  # sort field -> each row's position in ascending (value, id) order
+
+    def __len__(self):
+        return len(self.posts)
+
+    @staticmethod
+    def _numeric_column(values):
+        """float64 column of field values (converted in bulk when they are all numbers or naive datetimes)."""
+        try:
+            if any(isinstance(value, datetime) for value in values[:64]):
+                values = [np.nan if value is None else (value - _EPOCH) // _MICROSECOND for value in values]
+            return np.array(values, dtype=np.float64)
+        except (TypeError, ValueError):
+            # Mixed or unexpected types: convert one by one
+            return np.array([_number(value) for value in values], dtype=np.float64)
+
+    def _position(self, field):
+        """Each row's position in ascending order of (value present, value, id)."""
+        position = self._positions.get(field)
+        if position is None:
+            column = self.columns[field]
+            present = ~np.isnan(column)
+            order = np.lexsort((self.id_rank, np.where(present, column, 0.0), present))
+            position = np.empty(len(order), dtype=np.int64)
+            position[order] = np.arange(len(order))
+            self._positions[field] = position
+        return position
+
+    def _after(self, field, direction, value, item_id):
+        """Mask of the rows after (value, item_id) in the requested direction."""
+        column = self.columns[field]
+        present = ~np.isnan(column)
+        values = np.where(present, column, 0.0)
+        bound = _number(value)
+        bound_present = not np.isnan(bound)
+        bound = bound if bound_present else 0.0
+        item_id = '' if item_id is None else str(item_id)
+        if direction < 0:
+            ids_beyond = self.id_rank < np.searchsorted(self.sorted_ids, item_id, side="left")
+            return (present < bound_present) | ((present == bound_present) & (
+                (values < bound) | ((values == bound) & ids_beyond)))
+        ids_beyond = self.id_rank >= np.searchsorted(self.sorted_ids, item_id, side="right")
+        return (present > bound_present) | ((present == bound_present) & (
+            (values > bound) | ((values == bound) & ids_beyond)))
+
+    def mask(self, product=None, has_pain_points=False, subreddit=None, min_score=0, min_comments=0):
+        """Boolean mask of the posts matching the GetPosts filters."""
+        mask = np.ones(len(self.posts), dtype=bool)
+        if product:
+            code = self.products.get(product)
+            mask &= False
+            if code is not None:
+                mask[self.product_rows[self.product_codes == code]] = True
+        if has_pain_points:
+            mask &= self.has_pain_points
+        if subreddit:
+            code = self.subreddits.get(subreddit.lower())
+            mask &= self.subreddit_codes == code if code is not None else False
+        if min_score > 0:
+            mask &= self.columns["score"] >= min_score
+        if min_comments > 0:
+            mask &= self.columns["num_comments"] >= min_comments
+        return mask
+
+    def page(self, sort_field="created_utc", direction=-1, limit=None, after=None, **filters):
+        """
+        One page of posts, as pagination.page_items would select it.
+
+        Args:
+            sort_field (str): One of NUMERIC_FIELDS
+            direction (int): 1 for ascending, -1 for descending
+            limit (int): Page size (default: every matching post)
+            after (tuple): (sort value, id) the previous page ended on, if any
+            **filters: product, has_pain_points, subreddit, min_score, min_comments
+
+        Returns:
+            tuple: (posts on this page in order, whether more posts follow)
+        """
+        mask = self.mask(**filters)
+        if after is not None:
+            mask &= self._after(sort_field, direction, *after)
+        rows = np.flatnonzero(mask)
+        limit = len(rows) if limit is None else limit
+
+        # Order key: position in ascending order, negated for descending
+        keys = self._position(sort_field)[rows] * (1 if direction > 0 else -1)
+        if limit + 1 < len(rows):
+            selected = np.argpartition(keys, limit)[:limit + 1]
+            rows, keys = rows[selected], keys[selected]
+        rows = rows[np.argsort(keys)]
+        return [self.posts[row] for row in rows[:limit]], len(rows) > limit
@@ -79,8 +79,7 @@ class RedditScraper:
         logger.info(f"Searching Reddit for '{query}' in {subreddits}")
         
         # Track which subreddits have been scraped
-        for subreddit in subreddits:
-            data_store.subreddits_scraped.add(subreddit)
+        data_store.subreddits_scraped = data_store.subreddits_scraped | frozenset(subreddits)
             
         # Create subreddit objects
         subreddit_objects = [self.reddit.subreddit(sub) for sub in subreddits]
@@ -88,6 +87,7 @@ class RedditScraper:
         # Use PRAW to search for posts
         posts = []
         for subreddit in subreddit_objects:
+            subreddit_posts = []
             try:
                 for submission in subreddit.search(query, limit=limit, time_filter=time_filter):
                     # Convert to our internal model
@@ -102,17 +102,17 @@ class RedditScraper:
                         score=submission.score,
                         num_comments=submission.num_comments
                     )
-                    posts.append(post)
-                    
-                    # Add to store
-                    if post.id not in [p.id for p in data_store.raw_posts]:
-                        data_store.raw_posts.append(post)
+                    subreddit_posts.append(post)
                         
                 # Apply rate limiting to avoid hitting the Reddit API too hard
                 time.sleep(2)
                     
             except Exception as e:
                 logger.error(f"Error searching subreddit {subreddit}: {str(e)}")
+            
+            # Add to store: one snapshot publish per subreddit, not per post
+            posts.extend(subreddit_posts)
+            data_store.raw_posts.extend(subreddit_posts)
                 
         logger.info(f"Found {len(posts)} posts for query '{query}'")
         return posts
@@ -3,7 +3,7 @@ from flask_restful import Api
 from api import (
     Register, Login, Logout, ScrapePosts, Recommendations,
     GetPainPoints, GetPosts, GetStatus, ResetScrapeStatus,
-    GetOpenAIAnalysis, GetAllProducts, RunAnalysis
+    GetOpenAIAnalysis, GetAllProducts, GetTrends, GetSpikes, RunAnalysis
 )
 
 # Create blueprint for main routes
@@ -27,4 +27,6 @@ def initialize_routes(api):
     api.add_resource(ResetScrapeStatus, '/api/reset-status')
     api.add_resource(GetOpenAIAnalysis, '/api/openai-analysis')
     api.add_resource(GetAllProducts, '/api/all-products')
+    api.add_resource(GetTrends, '/api/trends')
+    api.add_resource(GetSpikes, '/api/spikes')
     api.add_resource(RunAnalysis, '/api/run-analysis')
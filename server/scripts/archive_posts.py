@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Move posts older than POST_ARCHIVE_AFTER_DAYS to the Parquet archive.
+
+Keeps the hot posts collection small: archived posts are written to
+zstd-compressed Parquet partitions under POST_ARCHIVE_DIR and replaced in
+MongoDB by slim stubs. Scripts read both tiers through post_archive.iter_posts.
+"""
+import os
+import sys
+import argparse
+from dotenv import load_dotenv
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mongodb_store import MongoDBStore
+from post_archive import POST_ARCHIVE_AFTER_DAYS, POST_ARCHIVE_DIR, archive_posts
+
+load_dotenv()
+
+
+def archive(older_than_days=POST_ARCHIVE_AFTER_DAYS, root=POST_ARCHIVE_DIR):
+    """Archive old posts and report what moved."""
+    mongodb_uri = os.getenv("MONGODB_URI")
+    if not mongodb_uri:
+        print("❌ MONGODB_URI not set")
+        return False
+    
+    data_store = MongoDBStore(mongodb_uri)
+    if data_store.db is None:
+        print("❌ Failed to connect to MongoDB")
+        return False
+    
+    print(f"📦 Archiving posts older than {older_than_days} days to {root}")
+    result = archive_posts(data_store, older_than_days=older_than_days, root=root)
+    for error in result["errors"]:
+        print(f"❌ {error['error']}")
+    
+    print(f"✅ Archived {result['archived']} posts into {len(result['partitions'])} partitions")
+    for partition in result["partitions"]:
+        print(f"   {partition}")
+    return not result["errors"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--older-than-days", type=int, default=POST_ARCHIVE_AFTER_DAYS,
+                        help="Archive posts created more than this many days ago")
+    parser.add_argument("--archive-dir", default=POST_ARCHIVE_DIR, help="Archive directory")
+    args = parser.parse_args()
+    success = archive(args.older_than_days, args.archive_dir)
+    sys.exit(0 if success else 1)
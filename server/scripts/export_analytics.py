@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Update the columnar analytics export of posts and analysis results.
+
+Appends the posts that are new or changed since the last run (hot and
+archived) to the Arrow segments under ANALYTICS_EXPORT_DIR, which
+generate_nlp_report.py --corpus reads without MongoDB.
+"""
+import os
+import sys
+import time
+from dotenv import load_dotenv
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mongodb_store import MongoDBStore
+from analytics_export import ANALYTICS_EXPORT_DIR, export_posts
+
+load_dotenv()
+
+
+def export():
+    """Bring the analytics export up to date."""
+    mongodb_uri = os.getenv("MONGODB_URI")
+    if not mongodb_uri:
+        print("❌ MONGODB_URI not set")
+        return False
+    
+    data_store = MongoDBStore(mongodb_uri)
+    if data_store.db is None:
+        print("❌ Failed to connect to MongoDB")
+        return False
+    
+    print(f"📦 Exporting posts to {ANALYTICS_EXPORT_DIR}")
+    started = time.perf_counter()
+    result = export_posts(data_store)
+    print(f"✅ Exported {result['exported']} new or changed posts in {time.perf_counter() - started:.1f}s "
+          f"({result['total']} posts in {result['segments']} segments)")
+    return True
+
+
+if __name__ == "__main__":
+    success = export()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Bundle the NLTK data the analyzers need into the pinned data directory.
+
+Run once at build time (Docker image, CI, deploy); the server itself never
+downloads NLTK data and fails fast if a resource is missing.
+
+Usage (from the server directory):
+    python scripts/fetch_nltk_data.py            # download into nltk_data/ (or $NLTK_DATA_DIR)
+    python scripts/fetch_nltk_data.py --check    # only verify the bundle, exit 1 if incomplete
+"""
+import os
+import sys
+import argparse
+import logging
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nltk_resources import NLTK_DATA_DIR, NLTK_RESOURCES, missing_resources
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--check', action='store_true', help='Verify the bundle without downloading')
+    args = parser.parse_args()
+
+    if not args.check:
+        import nltk
+        os.makedirs(NLTK_DATA_DIR, exist_ok=True)
+        for name in NLTK_RESOURCES:
+            logger.info(f"Fetching {name} into {NLTK_DATA_DIR}")
+            if not nltk.download(name, download_dir=NLTK_DATA_DIR, quiet=True, raise_on_error=True):
+                logger.error(f"Failed to fetch {name}")
+                return False
+
+    missing = missing_resources(list(NLTK_RESOURCES))
+    if missing:
+        logger.error(f"Missing NLTK resources in {NLTK_DATA_DIR}: {', '.join(missing)}")
+        return False
+
+    logger.info(f"✅ All NLTK resources present in {NLTK_DATA_DIR}")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -5,6 +5,8 @@ Generate NLP pipeline report.
 import os
 import sys
 import json
+import time
+import argparse
 from datetime import datetime
 from dotenv import load_dotenv
 
@@ -15,6 +17,33 @@ from mongodb_store import MongoDBStore
 load_dotenv()
 
 
+def print_corpus_statistics():
+    """Print corpus statistics computed from the columnar analytics export (no MongoDB needed)."""
+    from analytics_export import corpus_statistics, segment_paths
+    
+    if not segment_paths():
+        print("No analytics export available (run scripts/export_analytics.py)")
+        return False
+    
+    started = time.perf_counter()
+    stats = corpus_statistics()
+    elapsed = time.perf_counter() - started
+    
+    print("CORPUS (analytics export)")
+    print("-" * 80)
+    print(f"Posts: {stats['posts']:,} ({stats['analyzed_posts']:,} analyzed), "
+          f"Words: {stats['total_words']:,}, Average Sentiment: {stats['avg_sentiment']:.3f}")
+    for label, count in stats['sentiment_distribution'].items():
+        pct = (count / stats['analyzed_posts'] * 100) if stats['analyzed_posts'] > 0 else 0
+        print(f"{label.upper():12} {count:6,} ({pct:5.1f}%) {'█' * int(pct / 2)}")
+    print("Posts per product: " + ", ".join(f"{name} {count:,}" for name, count in stats['products'].items()))
+    print("Top topics: " + ", ".join(f"{term} ({count})" for term, count in stats['top_topics']))
+    print("Top pain points: " + ", ".join(f"{label} ({count})" for label, count in stats['top_pain_points']))
+    print(f"(computed in {elapsed:.2f}s)")
+    print()
+    return True
+
+
 def generate_report():
     """Generate comprehensive NLP report."""
     mongodb_uri = os.getenv("MONGODB_URI")
@@ -86,9 +115,17 @@ def generate_report():
         print(f"Model Accuracy: {acc.get('accuracy', 0):.2%}")
         print()
     
+    print_corpus_statistics()
+    
     print("=" * 80)
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate the NLP pipeline report")
+    parser.add_argument("--corpus", action="store_true",
+                        help="Only print corpus statistics from the analytics export (no MongoDB)")
+    args = parser.parse_args()
+    if args.corpus:
+        sys.exit(0 if print_corpus_statistics() else 1)
     generate_report()
 
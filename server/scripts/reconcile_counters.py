@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Recount the /api/status counters from the collections.
+
+The save methods keep the counters up to date incrementally; this corrects
+any drift (concurrent writers, manual edits, deletes). Run it on a schedule.
+"""
+import os
+import sys
+from dotenv import load_dotenv
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mongodb_store import MongoDBStore
+
+load_dotenv()
+
+
+def reconcile():
+    """Recount and store the status counters."""
+    mongodb_uri = os.getenv("MONGODB_URI")
+    if not mongodb_uri:
+        print("❌ MONGODB_URI not set")
+        return False
+    
+    data_store = MongoDBStore(mongodb_uri)
+    if data_store.db is None:
+        print("❌ Failed to connect to MongoDB")
+        return False
+    
+    counters = data_store.reconcile_status_counters()
+    if counters is None:
+        print("❌ Failed to reconcile status counters")
+        return False
+    
+    for name, count in counters.items():
+        print(f"✅ {name}: {count}")
+    return True
+
+
+if __name__ == "__main__":
+    success = reconcile()
+    sys.exit(0 if success else 1)
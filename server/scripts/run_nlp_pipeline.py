@@ -15,6 +15,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from mongodb_store import MongoDBStore
 from advanced_nlp_analyzer import AdvancedNLPAnalyzer
 from models import RedditPost
+from post_archive import iter_posts
 
 load_dotenv()
 
@@ -45,12 +46,13 @@ def run_nlp_pipeline():
     # Initialize advanced NLP analyzer
     analyzer = AdvancedNLPAnalyzer()
     
-    # Load posts from MongoDB
-    logger.info("Loading posts from MongoDB...")
-    posts_cursor = data_store.db.posts.find({})
+    # Load posts from MongoDB and the archive of older posts
+    logger.info("Loading posts from MongoDB and the post archive...")
+    posts_cursor = iter_posts(data_store)
     posts = []
     
     total_words = 0
+    duplicates_skipped = 0
     for doc in posts_cursor:
         # Convert MongoDB document to RedditPost object
         post = RedditPost(
@@ -65,13 +67,21 @@ def run_nlp_pipeline():
             num_comments=doc.get('num_comments', 0)
         )
         post.products = doc.get('products', [])
+        post.cluster_id = doc.get('cluster_id')
+        post.duplicate_count = doc.get('duplicate_count', 1)
+        
+        # Near-duplicates are represented by their cluster's representative
+        if post.duplicate_count == 0:
+            duplicates_skipped += 1
+            continue
         posts.append(post)
         
         # Count words
         text = f"{post.title} {post.content}"
         total_words += len(text.split())
     
-    logger.info(f"Loaded {len(posts)} posts ({total_words:,} words)")
+    logger.info(f"Loaded {len(posts)} posts ({total_words:,} words), "
+                f"skipped {duplicates_skipped} near-duplicates")
     
     if len(posts) == 0:
         logger.warning("No posts found in database")
@@ -99,8 +109,8 @@ def run_nlp_pipeline():
     data_store.db.nlp_analyses.insert_one(analysis_doc)
     
     # Update pain points in database
-    for pp in results['pain_points'][:100]:  # Top 100 pain points
-        pain_point_doc = {
+    pain_point_docs = [
+        {
             '_id': f"{pp['category']}_{pp['indicator']}",
             'category': pp['category'],
             'indicator': pp['indicator'],
@@ -110,11 +120,11 @@ def run_nlp_pipeline():
             'affected_posts': pp['affected_posts'],
             'last_updated': datetime.utcnow()
         }
-        data_store.db.pain_points.update_one(
-            {'_id': pain_point_doc['_id']},
-            {'$set': pain_point_doc},
-            upsert=True
-        )
+        for pp in results['pain_points'][:100]  # Top 100 pain points
+    ]
+    save_result = data_store.save_pain_points_bulk(pain_point_docs)
+    for error in save_result['errors']:
+        logger.warning(f"Failed to save pain point {error['id']}: {error['error']}")
     
     # Log summary
     logger.info("=" * 60)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Train the sentiment classifier with a parallel hyperparameter sweep.
+
+Labeled data is read from a JSONL or CSV file with `text` and `label` fields
+(label is 'positive', 'negative' or 'neutral'). TF-IDF is fit inside each
+cross-validation fold; the per-fold feature matrices are cached on disk, so
+repeated sweeps over the same corpus skip TF-IDF entirely.
+"""
+import os
+import sys
+import csv
+import json
+import argparse
+import logging
+from datetime import datetime
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from advanced_nlp_analyzer import AdvancedNLPAnalyzer, DEFAULT_PARAM_GRID, FEATURE_CACHE_DIR
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def load_training_data(path):
+    """Load (text, label) pairs from a JSONL or CSV file."""
+    rows = []
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.endswith('.csv'):
+            records = csv.DictReader(f)
+        else:
+            records = (json.loads(line) for line in f if line.strip())
+        for record in records:
+            text, label = record.get('text'), record.get('label')
+            if text and label:
+                rows.append((text, label))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('data', help='Labeled training data (.jsonl or .csv)')
+    parser.add_argument('--cv', type=int, default=5, help='Number of cross-validation folds')
+    parser.add_argument('--n-jobs', type=int, default=-1, help='Parallel workers (-1 = all cores)')
+    parser.add_argument('--cache-dir', default=FEATURE_CACHE_DIR, help='Feature matrix cache directory')
+    parser.add_argument('--grid', help='JSON file with a classifier param grid (overrides the default grid)')
+    parser.add_argument('--vectorizer-grid', help='JSON file with a list of TfidfVectorizer param overrides')
+    parser.add_argument('--model-out', default='sentiment_model.joblib', help='Where to save the best model')
+    parser.add_argument('--results-out', default='nlp_training_results.json', help='Where to write per-config results')
+    args = parser.parse_args()
+
+    training_data = load_training_data(args.data)
+    logger.info(f"Loaded {len(training_data)} labeled samples from {args.data}")
+
+    param_grid = DEFAULT_PARAM_GRID
+    if args.grid:
+        with open(args.grid) as f:
+            param_grid = json.load(f)
+
+    vectorizer_grid = None
+    if args.vectorizer_grid:
+        with open(args.vectorizer_grid) as f:
+            vectorizer_grid = json.load(f)
+        # JSON has no tuples; TfidfVectorizer needs ngram_range as one
+        for params in vectorizer_grid:
+            if 'ngram_range' in params:
+                params['ngram_range'] = tuple(params['ngram_range'])
+
+    analyzer = AdvancedNLPAnalyzer()
+    search = analyzer.hyperparameter_search(
+        training_data,
+        param_grid=param_grid,
+        vectorizer_grid=vectorizer_grid,
+        cv=args.cv,
+        n_jobs=args.n_jobs,
+        cache_dir=args.cache_dir
+    )
+
+    if search['status'] != 'success':
+        logger.error(f"Training failed: {search['status']}")
+        return False
+
+    for result in search['results']:
+        logger.info(f"{result['accuracy']:.4f} (+/- {result['accuracy_std']:.4f}) "
+                    f"fit {result['fit_time']:.2f}s  {result['params']} {result['vectorizer_params']}")
+
+    analyzer.save_model(args.model_out)
+
+    with open(args.results_out, 'w') as f:
+        json.dump({
+            'timestamp': datetime.utcnow().isoformat(),
+            'samples': len(training_data),
+            'cv': args.cv,
+            'results': search['results'],
+            'best': search['best'],
+            'training': search['training']
+        }, f, indent=2, default=str)
+    logger.info(f"Wrote {len(search['results'])} config results to {args.results_out}")
+
+    accuracy = search['training']['accuracy']
+    if accuracy >= 0.94:
+        logger.info(f"✅ Accuracy target achieved: {accuracy:.2%} >= 94%")
+    else:
+        logger.warning(f"⚠️  Accuracy: {accuracy:.2%} (target: 94%)")
+
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,105 @@
+"""
+Lazily initialized service container.
+
+Heavy components (the Reddit scraper and its PRAW client, the NLP analyzers,
+the OpenAI client) are registered as factories and built on first use, so
+importing the API, running the tests or a one-off script only pays for what
+it actually touches. Under gunicorn the master can pre-warm selected
+services before forking so workers share them copy-on-write (see
+gunicorn.conf.py).
+"""
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceContainer:
+    """
+    Registry of named services built lazily from factories.
+
+    Services are available as attributes (`services.scraper`) or via get().
+    Construction is thread-safe and happens at most once per service until
+    reset() is called.
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Callable] = {}
+        self._instances: Dict[str, object] = {}
+        self._init_seconds: Dict[str, float] = {}
+        self._lock = threading.RLock()
+
+    def register(self, name: str, factory: Callable):
+        """
+        Register a factory for a service.
+
+        Args:
+            name: Service name
+            factory: Zero-argument callable that builds the service
+        """
+        with self._lock:
+            self._factories[name] = factory
+            self._instances.pop(name, None)
+
+    def get(self, name: str):
+        """
+        Get a service, building it on first use.
+
+        Raises:
+            KeyError: If no factory is registered under the name
+        """
+        try:
+            return self._instances[name]
+        except KeyError:
+            pass
+        with self._lock:
+            if name not in self._instances:
+                factory = self._factories[name]
+                started = time.perf_counter()
+                self._instances[name] = factory()
+                self._init_seconds[name] = time.perf_counter() - started
+                logger.info(f"Initialized service '{name}' in {self._init_seconds[name]:.3f}s")
+            return self._instances[name]
+
+    def __getattr__(self, name: str):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        try:
+            return self.get(name)
+        except KeyError:
+            raise AttributeError(f"No service registered as '{name}'") from None
+
+    def is_initialized(self, name: str) -> bool:
+        """Whether a service has been built."""
+        return name in self._instances
+
+    def warm(self, names: Optional[Iterable[str]] = None) -> Dict[str, float]:
+        """
+        Build services ahead of first use (e.g. in the gunicorn master before forking).
+
+        Args:
+            names: Services to build (default: all registered services)
+
+        Returns:
+            dict: Initialization time in seconds per service
+        """
+        for name in (list(names) if names is not None else list(self._factories)):
+            try:
+                self.get(name)
+            except Exception as e:
+                logger.error(f"Error pre-warming service '{name}': {str(e)}")
+        return dict(self._init_seconds)
+
+    def reset(self, names: Optional[Iterable[str]] = None):
+        """
+        Drop built services so they are rebuilt on next use.
+
+        Args:
+            names: Services to drop (default: all)
+        """
+        with self._lock:
+            for name in (list(names) if names is not None else list(self._instances)):
+                self._instances.pop(name, None)
+                self._init_seconds.pop(name, None)
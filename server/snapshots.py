@@ -0,0 +1,49 @@
+"""
+Copy-on-write snapshots of shared in-memory state.
+
+The scrape thread updates the store's caches while request threads read
+them. A SnapshotDict never changes a published mapping: the writer copies
+the current one, applies a whole batch of changes to the copy and publishes
+it by swapping one reference (atomic in CPython). Readers take the current
+snapshot without a lock and keep a consistent, read-only view for as long
+as they hold it; writers serialize on a lock readers never touch.
+"""
+import threading
+from types import MappingProxyType
+
+
+class SnapshotDict:
+    """
+    Dict published as immutable snapshots.
+
+    Args:
+        initial (dict): Initial contents
+    """
+    def __init__(self, initial=None):
+        self._write_lock = threading.Lock()
+        self._snapshot = MappingProxyType(dict(initial or {}))
+
+    @property
+    def snapshot(self):
+        """The current contents as a read-only mapping (never mutated after publication)."""
+        return self._snapshot
+
+    def publish(self, changes=None, removed=(), replace=False):
+        """
+        Publish a new snapshot with a batch of changes.
+
+        Args:
+            changes (dict): Keys to add or replace
+            removed (iterable): Keys to remove
+            replace (bool): Start from an empty dict instead of the current snapshot
+
+        Returns:
+            MappingProxyType: The published snapshot
+        """
+        with self._write_lock:
+            data = {} if replace else dict(self._snapshot)
+            data.update(changes or {})
+            for key in removed:
+                data.pop(key, None)
+            self._snapshot = MappingProxyType(data)
+            return self._snapshot
@@ -0,0 +1,183 @@
+"""
+Streaming spike detection on pain point frequencies.
+
+Each product x pain point series keeps a small state: the bucket currently
+being counted, its count, and an exponentially weighted mean and variance
+of the counts of the buckets before it. An analyzed post that mentions the
+pain point either increments the open bucket or closes it (folding its
+count, and any empty buckets skipped since, into the EWMA) and opens a new
+one, so each update is O(1). The open bucket is scored against the EWMA as
+it fills up: a z-score at or above the threshold flags a spike during the
+same scrape that brings the posts in.
+"""
+import math
+import os
+from datetime import datetime
+
+from time_series import GRANULARITIES, bucket_start, created_datetime
+
+SPIKE_GRANULARITY = os.getenv("SPIKE_GRANULARITY", "day")
+SPIKE_EWMA_ALPHA = float(os.getenv("SPIKE_EWMA_ALPHA", 0.3))
+SPIKE_Z_THRESHOLD = float(os.getenv("SPIKE_Z_THRESHOLD", 3.0))
+# Fewer posts than this in a bucket are never a spike
+SPIKE_MIN_COUNT = int(os.getenv("SPIKE_MIN_COUNT", 3))
+# Closed buckets needed before a series is scored
+SPIKE_WARMUP_BUCKETS = int(os.getenv("SPIKE_WARMUP_BUCKETS", 3))
+
+# Standard deviation floor, so a quiet series (all-zero history) needs a real jump
+_MIN_STD = 1.0
+# After this many empty buckets the EWMA has decayed to (practically) zero
+_MAX_DECAY_STEPS = 64
+
+
+class SeriesState:
+    """Detector state of one product x pain point series."""
+    def __init__(self, product, pain_point, current_bucket=None, current_count=0,
+                 mean=0.0, variance=0.0, buckets_seen=0, z_score=0.0, anomalous=False):
+        self.product = product
+        self.pain_point = pain_point
+        self.current_bucket = current_bucket
+        self.current_count = current_count
+        self.mean = mean
+        self.variance = variance
+        self.buckets_seen = buckets_seen
+        self.z_score = z_score
+        self.anomalous = anomalous
+
+    @property
+    def key(self):
+        return series_key(self.product, self.pain_point)
+
+    @classmethod
+    def from_document(cls, document):
+        return cls(**{name: document[name] for name in _STATE_FIELDS if name in document})
+
+    def to_document(self):
+        return {name: getattr(self, name) for name in _STATE_FIELDS}
+
+
+_STATE_FIELDS = ("product", "pain_point", "current_bucket", "current_count", "mean", "variance",
+                 "buckets_seen", "z_score", "anomalous")
+
+
+def series_key(product, pain_point):
+    """Document id of a series' detector state."""
+    return f"{product}:{pain_point}"
+
+
+class SpikeDetector:
+    """
+    EWMA / z-score detector over per-bucket pain point counts.
+
+    Args:
+        granularity (str): Bucket size, 'day' or 'hour'
+        alpha (float): EWMA smoothing factor (weight of the newest bucket)
+        threshold (float): z-score at which the open bucket is a spike
+        min_count (int): Minimum posts in the open bucket for a spike
+        warmup (int): Closed buckets required before scoring
+    """
+    def __init__(self, granularity=SPIKE_GRANULARITY, alpha=SPIKE_EWMA_ALPHA, threshold=SPIKE_Z_THRESHOLD,
+                 min_count=SPIKE_MIN_COUNT, warmup=SPIKE_WARMUP_BUCKETS):
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown spike granularity '{granularity}'. Expected one of: {', '.join(GRANULARITIES)}")
+        self.granularity = granularity
+        self.step = GRANULARITIES[granularity]
+        self.alpha = alpha
+        self.threshold = threshold
+        self.min_count = min_count
+        self.warmup = warmup
+
+    def events(self, posts):
+        """
+        (key, product, pain point, bucket) per analyzed post and matched pain point, oldest bucket first.
+
+        Args:
+            posts (list): Newly analyzed posts with pain_points, products and created_utc set;
+                a post repeated by id counts once
+        """
+        events = []
+        seen = set()
+        for post in posts:
+            created = created_datetime(getattr(post, 'created_utc', None))
+            post_id = getattr(post, 'id', None)
+            if created is None or getattr(post, 'sentiment', None) is None or post_id in seen:
+                continue
+            if post_id is not None:
+                seen.add(post_id)
+            bucket = bucket_start(created, self.granularity)
+            for pain_point in getattr(post, 'pain_points', None) or []:
+                for product in getattr(post, 'products', None) or []:
+                    events.append((series_key(product, pain_point), product, pain_point, bucket))
+        events.sort(key=lambda event: event[3])
+        return events
+
+    def _fold(self, state, count):
+        """Add one closed bucket's count to the EWMA mean and variance."""
+        diff = count - state.mean
+        increment = self.alpha * diff
+        state.mean += increment
+        state.variance = (1 - self.alpha) * (state.variance + diff * increment)
+        state.buckets_seen += 1
+
+    def observe(self, state, bucket):
+        """
+        Count one post for a series in O(1) and rescore its open bucket.
+
+        Posts for buckets older than the open one arrive too late to change
+        the detection and are ignored.
+
+        Returns:
+            bool: Whether the state changed
+        """
+        if state.current_bucket is None:
+            state.current_bucket = bucket
+        elif bucket > state.current_bucket:
+            self._fold(state, state.current_count)
+            empty = int((bucket - state.current_bucket) / self.step) - 1
+            for _ in range(min(empty, _MAX_DECAY_STEPS)):
+                self._fold(state, 0)
+            state.buckets_seen += max(0, empty - _MAX_DECAY_STEPS)
+            state.current_bucket = bucket
+            state.current_count = 0
+        elif bucket < state.current_bucket:
+            return False
+
+        state.current_count += 1
+        self.score(state)
+        return True
+
+    def score(self, state):
+        """z-score of the open bucket against the EWMA of the closed ones."""
+        std = max(math.sqrt(state.variance), _MIN_STD)
+        state.z_score = (state.current_count - state.mean) / std
+        state.anomalous = (state.buckets_seen >= self.warmup
+                           and state.current_count >= self.min_count
+                           and state.z_score >= self.threshold)
+        return state.z_score
+
+    def update(self, states, posts):
+        """
+        Feed newly analyzed posts into the series states.
+
+        Args:
+            states (dict): Series key -> SeriesState; missing series are added
+            posts (list): Newly analyzed posts (each passed once)
+
+        Returns:
+            set: Keys of the states that changed
+        """
+        changed = set()
+        for key, product, pain_point, bucket in self.events(posts):
+            state = states.get(key)
+            if state is None:
+                state = states[key] = SeriesState(product, pain_point)
+            if self.observe(state, bucket):
+                changed.add(key)
+        return changed
+
+    def is_current(self, state, now=None):
+        """Whether a state's open bucket is the current or the previous bucket (a live spike)."""
+        if state.current_bucket is None:
+            return False
+        now = bucket_start(now or datetime.utcnow(), self.granularity)
+        return state.current_bucket >= now - self.step
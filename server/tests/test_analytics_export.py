@@ -0,0 +1,82 @@
+"""
+Tests for the columnar analytics export and its corpus statistics.
+"""
+import pytest
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("pyarrow")
+
+import analytics_export
+from analytics_export import corpus_statistics, export_posts, load_posts, segment_paths
+from post_archive import archive_posts
+from tests.test_post_archive import NOW, saved_posts, store
+
+
+def analyze(store, posts):
+    for post, (sentiment, topics) in zip(posts, [(0.5, ["speed"]), (-0.4, ["speed", "price"]), (0.0, ["ui"]),
+                                                  (-0.3, ["price"])]):
+        post.sentiment = sentiment
+        post.topics = topics
+        post.pain_points = ["performance:slow"] if sentiment < 0 else []
+    store.save_posts_bulk(posts)
+
+
+def test_statistics_cover_both_tiers(store, tmp_path):
+    posts = saved_posts(store, [400, 300, 10, 1])
+    analyze(store, posts)
+    archive_posts(store, older_than_days=180, root=str(tmp_path / "archive"), now=NOW)
+
+    result = export_posts(store, root=str(tmp_path / "export"), archive_root=str(tmp_path / "archive"))
+    assert (result["exported"], result["total"]) == (4, 4)
+
+    stats = corpus_statistics(root=str(tmp_path / "export"))
+    assert stats["posts"] == stats["analyzed_posts"] == 4
+    assert stats["sentiment_distribution"] == {"positive": 1, "negative": 2, "neutral": 1}
+    assert stats["products"] == {"Cursor": 4}
+    assert stats["top_topics"] == [("price", 2), ("speed", 2), ("ui", 1)]
+    assert stats["top_pain_points"] == [("performance:slow", 2)]
+    assert stats["avg_sentiment"] == pytest.approx(-0.05)
+
+
+def test_export_is_incremental_and_latest_row_wins(store, tmp_path):
+    root = str(tmp_path / "export")
+    posts = saved_posts(store, [3, 2, 1])
+    export_posts(store, root=root, archive_root=str(tmp_path / "none"))
+    assert export_posts(store, root=root, archive_root=str(tmp_path / "none"))["exported"] == 0
+
+    posts[1].sentiment = 0.9
+    store.save_posts_bulk(posts)
+    assert export_posts(store, root=root, archive_root=str(tmp_path / "none"))["exported"] == 1
+
+    table = load_posts(root, ["_id", "sentiment"])
+    assert dict(zip(table.column("_id").to_pylist(), table.column("sentiment").to_pylist())) == {
+        "p0": -0.25, "p1": 0.9, "p2": -0.25
+    }
+
+
+def test_segments_are_compacted(store, tmp_path, monkeypatch):
+    monkeypatch.setattr(analytics_export, "ANALYTICS_MAX_SEGMENTS", 2)
+    root = str(tmp_path / "export")
+    posts = saved_posts(store, [3, 2, 1])
+    for score in range(4):
+        posts[0].score = score + 10
+        store.save_posts_bulk(posts)
+        export_posts(store, root=root, archive_root=str(tmp_path / "none"))
+    assert len(segment_paths(root)) <= 2
+    table = load_posts(root, ["_id", "score"])
+    assert sorted(zip(table.column("_id").to_pylist(), table.column("score").to_pylist())) == [
+        ("p0", 13), ("p1", 1), ("p2", 1)
+    ]
+
+
+def test_near_duplicates_count_once(tmp_path):
+    import pyarrow as pa
+    rows = [analytics_export._row({"_id": f"d{i}", "sentiment": 0.5, "duplicate_count": count, "products": ["A"]})
+            for i, count in enumerate([3, 0, 0, 1])]
+    stats = corpus_statistics(pa.Table.from_pylist(rows, schema=analytics_export.EXPORT_SCHEMA))
+    assert (stats["posts"], stats["products"]) == (2, {"A": 2})
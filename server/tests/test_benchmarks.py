@@ -0,0 +1,88 @@
+"""
+Tests for the benchmark helpers.
+"""
+import pytest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_corpus import generate_posts
+from benchmarks.nlp_throughput import compare_to_baseline
+
+
+def test_synthetic_corpus_is_deterministic():
+    """Same seed and scale must produce the same corpus."""
+    first = generate_posts(total_words=5000, seed=7)
+    second = generate_posts(total_words=5000, seed=7)
+    assert [(p.id, p.title, p.content) for p in first] == [(p.id, p.title, p.content) for p in second]
+    assert sum(len(f"{p.title} {p.content}".split()) for p in first) >= 5000
+
+
+def test_synthetic_corpus_seed_changes_output():
+    """Different seeds should produce different corpora."""
+    first = generate_posts(total_words=2000, seed=1)
+    second = generate_posts(total_words=2000, seed=2)
+    assert [p.content for p in first] != [p.content for p in second]
+
+
+def test_compare_to_baseline_flags_regressions():
+    """Stages slower than the tolerance are reported as regressions."""
+    baseline = {
+        "stages": {"preprocess_text": {"words_per_sec": 1000.0}, "extract_topics": {"words_per_sec": 1000.0}},
+        "total": {"words_per_sec": 1000.0},
+    }
+    results = {
+        "stages": {"preprocess_text": {"words_per_sec": 950.0}, "extract_topics": {"words_per_sec": 500.0}},
+        "total": {"words_per_sec": 900.0},
+    }
+    comparison = compare_to_baseline(results, baseline, tolerance=0.15)
+    assert comparison["regressions"] == ["extract_topics"]
+    assert comparison["stages"]["preprocess_text"] == pytest.approx(0.95)
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/smaps_rollup"), reason="needs Linux /proc/<pid>/smaps_rollup")
+def test_worker_memory_reads_smaps_rollup():
+    """Shared + private memory add up to RSS for the current process."""
+    from benchmarks.worker_memory import smaps_rollup, child_pids
+
+    memory = smaps_rollup(os.getpid())
+    assert memory["rss_mb"] > 0
+    assert abs(memory["shared_mb"] + memory["private_mb"] - memory["rss_mb"]) < 1
+    assert os.getpid() in child_pids(os.getppid())
+
+
+def test_post_listing_projection_matches_response_shape():
+    """Projected documents carry exactly the fields the old response builder produced."""
+    from benchmarks.post_listing import run_benchmark, _project, _copy_response
+    document = {"_id": "abc", "title": "t", "content": "long body", "score": 3, "created_utc": "2024-01-01"}
+    assert _project(document) == _copy_response(document)
+
+    results = run_benchmark(page_size=20, repeats=1)
+    variants = results["variants"]
+    assert variants["projection"]["wire_bytes"] < variants["full"]["wire_bytes"]
+
+
+def test_rescrape_writes_only_changed_posts():
+    """A re-scrape with 5% changed posts writes a fraction of the full-document bytes."""
+    from benchmarks.rescrape_writes import run_benchmark
+    results = run_benchmark(post_count=200, changed=0.05)
+    assert results["variants"]["fingerprinted"]["operations"] == 10
+    assert results["reduction"] > 10
+
+
+def test_post_index_returns_the_same_pages_as_the_list_fallback():
+    """The columnar index selects exactly the pages the list comprehensions did."""
+    from benchmarks.post_index import run_benchmark
+    results = run_benchmark(post_count=2000, repeats=1)
+    assert all(query["same_page"] for query in results["queries"].values())
+
+
+def test_model_memory_slotted_models_are_smaller():
+    """Slotted posts and compact related posts take less memory than the __dict__ models."""
+    from benchmarks.model_memory import run_benchmark
+    results = run_benchmark(post_count=2000, pain_point_count=50)
+    dict_models, slotted = results["variants"]["dict"], results["variants"]["slots"]
+    assert slotted["bytes_per_post"] < dict_models["bytes_per_post"]
+    assert slotted["bytes_per_pain_point"] < dict_models["bytes_per_pain_point"]
@@ -0,0 +1,100 @@
+"""
+Tests for the regex tokenizer.
+"""
+import pytest
+import sys
+import os
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fast_tokenizer import get_tokenizer, regex_word_tokenize, regex_count_sentences
+
+
+def test_contractions_and_clitics_match_treebank():
+    assert regex_word_tokenize("I can't believe it's broken, don't they test?") == [
+        'I', 'ca', "n't", 'believe', 'it', "'s", 'broken', ',', 'do', "n't", 'they', 'test', '?'
+    ]
+    assert regex_word_tokenize("We've waited; they'll fix it.") == [
+        'We', "'ve", 'waited', ';', 'they', "'ll", 'fix', 'it', '.'
+    ]
+
+
+def test_numbers_and_reddit_tokens_stay_whole():
+    tokens = regex_word_tokenize("1,000 users at 10:30 on v3.5, thanks /u/dev_1 in /r/python.")
+    assert tokens == ['1,000', 'users', 'at', '10:30', 'on', 'v3.5', ',', 'thanks', '/u/dev_1',
+                      'in', '/r/python', '.']
+    assert regex_word_tokenize("") == []
+
+
+def test_runs_of_periods_tokenize_in_linear_time():
+    """Scraped text with long runs of periods must not backtrack quadratically."""
+    started = time.perf_counter()
+    for text in ("." * 20000, "a" + "." * 20000 + "b", "a." * 10000, "1," * 10000):
+        regex_word_tokenize(text)
+    assert time.perf_counter() - started < 0.5
+    assert regex_word_tokenize("a" + "." * 7 + "b") == ['a', '.......', 'b']
+
+
+def test_runs_of_terminators_count_sentences_in_linear_time():
+    """Long runs of . ! ? that end in a non-space must not be retried from every character."""
+    started = time.perf_counter()
+    for text in ("." * 20000 + "x", "!" * 20000 + "x", "?!." * 7000 + "x", ".)" * 10000 + "x"):
+        assert regex_count_sentences(text) == 1
+    assert time.perf_counter() - started < 0.5
+    assert regex_count_sentences("What?!?! " * 3 + "ok") == 4
+
+
+def test_count_sentences():
+    assert regex_count_sentences("") == 0
+    assert regex_count_sentences("no terminator") == 1
+    assert regex_count_sentences("It crashed. Again! Why? ") == 3
+    assert regex_count_sentences("Wait... what?! (yes.) no") == 4
+    assert regex_count_sentences("Version 3.5 vs. 3.6 is slower.") == 1
+
+
+def test_get_tokenizer_switch():
+    assert get_tokenizer('regex').word_tokenize is regex_word_tokenize
+    assert get_tokenizer('NLTK').name == 'nltk'
+    with pytest.raises(ValueError):
+        get_tokenizer('spacy')
+
+
+def test_agreement_with_nltk_on_synthetic_corpus():
+    pytest.importorskip('nltk')
+    from benchmarks.synthetic_corpus import generate_posts
+    from benchmarks.tokenizer_agreement import measure_agreement
+
+    texts = [f"{post.title} {post.content}" for post in generate_posts(total_words=5000, seed=3)]
+    try:
+        results = measure_agreement(texts)
+    except LookupError:
+        pytest.skip("NLTK punkt data not available")
+    assert results['content_token_agreement'] >= 0.99
+    assert results['sentence_count_agreement'] >= 0.95
+
+
+# Real-text edge cases: URLs, ellipses, decimals, versions and trailing periods
+EDGE_CASES = [
+    "See https://example.com/a.b?x=1 and www.foo.org/path.",
+    "Wait... what.... ok..",
+    "Hmm..... Version 2.0... wow",
+    "It costs 3.5 or .5 dollars, $3.50 for 1,000.5 tokens, v1.2.3 and 1.",
+    "foo..bar and done.Next",
+    "U.S.A. is big, go to example.com. then",
+    "pi=3.14159. ratio 2:1 at 10:30.",
+    "(see foo.) ...start",
+    "O'Neil's editor can't open http://x.io/a..b",
+]
+
+
+@pytest.mark.parametrize("text", EDGE_CASES)
+def test_edge_cases_match_nltk(text):
+    pytest.importorskip('nltk')
+    from fast_tokenizer import nltk_word_tokenize
+    try:
+        expected = nltk_word_tokenize(text)
+    except LookupError:
+        pytest.skip("NLTK punkt data not available")
+    assert regex_word_tokenize(text) == expected
@@ -0,0 +1,174 @@
+"""
+Tests for the declarative index specification.
+
+The reconciliation and query-shape coverage tests need no database. The
+explain-based test runs every GetPosts query shape against a real MongoDB
+and fails on collection scans or in-memory sorts; it only runs when
+MONGODB_TEST_URI points at a server it may create a scratch database on.
+"""
+import itertools
+import os
+import sys
+import uuid
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mongodb_store import MongoDBStore, INDEX_SPEC, POST_SORT_FIELDS, CASE_INSENSITIVE
+from pagination import keyset_filter
+
+
+class FakeIndexCollection:
+    """Keeps index_information() in the shape MongoDB returns it."""
+    def __init__(self, indexes=None):
+        self.indexes = {"_id_": {"key": [("_id", 1)]}}
+        self.indexes.update(indexes or {})
+        self.created = []
+        self.dropped = []
+
+    def index_information(self):
+        return {name: dict(info) for name, info in self.indexes.items()}
+
+    def create_indexes(self, models):
+        for model in models:
+            document = dict(model.document)
+            name = document.pop("name")
+            document["key"] = list(document["key"].items())
+            if "collation" in document:
+                # The server echoes the collation back with every option filled in
+                document["collation"] = dict(document["collation"], caseLevel=False, numericOrdering=False)
+            self.indexes[name] = document
+            self.created.append(name)
+
+    def drop_index(self, name):
+        del self.indexes[name]
+        self.dropped.append(name)
+
+
+class FakeIndexDB(dict):
+    def __missing__(self, name):
+        self[name] = FakeIndexCollection()
+        return self[name]
+
+
+@pytest.fixture
+def store():
+    store = MongoDBStore(None, lazy=True)
+    store.db = FakeIndexDB()
+    return store
+
+
+def test_ensure_indexes_is_idempotent(store):
+    first = store.ensure_indexes()
+    expected = sum(len(models) for models in INDEX_SPEC.values())
+    assert len(first["created"]) == expected
+    assert "posts.subreddit_ci_created_utc" in first["created"]
+
+    second = store.ensure_indexes()
+    assert second == {"created": [], "rebuilt": [], "dropped": [], "unchanged": expected}
+
+
+def test_ensure_indexes_rebuilds_changed_and_keeps_unmanaged(store):
+    store.db["users"] = FakeIndexCollection({
+        "username_1": {"key": [("username", 1)]},  # lost its unique option
+        "email_1": {"key": [("email", 1)]},
+    })
+    result = store.ensure_indexes()
+    assert result["rebuilt"] == ["users.username_1"]
+    assert store.db["users"].indexes["username_1"]["unique"] is True
+    assert "email_1" in store.db["users"].indexes
+
+    result = store.ensure_indexes(drop_stale=True)
+    assert result["dropped"] == ["users.email_1"]
+    assert set(store.db["users"].indexes) == {"_id_", "username_1"}
+
+
+def test_ensure_indexes_without_database():
+    store = MongoDBStore(None, lazy=True)
+    assert store.ensure_indexes() == {"created": [], "rebuilt": [], "dropped": [], "unchanged": 0}
+
+
+def _post_query_shapes():
+    """Every GetPosts filter combination, with each sort field."""
+    for product, pain, subreddit, score, comments in itertools.product(
+            (None, "Cursor"), (False, True), (None, "Programming"), (0, 10), (0, 5)):
+        query, collation = MongoDBStore.posts_query(product, pain, subreddit, score, comments)
+        for field in POST_SORT_FIELDS.values():
+            yield query, collation, field
+
+
+def _equality_fields(query):
+    return [field for field, condition in query.items() if not isinstance(condition, dict)]
+
+
+def test_every_post_query_shape_has_an_esr_index():
+    specs = [model.document for model in INDEX_SPEC["posts"]]
+    for query, collation, sort_field in _post_query_shapes():
+        equality = _equality_fields(query)
+        # Equality prefix from the filter, then the sort field and the _id tie-breaker;
+        # string bounds need the query's collation
+        candidates = [
+            spec for spec in specs
+            if spec.get("collation") == collation
+            and list(spec["key"])[-2:] == [sort_field, "_id"]
+            and set(list(spec["key"])[:-2]) <= set(equality)
+        ]
+        assert candidates, f"No index serves {query} sorted by {sort_field}"
+
+
+def test_subreddit_filter_is_collated_equality():
+    query, collation = MongoDBStore.posts_query(subreddit="Programming.*")
+    assert query == {"subreddit": "Programming.*"}
+    assert collation == CASE_INSENSITIVE
+
+
+def _plan_stages(plan):
+    """All stage names in an explain plan tree."""
+    stages = [plan.get("stage")]
+    for child in [plan.get("inputStage")] + plan.get("inputStages", []):
+        if child:
+            stages.extend(_plan_stages(child))
+    return stages
+
+
+@pytest.fixture
+def live_db():
+    uri = os.getenv("MONGODB_TEST_URI")
+    if not uri:
+        pytest.skip("MONGODB_TEST_URI not set")
+    from pymongo import MongoClient
+    client = MongoClient(uri, serverSelectionTimeoutMS=2000)
+    name = f"index_test_{uuid.uuid4().hex[:8]}"
+    try:
+        client.admin.command("ping")
+    except Exception as e:
+        pytest.skip(f"MongoDB not reachable: {e}")
+    db = client[name]
+    db.posts.insert_many([
+        {"_id": f"p{i}", "products": ["Cursor"] if i % 2 else ["Replit"], "subreddit": "programming",
+         "pain_points": ["slow"] if i % 3 else [], "score": i, "num_comments": i % 7,
+         "created_utc": f"2024-01-{i % 28 + 1:02d}", "sentiment": (i % 5) / 5}
+        for i in range(200)
+    ])
+    yield db
+    client.drop_database(name)
+    client.close()
+
+
+def test_post_queries_use_indexes(live_db):
+    store = MongoDBStore(None, lazy=True)
+    store.db = live_db
+    store.ensure_indexes()
+
+    for query, collation, sort_field in _post_query_shapes():
+        for direction in (-1, 1):
+            # First page, and a later page continued with a keyset cursor
+            page_filter = keyset_filter(sort_field, direction, 5, "p100")
+            for page_query in (query, {"$and": [query, page_filter]} if query else page_filter):
+                cursor = live_db.posts.find(page_query, collation=collation).sort(
+                    [(sort_field, direction), ("_id", direction)]).limit(21)
+                stages = _plan_stages(cursor.explain()["queryPlanner"]["winningPlan"])
+                assert "COLLSCAN" not in stages, f"{page_query} sorted by {sort_field} scans the collection"
+                assert "SORT" not in stages, f"{page_query} sorted by {sort_field} sorts in memory"
@@ -0,0 +1,47 @@
+"""
+Tests for the slotted in-memory models and the compact related-post list.
+"""
+import pytest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import PainPoint, RedditPost, RelatedPosts
+from tests.test_mongodb_store import make_post
+
+
+def test_related_posts_round_trip_reddit_and_other_ids():
+    ids = ["1abc2d", "z", "0", "t3_1abc2d", "0a1", "ABC", "", "zzzzzzzzzzzzz", 42]
+    related = RelatedPosts(ids)
+    assert list(related) == ids and len(related) == len(ids)
+    assert related[0] == "1abc2d" and related[-1] == 42
+    assert related._other == ["t3_1abc2d", "0a1", "ABC", "", "zzzzzzzzzzzzz", 42]
+
+
+def test_related_posts_behaves_like_a_list():
+    related = RelatedPosts(["a1", "b2", "c3"])
+    assert related[:2] == ["a1", "b2"] and isinstance(related[:2], RelatedPosts)
+    assert related + ["d4"] == ["a1", "b2", "c3", "d4"]
+    assert ["x"] + related == ["x", "a1", "b2", "c3"]
+    assert related != ["a1", "b2"]
+
+
+def test_pain_point_keeps_related_posts_compact():
+    pain_point = PainPoint("Slow", "", related_posts=["a1", "b2"])
+    assert isinstance(pain_point.related_posts, RelatedPosts)
+    pain_point.related_posts = pain_point.related_posts + ["c3"]
+    assert pain_point.to_dict()["related_posts_count"] == 3
+
+
+def test_posts_declare_their_fields_and_intern_names():
+    post = make_post("abc")
+    names = [RedditPost(id=post_id, title="", content="", author="".join(["us", "er"]),
+                        subreddit="".join(["cur", "sor"]), url="", created_utc=None, score=0, num_comments=0)
+             for post_id in ("a", "b")]
+    assert names[0].subreddit is names[1].subreddit and names[0].author is names[1].author
+    assert not hasattr(post, "__dict__")
+    assert set(post.to_dict()) == set(post.__slots__)
+    with pytest.raises(AttributeError):
+        post.undeclared = True
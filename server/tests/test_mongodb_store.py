@@ -0,0 +1,250 @@
+"""
+Tests for the MongoDBStore bulk persistence path (no database required).
+"""
+import pytest
+import sys
+import os
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymongo.errors import BulkWriteError
+from mongodb_store import MongoDBStore, STATUS_COUNTERS_ID, PRODUCT_CATALOG_ID
+from models import RedditPost, PainPoint
+
+
+class FakeCollection:
+    """Stores upserted documents, records bulk_write calls and fails the operations for selected ids."""
+    def __init__(self, name, failing_ids=()):
+        self.name = name
+        self.failing_ids = set(failing_ids)
+        self.batches = []
+        self.docs = {}
+        self.writes = []
+
+    def bulk_write(self, operations, ordered=True):
+        assert ordered is False
+        ids = [op._filter["_id"] for op in operations]
+        self.batches.append(ids)
+        upserted = 0
+        for op, doc_id in zip(operations, ids):
+            if doc_id not in self.failing_ids:
+                if doc_id not in self.docs:
+                    upserted += 1
+                    self.docs[doc_id] = dict(op._doc.get("$setOnInsert", {}))
+                doc = self.docs[doc_id]
+                doc.update(op._doc.get("$set", {}))
+                for name, delta in op._doc.get("$inc", {}).items():
+                    doc[name] = doc.get(name, 0) + delta
+                for name, value in op._doc.get("$max", {}).items():
+                    doc[name] = max(doc.get(name, value), value)
+                self.writes.append(op._doc)
+        write_errors = [
+            {"index": index, "code": 11000, "errmsg": f"duplicate key {doc_id}"}
+            for index, doc_id in enumerate(ids) if doc_id in self.failing_ids
+        ]
+        if write_errors:
+            raise BulkWriteError({"writeErrors": write_errors, "nInserted": 0, "nUpserted": upserted})
+        return SimpleNamespace(upserted_count=upserted)
+
+    def find(self, query, projection=None):
+        # Only lookups by {"_id": {"$in": [...]}}
+        return [dict({field: self.docs[doc_id][field] for field in projection or self.docs[doc_id]
+                      if field in self.docs[doc_id]}, _id=doc_id)
+                for doc_id in query["_id"]["$in"] if doc_id in self.docs]
+
+    def count_documents(self, query):
+        if not query:
+            return len(self.docs)
+        return sum(1 for doc in self.docs.values() if doc.get("sentiment") is not None)
+
+
+class FakeMetadata:
+    def __init__(self):
+        self.docs = {}
+
+    def update_one(self, query, update, upsert=False):
+        doc = self.docs.setdefault(query["_id"], {"_id": query["_id"]})
+        for name, delta in update.get("$inc", {}).items():
+            doc[name] = doc.get(name, 0) + delta
+        doc.update(update.get("$set", {}))
+
+    def find_one(self, query):
+        return self.docs.get(query["_id"])
+
+
+class FakeDB:
+    def __init__(self, failing_ids=()):
+        self.posts = FakeCollection("posts", failing_ids)
+        self.archived_posts = FakeCollection("archived_posts")
+        self.pain_points = FakeCollection("pain_points", failing_ids)
+        self.openai_analysis = FakeCollection("openai_analysis")
+        self.product_catalog = FakeCollection("product_catalog")
+        self.metadata = FakeMetadata()
+
+
+def make_post(post_id):
+    return RedditPost(
+        id=post_id, title=f"title {post_id}", content="content", author="user", subreddit="test",
+        url=f"http://test.com/{post_id}", created_utc=datetime(2024, 1, 1), score=1, num_comments=0
+    )
+
+
+@pytest.fixture
+def store():
+    store = MongoDBStore(None, lazy=True)
+    store.db = FakeDB(failing_ids={"p3", "Cursor_slow"})
+    return store
+
+
+def test_save_posts_bulk_batches_and_reports_errors(store):
+    posts = [make_post(f"p{i}") for i in range(7)] + [{"title": "no id"}]
+    result = store.save_posts_bulk(posts, batch_size=3)
+
+    assert store.db.posts.batches == [["p0", "p1", "p2"], ["p3", "p4", "p5"], ["p6"]]
+    assert result["saved"] == 6
+    assert "p3" not in result["saved_ids"]
+    assert {error["id"] for error in result["errors"]} == {"p3", None}
+    assert [post.id for post in store.raw_posts] == [f"p{i}" for i in range(7) if i != 3]
+
+
+def test_save_posts_bulk_does_not_duplicate_raw_posts(store):
+    store.save_posts_bulk([make_post("p0")])
+    store.save_posts_bulk([make_post("p0"), make_post("p1")])
+    assert [post.id for post in store.raw_posts] == ["p0", "p1"]
+
+
+def test_save_pain_points_bulk_updates_cache(store):
+    slow = PainPoint(name="slow", description="performance issue", product="Cursor")
+    crash = PainPoint(name="crash", description="reliability issue", product="Cursor")
+    doc = {"_id": "performance_lag", "category": "performance", "indicator": "lag"}
+
+    result = store.save_pain_points_bulk([slow, crash, doc])
+    assert result["saved"] == 2
+    assert result["errors"] == [{"id": "Cursor_slow", "error": "duplicate key Cursor_slow"}]
+    assert store.pain_points["Cursor_crash"] is crash
+    assert "Cursor_slow" not in store.pain_points
+    assert "performance_lag" in store.pain_points
+
+
+def test_bulk_save_without_database():
+    store = MongoDBStore(None, lazy=True)
+    store.mongodb_uri = None  # ignore MONGODB_URI from the environment
+    result = store.save_posts_bulk([make_post("p0")])
+    assert result["saved"] == 0
+    assert result["errors"]
+
+
+def test_product_catalog_pipeline_shape():
+    pipeline = MongoDBStore.product_catalog_pipeline()
+    assert not [stage for stage in pipeline if "$lookup" in stage]
+    assert set(pipeline[-1]["$group"]) == {"_id", "name", "post_count", "last_seen"}
+
+
+def test_bulk_writes_maintain_the_product_catalog():
+    store = MongoDBStore(None, lazy=True)
+    store.db = FakeDB()
+    catalog = store.db.product_catalog.docs
+
+    first, second = make_post("a1"), make_post("a2")
+    first.products, second.products = ["Cursor", "cursor "], ["Cursor", "Copilot"]
+    second.created_utc = datetime(2024, 3, 1)
+    store.save_posts_bulk([first, second])
+    assert catalog["cursor"] == {"name": "Cursor", "post_count": 2, "last_seen": datetime(2024, 3, 1)}
+    assert catalog["copilot"]["post_count"] == 1
+
+    # Same products again: no count changes; a post moving to another product moves its count
+    moved = make_post("a1")
+    moved.products = ["Windsurf"]
+    store.save_posts_bulk([second, moved, moved])
+    assert (catalog["cursor"]["post_count"], catalog["copilot"]["post_count"],
+            catalog["windsurf"]["post_count"]) == (1, 1, 1)
+
+
+def test_all_products_endpoint_reads_the_catalog(monkeypatch):
+    import api
+
+    class Catalog:
+        def __init__(self):
+            self.queries = []
+
+        def find(self, query, projection=None):
+            self.queries.append(query)
+            return SimpleNamespace(sort=lambda field, direction: [
+                {"_id": "cursor", "name": "Cursor", "post_count": 3, "last_seen": datetime(2024, 5, 1)}])
+
+    class Keyed:
+        def __init__(self, documents):
+            self.documents = documents
+
+        def find(self, query, projection=None):
+            return self.documents
+
+    class NoPosts:
+        """Reading the posts collection fails the test."""
+        product_catalog = Catalog()
+        openai_analysis = Keyed([{"_id": "cursor"}])
+        recommendations = Keyed([])
+        metadata = FakeMetadata()
+
+    NoPosts.metadata.update_one({"_id": PRODUCT_CATALOG_ID}, {"$set": {"reconciled_at": datetime.utcnow()}})
+    monkeypatch.setattr(api.data_store, "_db", NoPosts())
+    response = api.GetAllProducts.get.__wrapped__(api.GetAllProducts(), {"username": "test"})
+
+    assert NoPosts.product_catalog.queries == [{"post_count": {"$gt": 0}}]
+    assert response["products"] == [{"name": "Cursor", "has_analysis": True, "has_recommendations": False,
+                                     "post_count": 3, "last_seen": response["products"][0]["last_seen"]}]
+
+
+def test_status_counters_follow_bulk_writes(store):
+    posts = [make_post(f"p{i}") for i in range(5)]
+    store.save_posts_bulk(posts)
+    counters = store.db.metadata.docs[STATUS_COUNTERS_ID]
+    # p3 fails, so four new posts, none analyzed yet
+    assert (counters["posts"], counters.get("analyzed_posts", 0)) == (4, 0)
+
+    for post in posts:
+        post.sentiment = 0.5
+    store.save_posts_bulk(posts)
+    # Re-saving adds no posts; the four stored posts just gained a sentiment score
+    assert (counters["posts"], counters["analyzed_posts"]) == (4, 4)
+
+    store.save_posts_bulk(posts)
+    assert counters["analyzed_posts"] == 4
+
+
+
+def test_post_repeated_in_a_batch_is_analyzed_once(store):
+    posts = [make_post("p1"), make_post("p1")]
+    for post in posts:
+        post.sentiment = -0.5
+    result = store.save_posts_bulk(posts)
+    counters = store.db.metadata.docs[STATUS_COUNTERS_ID]
+    assert result["newly_analyzed_ids"] == ["p1"]
+    assert (counters["posts"], counters["analyzed_posts"]) == (1, 1)
+
+
+class InlineThread:
+    """Runs the target on start(), so background reconciliation is deterministic."""
+    def __init__(self, target, daemon=None):
+        self.target = target
+
+    def start(self):
+        self.target()
+
+
+def test_status_counters_reconcile_on_first_read_and_when_stale(store, monkeypatch):
+    monkeypatch.setattr("mongodb_store.threading.Thread", InlineThread)
+    store.save_posts_bulk([make_post("p1"), make_post("p2")])
+    store.db.metadata.docs.clear()
+
+    assert store.get_status_counters() == {"posts": 2, "analyzed_posts": 0, "pain_points": 0, "openai_analyses": 0}
+
+    store.db.metadata.docs[STATUS_COUNTERS_ID]["posts"] = 99
+    assert store.get_status_counters()["posts"] == 99
+
+    store.db.metadata.docs[STATUS_COUNTERS_ID]["reconciled_at"] = datetime.utcnow() - timedelta(days=1)
+    store.get_status_counters()
+    assert store.db.metadata.docs[STATUS_COUNTERS_ID]["posts"] == 2
@@ -0,0 +1,152 @@
+"""
+Tests for MinHash/LSH near-duplicate detection.
+"""
+import pytest
+import sys
+import os
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from near_duplicates import NearDuplicateDetector, apply_clusters, propagate_analysis, unique_posts
+from models import RedditPost
+from mongodb_store import MongoDBStore
+from tests.test_mongodb_store import FakeCollection, FakeDB
+
+
+def make_post(post_id, title, content, score=1):
+    return RedditPost(
+        id=post_id, title=title, content=content, author="user", subreddit="test",
+        url=f"http://test.com/{post_id}", created_utc=None, score=score, num_comments=0
+    )
+
+
+COMPLAINT = ("Cursor keeps crashing every time I open a large TypeScript project and the "
+             "autocomplete freezes for several seconds before the whole editor becomes unusable")
+
+
+class InMemorySignatureStore:
+    """Minimal stand-in for the persisted LSH index."""
+    def __init__(self):
+        self.docs = {}
+
+    def save_post_signatures(self, docs):
+        for doc in docs:
+            self.docs[doc['_id']] = doc
+        return True
+
+    def find_signature_candidates(self, band_keys):
+        keys = set(band_keys)
+        return [doc for doc in self.docs.values() if keys & set(doc['bands'])]
+
+
+@pytest.fixture
+def detector():
+    return NearDuplicateDetector()
+
+
+def test_crossposts_are_clustered(detector):
+    """Copies with small edits land in one cluster; unrelated posts stay separate."""
+    posts = [
+        make_post("a", "Cursor crashing", COMPLAINT, score=5),
+        make_post("b", "Cursor crashing", COMPLAINT + " again", score=50),
+        make_post("c", "Replit pricing", "Is the Replit core plan worth it for a small school project?"),
+    ]
+    clusters = detector.cluster_posts(posts)
+
+    assert len(clusters) == 2
+    crash_cluster = next(c for c in clusters if c.size == 2)
+    assert crash_cluster.representative.id == "b"  # highest score wins
+    assert crash_cluster.cluster_id == "b"
+
+
+def test_same_post_from_several_searches_counts_once(detector):
+    """The same submission returned by multiple queries is one distinct post."""
+    posts = [make_post("a", "Cursor crashing", COMPLAINT), make_post("a", "Cursor crashing", COMPLAINT)]
+    clusters = detector.cluster_posts(posts)
+    assert len(clusters) == 1
+    assert clusters[0].size == 1
+
+
+def test_post_returned_for_two_products_keeps_its_weight(detector):
+    """Separate objects for one submission (one per product search) are saved with the cluster weight."""
+    store = MongoDBStore(None, lazy=True)
+    store.db = FakeDB()
+    store.db.pain_point_series = FakeCollection("pain_point_series")
+    store.db.pain_point_spikes = FakeCollection("pain_point_spikes")
+
+    cursor_search = [make_post("a", "Cursor crashing", COMPLAINT, score=9),
+                     make_post("b", "Cursor crashing", COMPLAINT)]
+    copilot_search = [make_post("a", "Cursor crashing", COMPLAINT, score=9)]
+    assert [post.id for post in unique_posts(cursor_search + copilot_search)] == ["a", "b"]
+
+    # As background_scrape does: cluster, then save every member of every cluster
+    clusters = detector.cluster_posts(cursor_search + copilot_search)
+    apply_clusters(clusters)
+    members = [member for cluster in clusters for member in cluster.members]
+    assert [member.id for member in members] == ["a", "b"]
+    for post in members:
+        post.sentiment = -0.5
+    store.enqueue_posts(members)
+    store.flush_posts(timeout=5)
+    assert store.db.posts.docs["a"]["duplicate_count"] == 2
+    assert store.db.posts.docs["b"]["duplicate_count"] == 0
+    store.post_writer.close(timeout=5)
+
+
+def test_clusters_do_not_depend_on_arrival_order(detector, monkeypatch):
+    """Bucket members similar to each other but not to the first member are still merged."""
+    similar = {frozenset("ab"), frozenset("bc"), frozenset("cd")}
+    monkeypatch.setattr(detector, "signature", lambda text: text.strip())
+    monkeypatch.setattr(detector, "band_keys", lambda signature: [0])
+    monkeypatch.setattr(detector, "similarity",
+                        lambda first, second: 1.0 if frozenset(first + second) in similar else 0.0)
+
+    for order in ("abcde", "edcba", "cadeb", "bdaec"):
+        clusters = detector.cluster_posts([make_post(letter, letter, "") for letter in order])
+        assert sorted(sorted(member.id for member in cluster.members) for cluster in clusters) == [
+            ["a", "b", "c", "d"], ["e"]]
+
+
+def test_burst_of_identical_posts_is_verified_in_linear_time(detector):
+    """Each post of a burst is checked against its cluster, not against every other post in the bucket."""
+    posts = [make_post(f"p{index}", "Cursor crashing", COMPLAINT) for index in range(2000)]
+    started = time.perf_counter()
+    clusters = detector.cluster_posts(posts)
+    assert time.perf_counter() - started < 2.0
+    assert [cluster.size for cluster in clusters] == [2000]
+
+
+def test_apply_clusters_weights_representatives(detector):
+    """Representatives carry the cluster size, duplicates weigh nothing and inherit analysis."""
+    posts = [make_post("a", "Cursor crashing", COMPLAINT), make_post("b", "Cursor crashing", COMPLAINT)]
+    clusters = detector.cluster_posts(posts)
+    representatives = apply_clusters(clusters)
+
+    assert len(representatives) == 1
+    assert representatives[0].duplicate_count == 2
+    duplicate = next(p for p in posts if p is not representatives[0])
+    assert duplicate.duplicate_count == 0
+    assert duplicate.cluster_id == representatives[0].cluster_id
+
+    representatives[0].sentiment = -0.8
+    propagate_analysis(clusters)
+    assert duplicate.sentiment == -0.8
+
+
+def test_persisted_index_reuses_cluster_ids(detector):
+    """A later copy of an already stored post joins the stored cluster."""
+    store = InMemorySignatureStore()
+    detector.cluster_posts([make_post("old", "Cursor crashing", COMPLAINT)], store=store)
+    assert "old" in store.docs
+
+    clusters = detector.cluster_posts([make_post("new", "Cursor crashing", COMPLAINT + " help")], store=store)
+    assert clusters[0].cluster_id == "old"
+    assert store.docs["new"]["cluster_id"] == "old"
+
+
+def test_empty_text_is_its_own_cluster(detector):
+    """Posts without words never merge."""
+    clusters = detector.cluster_posts([make_post("a", "", ""), make_post("b", "", "")])
+    assert len(clusters) == 2
@@ -174,6 +174,64 @@ class TestAdvancedNLPAnalyzer:
         assert results['posts_analyzed'] == 100
         print(f"Processed {results['total_words']:,} words successfully")
 
+    @pytest.fixture
+    def labeled_data(self):
+        """Create a small labeled corpus for training tests."""
+        positive = ["love how fast this editor is", "great update works perfectly", "amazing autocomplete saves time"]
+        negative = ["app crashes constantly and loses work", "terrible lag makes it unusable", "broken sync error again"]
+        neutral = ["the settings page lists the options", "version two ships next month", "docs describe the config file"]
+        data = []
+        for i in range(40):
+            data.append((f"{positive[i % 3]} {i}", 'positive'))
+            data.append((f"{negative[i % 3]} {i}", 'negative'))
+            data.append((f"{neutral[i % 3]} {i}", 'neutral'))
+        return data
+    
+    def test_vectorize_cached_reuses_matrix(self, analyzer, labeled_data, tmp_path):
+        """Test that the feature matrix is cached by corpus and params."""
+        texts = [text for text, _ in labeled_data]
+        _, X_first = analyzer.vectorize_cached(texts, {'min_df': 1}, cache_dir=str(tmp_path))
+        assert len(list(tmp_path.iterdir())) == 1
+        
+        _, X_second = analyzer.vectorize_cached(texts, {'min_df': 1}, cache_dir=str(tmp_path))
+        assert len(list(tmp_path.iterdir())) == 1
+        assert (X_first != X_second).nnz == 0
+        
+        # Different params must not hit the same cache entry
+        analyzer.vectorize_cached(texts, {'min_df': 1, 'max_features': 50}, cache_dir=str(tmp_path))
+        assert len(list(tmp_path.iterdir())) == 2
+    
+    def test_hyperparameter_search(self, analyzer, labeled_data, tmp_path):
+        """Test cross-validated sweep over the NB/LR ensemble."""
+        grid = {'nb_alpha': [0.1, 1.0], 'lr_C': [1.0], 'weights': [None]}
+        search = analyzer.hyperparameter_search(
+            labeled_data, param_grid=grid, vectorizer_grid=[{'min_df': 1}],
+            cv=3, n_jobs=2, cache_dir=str(tmp_path)
+        )
+        
+        assert search['status'] == 'success'
+        assert len(search['results']) == 2
+        assert all('accuracy' in r and 'fit_time' in r for r in search['results'])
+        assert search['results'][0]['accuracy'] >= search['results'][1]['accuracy']
+        assert analyzer.is_trained
+
+    
+    def test_hyperparameter_search_fits_the_vectorizer_per_fold(self, analyzer, labeled_data, tmp_path, monkeypatch):
+        """Test that held-out folds never reach the vectorizer, and each fold is vectorized once."""
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        fitted = []
+        fit_transform = TfidfVectorizer.fit_transform
+        monkeypatch.setattr(TfidfVectorizer, 'fit_transform',
+                            lambda self, texts, y=None: fitted.append(len(texts)) or fit_transform(self, texts, y))
+        
+        grid = {'nb_alpha': [0.1, 1.0], 'lr_C': [1.0], 'weights': [None]}
+        analyzer.hyperparameter_search(
+            labeled_data, param_grid=grid, vectorizer_grid=[{'min_df': 1}],
+            cv=3, n_jobs=1, cache_dir=str(tmp_path)
+        )
+        
+        # Three training folds of 80 texts (shared by both configs), then the final 80% training split
+        assert fitted == [80, 80, 80, 96]
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,60 @@
+"""
+Tests for the NLTK resource manager.
+"""
+import pytest
+import sys
+import os
+import subprocess
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import nltk_resources
+from nltk_resources import NLTKResourceError
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def empty_data_dir(tmp_path, monkeypatch):
+    """Point the resource manager at an empty data directory."""
+    nltk = pytest.importorskip('nltk')
+    original_path = list(nltk.data.path)
+    monkeypatch.setattr(nltk_resources, 'NLTK_DATA_DIR', str(tmp_path))
+    monkeypatch.setattr(nltk_resources, '_configured', False)
+    nltk_resources.require.cache_clear()
+    yield tmp_path
+    nltk.data.path[:] = original_path
+    nltk_resources._configured = False
+    nltk_resources.require.cache_clear()
+
+
+def test_missing_resource_fails_fast(empty_data_dir):
+    """A missing resource raises a LookupError naming the fetch script instead of downloading."""
+    with pytest.raises(NLTKResourceError) as excinfo:
+        nltk_resources.require('vader_lexicon')
+    assert isinstance(excinfo.value, LookupError)
+    assert 'fetch_nltk_data.py' in str(excinfo.value)
+    assert str(empty_data_dir) in str(excinfo.value)
+    assert list(empty_data_dir.iterdir()) == []
+
+
+def test_missing_resources_lists_everything(empty_data_dir):
+    assert nltk_resources.missing_resources() == list(nltk_resources.REQUIRED_RESOURCES)
+
+
+def test_search_path_is_pinned(empty_data_dir):
+    import nltk
+    nltk_resources.configure()
+    assert nltk.data.path == [str(empty_data_dir)]
+
+
+def test_importing_the_app_does_not_load_nltk():
+    """Worker boot must not import NLTK or touch its data."""
+    env = dict(os.environ, JWT_SECRET_KEY='x' * 40)
+    env.pop('MONGODB_URI', None)  # no database needed to import
+    code = "import sys, app, nlp_analyzer, advanced_nlp_analyzer; print('nltk' in sys.modules)"
+    result = subprocess.run([sys.executable, '-c', code], cwd=SERVER_DIR, env=env,
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == 'False'
@@ -0,0 +1,68 @@
+"""
+Tests for the sparse pain-point aggregation engine.
+"""
+import pytest
+import sys
+import os
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pain_point_matrix import incidence_matrix, group_columns, pair_columns, PainPointAggregates
+
+
+@pytest.fixture
+def texts():
+    return [
+        "cursor crashes and is slow",
+        "replit is slow",
+        "cursor is great",
+        "replit crashes on deploy",
+    ]
+
+
+def test_incidence_matrix_matches_substrings(texts):
+    matrix = incidence_matrix(texts, ["crash", "slow"])
+    assert matrix.shape == (4, 2)
+    assert matrix.toarray().tolist() == [[1, 1], [0, 1], [0, 0], [1, 0]]
+
+
+def test_group_and_pair_columns(texts):
+    keywords = incidence_matrix(texts, ["cursor", "replit", "deploy"])
+    products = group_columns(keywords, [[0], [1, 2]])
+    assert products.toarray().tolist() == [[1, 0], [0, 1], [1, 0], [0, 1]]
+
+    paired = pair_columns(products, incidence_matrix(texts, ["crash", "slow"]))
+    # Columns: cursor:crash, cursor:slow, replit:crash, replit:slow
+    assert paired.toarray().tolist() == [[1, 1, 0, 0], [0, 0, 0, 1], [0, 0, 0, 0], [0, 0, 1, 0]]
+
+
+def test_aggregates_are_weighted(texts):
+    matrix = incidence_matrix(texts, ["crash", "slow"])
+    aggregates = PainPointAggregates(matrix, [-0.5, -0.2, 0.9, None], weights=[3, 1, 1, 0])
+
+    # Post 4 has weight 0 (a duplicate) and is ignored everywhere
+    assert aggregates.frequency.tolist() == [3, 4]
+    assert aggregates.post_count.tolist() == [1, 2]
+    assert aggregates.avg_sentiment == pytest.approx([-0.5, (-1.5 - 0.2) / 4])
+    assert aggregates.max_abs_sentiment() == pytest.approx([0.5, 0.5])
+
+
+def test_breakdown_by_product(texts):
+    matrix = incidence_matrix(texts, ["crash", "slow"])
+    products = incidence_matrix(texts, ["cursor", "replit"])
+    aggregates = PainPointAggregates(matrix, [-0.5, -0.2, 0.9, -0.4])
+
+    breakdown = aggregates.by_group(products)
+    assert breakdown["frequency"].toarray().tolist() == [[1, 1], [1, 1]]
+    assert breakdown["sentiment_sum"].toarray() == pytest.approx(np.array([[-0.5, -0.5], [-0.4, -0.2]]))
+
+    replit_rows = aggregates.rows_by_column(products.getcol(1).toarray().ravel() > 0)
+    assert [rows.tolist() for rows in replit_rows] == [[3], [1]]
+
+
+def test_empty_corpus():
+    aggregates = PainPointAggregates(incidence_matrix([], ["crash"]), [])
+    assert aggregates.frequency.tolist() == [0]
+    assert aggregates.max_abs_sentiment().tolist() == [0]
@@ -0,0 +1,72 @@
+"""
+Tests for the incremental pain-point rollups.
+"""
+import pytest
+import sys
+import os
+from datetime import datetime
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import RedditPost
+from mongodb_store import MongoDBStore
+from pain_point_rollups import (RELATED_POSTS_CAP, collect_rollups, pain_point_from_document,
+                                rollup_update)
+
+
+def analyzed_post(post_id, sentiment, pain_points, products=("Cursor",)):
+    post = RedditPost(
+        id=post_id, title="t", content="c", author="a", subreddit="test",
+        url="u", created_utc=datetime(2024, 1, 1), score=1, num_comments=0
+    )
+    post.sentiment = sentiment
+    post.pain_points = list(pain_points)
+    post.products = list(products)
+    return post
+
+
+def test_collect_rollups_groups_by_pain_point_and_product():
+    rollups = collect_rollups([
+        analyzed_post("p1", -0.5, ["performance:slow"], products=["Cursor", "Replit"]),
+        analyzed_post("p2", -0.3, ["performance:slow", "stability:crash"]),
+        analyzed_post("p3", None, ["performance:slow"]),  # not analyzed
+    ])
+    slow = rollups["performance:slow:Cursor"]
+    assert (slow.frequency, slow.sentiment_sum, slow.related_posts) == (2, pytest.approx(-0.8), ["p1", "p2"])
+    assert rollups["performance:slow:Replit"].frequency == 1
+    assert rollups["stability:crash:Cursor"].indicator == "crash"
+
+
+def test_stored_rollup_derives_severity_at_read_time():
+    document = {"_id": "performance:slow:Cursor", "frequency": 4, "sentiment_sum": -2.0, "product": "Cursor",
+                "name": "Performance: slow", "related_posts": ["p1"]}
+    pain_point = pain_point_from_document(document)
+    assert pain_point.avg_sentiment == -0.5
+    assert pain_point.severity == 2.0
+
+    rollup = collect_rollups([analyzed_post(f"p{i}", -0.1, ["performance:slow"]) for i in range(3)])
+    update = rollup_update(rollup["performance:slow:Cursor"])
+    assert update["$inc"]["frequency"] == 3
+    assert update["$push"]["related_posts"]["$slice"] == -RELATED_POSTS_CAP
+
+
+def test_in_memory_rollups_accumulate_across_scrapes():
+    store = MongoDBStore(None, lazy=True)
+    store.mongodb_uri = None
+    store.apply_pain_point_rollups([analyzed_post("p1", -0.4, ["performance:slow"])])
+    store.apply_pain_point_rollups([analyzed_post("p2", -0.2, ["performance:slow"]),
+                                    analyzed_post("p1", -0.4, ["performance:slow"])])  # p1 already counted
+
+    slow = store.pain_points["performance:slow:Cursor"]
+    assert slow.frequency == 2
+    assert slow.avg_sentiment == pytest.approx(-0.3)
+    assert slow.severity == pytest.approx(0.6)
+    assert slow.related_posts == ["p1", "p2"]
+
+
+def test_post_repeated_in_a_batch_counts_once():
+    posts = [analyzed_post("p1", -0.5, ["performance:slow"]), analyzed_post("p1", -0.5, ["performance:slow"])]
+    slow = collect_rollups(posts)["performance:slow:Cursor"]
+    assert (slow.frequency, slow.related_posts) == (1, ["p1"])
+    assert rollup_update(slow)["$inc"]["frequency"] == 1
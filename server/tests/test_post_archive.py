@@ -0,0 +1,106 @@
+"""
+Tests for hot/cold tiering of posts into the Parquet archive.
+"""
+import pytest
+import sys
+import os
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("pyarrow")
+
+from mongodb_store import MongoDBStore
+from post_archive import archive_posts, iter_posts, read_archive, write_archive
+from tests.test_mongodb_store import FakeCollection, make_post
+
+NOW = datetime(2024, 12, 1)
+
+
+class Cursor(list):
+    def sort(self, keys):
+        return Cursor(sorted(self, key=lambda doc: tuple(doc[field] for field, _ in keys)))
+
+    def limit(self, count):
+        return Cursor(self[:count])
+
+
+class HotPosts(FakeCollection):
+    """Posts collection supporting the archive job's range query and deletes."""
+    def find(self, query, projection=None):
+        if "_id" in query:
+            return super().find(query, projection)
+        cutoff = query.get("created_utc", {}).get("$lt")
+        return Cursor(dict(doc, _id=doc_id) for doc_id, doc in self.docs.items()
+                      if cutoff is None or doc["created_utc"] < cutoff)
+
+    def delete_many(self, query):
+        for doc_id in query["_id"]["$in"]:
+            self.docs.pop(doc_id, None)
+
+
+class Stubs(FakeCollection):
+    def insert_many(self, documents, ordered=True):
+        for document in documents:
+            self.docs[document["_id"]] = {k: v for k, v in document.items() if k != "_id"}
+
+
+@pytest.fixture
+def store():
+    store = MongoDBStore(None, lazy=True)
+    store.db = SimpleNamespace(posts=HotPosts("posts"), archived_posts=Stubs("archived_posts"),
+                               product_catalog=FakeCollection("product_catalog"),
+                               metadata=SimpleNamespace(update_one=lambda *args, **kwargs: None))
+    return store
+
+
+def saved_posts(store, ages_in_days):
+    posts = []
+    for index, age in enumerate(ages_in_days):
+        post = make_post(f"p{index}")
+        post.created_utc = NOW - timedelta(days=age)
+        post.sentiment = -0.25
+        post.products = ["Cursor"]
+        posts.append(post)
+    store.save_posts_bulk(posts)
+    return posts
+
+
+def test_archive_round_trip_is_partitioned_by_month(tmp_path):
+    documents = [
+        {"_id": "a", "title": "t", "created_utc": datetime(2024, 1, 5), "score": 3, "topics": ["speed"]},
+        {"_id": "b", "title": "u", "created_utc": datetime(2024, 2, 7), "sentiment": 0.5},
+    ]
+    locations = write_archive(documents, str(tmp_path))
+    assert locations == {"a": os.path.join("year=2024", "month=01"), "b": os.path.join("year=2024", "month=02")}
+
+    rows = {row["_id"]: row for row in read_archive(str(tmp_path))}
+    assert rows["a"]["topics"] == ["speed"] and rows["a"]["created_utc"] == datetime(2024, 1, 5)
+    assert rows["b"]["sentiment"] == 0.5 and rows["b"]["topics"] == []
+    assert [row["_id"] for row in read_archive(str(tmp_path), since=datetime(2024, 2, 1))] == ["b"]
+
+
+def test_archive_job_moves_old_posts_and_reads_span_both_tiers(store, tmp_path):
+    saved_posts(store, [400, 300, 10, 1])
+    result = archive_posts(store, older_than_days=180, root=str(tmp_path), batch_size=1, now=NOW)
+
+    assert result["archived"] == 2 and not result["errors"]
+    assert set(store.db.posts.docs) == {"p2", "p3"}
+    assert set(store.db.archived_posts.docs) == {"p0", "p1"}
+    assert store.db.product_catalog.docs["cursor"]["post_count"] == 2
+    assert sorted(doc["_id"] for doc in iter_posts(store, root=str(tmp_path))) == ["p0", "p1", "p2", "p3"]
+
+    # Nothing left to move
+    assert archive_posts(store, older_than_days=180, root=str(tmp_path), now=NOW)["archived"] == 0
+
+
+def test_rescraped_archived_posts_stay_archived(store, tmp_path):
+    posts = saved_posts(store, [400, 1])
+    archive_posts(store, older_than_days=180, root=str(tmp_path), now=NOW)
+
+    posts[0].score = 99
+    result = store.save_posts_bulk(posts)
+    assert result["newly_analyzed_ids"] == []
+    assert "p0" not in store.db.posts.docs
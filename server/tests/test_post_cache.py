@@ -0,0 +1,155 @@
+"""
+Tests for the bounded in-process post cache.
+"""
+import pytest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mongodb_store import MongoDBStore
+from post_cache import PostCache, post_size
+from tests.test_mongodb_store import FakeDB, make_post
+
+
+def ids(cache):
+    return [post.id for post in cache]
+
+
+def test_lru_evicts_least_recently_used_and_counts():
+    cache = PostCache(max_entries=3, policy="lru")
+    cache.extend(make_post(f"p{i}") for i in range(3))
+    assert cache.get("p0").id == "p0"  # p1 is now the least recently used
+    cache.put(make_post("p3"))
+
+    assert ids(cache) == ["p2", "p0", "p3"]
+    assert cache.get("p1") is None
+    assert cache.stats()["reads"] == 1 and cache.stats()["evictions"] == 1
+
+
+@pytest.mark.parametrize("policy", ["lru", "lfu"])
+def test_posts_served_from_a_snapshot_are_evicted_last(policy):
+    cache = PostCache(max_entries=3, policy=policy)
+    cache.extend(make_post(f"p{i}") for i in range(3))
+    served = [post for post in cache.snapshot() if post.id == "p0"]
+    cache.record_reads(served)
+    cache.record_reads([make_post("gone")])  # not cached: ignored
+    cache.put(make_post("p3"))
+
+    assert "p0" in cache and "p1" not in cache
+    assert cache.stats()["reads"] == 1
+
+
+def test_lfu_evicts_least_frequently_used_oldest_first():
+    cache = PostCache(max_entries=3, policy="lfu")
+    cache.extend(make_post(f"p{i}") for i in range(3))
+    cache.get("p0")
+    cache.get("p0")
+    cache.get("p2")
+    cache.put(make_post("p3"))  # evicts p1, never used
+    cache.put(make_post("p4"))  # evicts p3, the newest but never used
+
+    assert "p1" not in cache and "p3" not in cache
+    assert sorted(ids(cache)) == ["p0", "p2", "p4"]
+
+
+def test_replacing_a_post_keeps_one_entry_and_updates_the_size():
+    cache = PostCache(max_entries=10)
+    post = make_post("p0")
+    cache.put(post)
+    before = cache.bytes
+    post.content = "x" * 10000
+    cache.put(post)
+    assert len(cache) == 1 and cache.bytes > before
+    cache.discard("p0")
+    assert len(cache) == 0 and cache.bytes == 0
+
+
+def test_memory_budget_stays_flat_over_many_scrapes():
+    budget_mb = 0.25
+    cache = PostCache(max_entries=10 ** 6, max_mb=budget_mb)
+    for index in range(20000):
+        post = make_post(f"p{index}")
+        post.content = "body " * 50
+        cache.put(post)
+    assert cache.bytes <= budget_mb * 1024 * 1024
+    assert 0 < len(cache) < 20000
+    assert cache.evictions == 20000 - len(cache)
+    assert cache.bytes == sum(post_size(post) for post in cache)
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        PostCache(policy="fifo")
+
+
+def test_saved_posts_go_through_the_bounded_cache():
+    store = MongoDBStore(None, lazy=True)
+    store.db = FakeDB()
+    store.raw_posts = PostCache(max_entries=5)
+    for start in range(0, 12, 4):
+        store.save_posts_bulk([make_post(f"p{i}") for i in range(start, start + 4)])
+    assert ids(store.raw_posts) == [f"p{i}" for i in range(7, 12)]
+
+
+class ForbiddenLock:
+    """Fails any attempt to take the cache's writer lock."""
+    def __enter__(self):
+        raise AssertionError("request thread took the post cache lock")
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+def test_get_posts_fallback_records_the_page_without_the_lock(monkeypatch):
+    from app import app
+    import api
+
+    store = MongoDBStore(None, lazy=True)
+    store.mongodb_uri = None
+    cache = store.analyzed_posts = PostCache(max_entries=5)
+    cache.extend(make_post(f"p{i}") for i in range(5))
+    monkeypatch.setattr(api, "data_store", store)
+
+    writer_lock, cache._lock = cache._lock, ForbiddenLock()
+    with app.test_request_context("/api/posts?limit=2"):
+        response = api.GetPosts.get.__wrapped__(api.GetPosts(), {"username": "test"})
+    served = [post["id"] for post in response["posts"]]
+    assert len(served) == 2 and cache.stats()["reads"] == 2
+
+    # The next write applies the reads: the served posts are now the last evicted
+    cache._lock = writer_lock
+    cache.extend(make_post(f"n{i}") for i in range(3))
+    assert sorted(served) == sorted(post.id for post in cache if post.id.startswith("p"))
+    assert cache.stats()["reads"] == 2
+
+
+def test_scraper_publishes_once_per_subreddit(monkeypatch):
+    from types import SimpleNamespace
+    import reddit_scraper
+
+    class CountingCache(PostCache):
+        publishes = 0
+
+        def _publish(self):
+            CountingCache.publishes += 1
+            super()._publish()
+
+    def search(name):
+        return lambda query, limit, time_filter: [
+            SimpleNamespace(id=f"{name}{i}", title="t", selftext="c", author="a", subreddit=name, url="u",
+                            created_utc=0, score=1, num_comments=0)
+            for i in range(limit)
+        ]
+
+    store = MongoDBStore(None, lazy=True)
+    store.raw_posts = CountingCache(max_entries=100)
+    monkeypatch.setattr(reddit_scraper, "data_store", store)
+    monkeypatch.setattr(reddit_scraper.time, "sleep", lambda seconds: None)
+    scraper = reddit_scraper.RedditScraper()
+    scraper.reddit = SimpleNamespace(subreddit=lambda name: SimpleNamespace(search=search(name)))
+
+    posts = scraper.search_reddit("cursor", subreddits=["python", "webdev"], limit=20)
+    assert len(posts) == len(store.raw_posts) == 40
+    assert CountingCache.publishes == 2
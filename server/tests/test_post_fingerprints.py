@@ -0,0 +1,80 @@
+"""
+Tests for change-detection writes: fingerprints and minimal post updates.
+"""
+import pytest
+import sys
+import os
+from datetime import datetime
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mongodb_store import MongoDBStore
+from post_fingerprints import FINGERPRINT_FIELD, post_fingerprint, post_update
+from tests.test_mongodb_store import FakeDB, make_post
+
+
+@pytest.fixture
+def store():
+    store = MongoDBStore(None, lazy=True)
+    store.db = FakeDB()
+    return store
+
+
+def document(**changes):
+    base = {"_id": "p1", "id": "p1", "title": "t", "content": "c", "score": 5, "num_comments": 2,
+            "sentiment": None, "topics": [], "created_at": datetime(2024, 1, 1)}
+    return dict(base, **changes)
+
+
+def test_fingerprint_ignores_bookkeeping_fields():
+    assert post_fingerprint(document()) == post_fingerprint(document(created_at=datetime(2025, 1, 1)))
+    assert post_fingerprint(document())[:2] == [5, 2]
+    assert post_fingerprint(document(content="edited"))[2] != post_fingerprint(document())[2]
+    assert post_fingerprint(document(sentiment=0.4))[3] != post_fingerprint(document())[3]
+
+
+def test_update_sets_only_changed_groups():
+    stored = post_fingerprint(document())
+    assert post_update(document(created_at=datetime(2025, 1, 1)), stored) is None
+
+    update = post_update(document(score=9), stored)
+    assert set(update["$set"]) == {"score", FINGERPRINT_FIELD}
+
+    update = post_update(document(sentiment=0.4, topics=["speed"]), stored)
+    assert set(update["$set"]) == {"sentiment", "topics", FINGERPRINT_FIELD}
+
+
+def test_new_and_legacy_posts_get_full_documents_without_touching_created_at():
+    update = post_update(document(), None, exists=False)
+    assert "created_at" not in update["$set"]
+    assert update["$setOnInsert"] == {"created_at": datetime(2024, 1, 1)}
+    assert {"title", "content", "score", FINGERPRINT_FIELD} <= set(update["$set"])
+    # Stored before fingerprints existed
+    assert set(post_update(document(), None, exists=True)["$set"]) == set(update["$set"])
+
+
+def test_rescrape_writes_only_changed_posts(store):
+    posts = [make_post(f"p{i}") for i in range(20)]
+    first = store.save_posts_bulk(posts)
+    assert first["written"] == 20
+
+    posts = [make_post(f"p{i}") for i in range(20)]
+    posts[3].score = 40
+    writes_before = len(store.db.posts.writes)
+    second = store.save_posts_bulk(posts)
+
+    assert (second["saved"], second["written"]) == (20, 1)
+    new_writes = store.db.posts.writes[writes_before:]
+    assert [set(write["$set"]) for write in new_writes] == [{"score", FINGERPRINT_FIELD}]
+    assert store.db.posts.docs["p3"]["score"] == 40
+
+
+def test_newly_analyzed_posts_are_still_reported(store):
+    posts = [make_post(f"p{i}") for i in range(3)]
+    store.save_posts_bulk(posts)
+    posts[1].sentiment = -0.2
+    result = store.save_posts_bulk(posts)
+    assert result["newly_analyzed_ids"] == ["p1"]
+    assert result["written"] == 1
+    assert store.save_posts_bulk(posts)["newly_analyzed_ids"] == []
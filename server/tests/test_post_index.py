@@ -0,0 +1,90 @@
+"""
+Tests for the columnar in-memory post index behind the GetPosts fallback.
+"""
+import pytest
+import sys
+import os
+import random
+from datetime import datetime, timedelta
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pagination import page_items
+from post_cache import PostCache
+from post_index import PostIndex
+from tests.test_mongodb_store import make_post
+
+FILTERS = [
+    {},
+    {"product": "Cursor"},
+    {"product": "Unknown"},
+    {"subreddit": "CURSOR"},
+    {"has_pain_points": True, "min_score": 10},
+    {"product": "Replit", "subreddit": "programming", "min_comments": 5},
+]
+
+
+@pytest.fixture(scope="module")
+def posts():
+    rng = random.Random(7)
+    posts = []
+    for index in range(400):
+        post = make_post(f"p{index:03d}")
+        post.subreddit = rng.choice(["cursor", "Cursor", "programming", "replit"])
+        post.score = rng.randint(0, 30)
+        post.num_comments = rng.randint(0, 10)
+        post.created_utc = datetime(2024, 1, 1) + timedelta(hours=rng.randint(0, 50))
+        post.sentiment = rng.choice([None, -0.5, 0.0, 0.25])
+        post.products = rng.sample(["Cursor", "Replit", "Copilot"], rng.randint(0, 2))
+        post.pain_points = ["performance:slow"] if rng.random() < 0.4 else []
+        posts.append(post)
+    return tuple(posts)
+
+
+def reference_page(posts, sort_field, direction, limit, after, product=None, has_pain_points=False,
+                   subreddit=None, min_score=0, min_comments=0):
+    """The list-comprehension fallback GetPosts used before the index."""
+    if product:
+        posts = [p for p in posts if product in p.products]
+    if has_pain_points:
+        posts = [p for p in posts if p.pain_points]
+    if subreddit:
+        posts = [p for p in posts if p.subreddit.lower() == subreddit.lower()]
+    if min_score > 0:
+        posts = [p for p in posts if p.score >= min_score]
+    if min_comments > 0:
+        posts = [p for p in posts if p.num_comments >= min_comments]
+    return page_items(posts, lambda p: (getattr(p, sort_field), p.id), limit or len(posts), direction, after)
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+@pytest.mark.parametrize("sort_field", ["created_utc", "score", "num_comments", "sentiment"])
+@pytest.mark.parametrize("direction", [-1, 1])
+def test_paging_matches_the_reference_order(posts, filters, sort_field, direction):
+    index = PostIndex(posts)
+    after = None
+    while True:
+        page, has_more = index.page(sort_field, direction, limit=17, after=after, **filters)
+        expected, expected_more = reference_page(posts, sort_field, direction, 17, after, **filters)
+        assert [p.id for p in page] == [p.id for p in expected] and has_more == expected_more
+        if not has_more:
+            break
+        after = (getattr(page[-1], sort_field), page[-1].id)
+
+
+def test_whole_listing_without_limit(posts):
+    page, has_more = PostIndex(posts).page("score", -1, product="Cursor")
+    expected, _ = reference_page(posts, "score", -1, None, None, product="Cursor")
+    assert [p.id for p in page] == [p.id for p in expected] and not has_more
+
+
+def test_cache_rebuilds_the_index_only_after_a_publish(posts):
+    cache = PostCache(max_entries=1000)
+    cache.extend(posts[:10])
+    index = cache.index()
+    assert cache.index() is index and len(index) == 10
+
+    cache.extend(posts[10:20])
+    assert cache.index() is not index and len(cache.index()) == 20
+    assert PostIndex(()).page("score", -1, limit=5) == ([], False)
@@ -0,0 +1,130 @@
+"""
+Tests for the lazy service container and lazy MongoDB connection.
+"""
+import pytest
+import sys
+import os
+import subprocess
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import ServiceContainer
+from mongodb_store import MongoDBStore
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_services_are_built_once_on_first_use():
+    calls = []
+    services = ServiceContainer()
+    services.register('thing', lambda: calls.append(1) or object())
+
+    assert not services.is_initialized('thing')
+    first = services.thing
+    assert services.get('thing') is first
+    assert calls == [1]
+    assert services.is_initialized('thing')
+
+
+def test_unknown_service():
+    services = ServiceContainer()
+    with pytest.raises(AttributeError):
+        services.missing
+    with pytest.raises(KeyError):
+        services.get('missing')
+
+
+def test_warm_and_reset():
+    services = ServiceContainer()
+    services.register('a', object)
+    services.register('broken', lambda: 1 / 0)
+
+    timings = services.warm()
+    assert set(timings) == {'a'}  # failures are logged, not raised
+    built = services.a
+
+    services.reset(['a'])
+    assert not services.is_initialized('a')
+    assert services.a is not built
+
+
+def test_lazy_store_connects_on_first_use(monkeypatch):
+    attempts = []
+    monkeypatch.setattr(MongoDBStore, 'connect', lambda self: attempts.append(self) or setattr(self, '_connect_attempted', True))
+
+    store = MongoDBStore('mongodb://localhost:27017/test_db', lazy=True)
+    assert attempts == []
+
+    callbacks = []
+    store.on_connect(callbacks.append)
+    assert store.db is None  # the (stubbed) connection failed
+    assert store.pain_points == {}
+    assert len(attempts) == 1  # only one attempt, no retry per access
+    assert callbacks == []
+
+
+def test_importing_the_api_builds_nothing():
+    """Importing the app must not build analyzers, clients or a database connection."""
+    env = dict(os.environ, JWT_SECRET_KEY='x' * 40, MONGODB_URI='mongodb://localhost:1/unused')
+    code = ("import sys, main, api; "
+            "print(sorted(n for n in api.services._factories if api.services.is_initialized(n)), "
+            "api.data_store._connect_attempted, 'sklearn' in sys.modules, 'praw' in sys.modules)")
+    result = subprocess.run([sys.executable, '-c', code], cwd=SERVER_DIR, env=env,
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == '[] False False False'
+
+
+def test_reset_connection_forgets_client():
+    store = MongoDBStore(None, lazy=True)
+    store.client, store.db, store._connect_attempted = object(), object(), True
+
+    store.reset_connection()
+    assert store.client is None
+    assert store._db is None
+    assert not store._connect_attempted
+
+
+def test_gunicorn_post_fork_resets_mongo(monkeypatch):
+    import importlib.util
+    import app
+
+    spec = importlib.util.spec_from_file_location('gunicorn_conf', os.path.join(SERVER_DIR, 'gunicorn.conf.py'))
+    gunicorn_conf = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(gunicorn_conf)
+
+    resets = []
+    monkeypatch.setattr(app.data_store, 'reset_connection', lambda: resets.append(True))
+    gunicorn_conf.post_fork(None, None)
+    assert resets == [True]
+
+
+def test_scrape_flag_is_cleared_once_per_deployment_not_per_connection(monkeypatch):
+    import importlib.util
+    import app
+    import mongodb_store
+
+    updates = []
+
+    class Client:
+        def __init__(self, uri):
+            self.reddit_scraper = self
+            self.metadata = self
+
+        def update_one(self, query, update):
+            updates.append((query, update))
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(mongodb_store, 'MongoClient', Client)
+    monkeypatch.setenv('MONGODB_URI', 'mongodb://localhost:27017/test_db')
+    spec = importlib.util.spec_from_file_location('gunicorn_conf', os.path.join(SERVER_DIR, 'gunicorn.conf.py'))
+    gunicorn_conf = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(gunicorn_conf)
+
+    gunicorn_conf.on_starting(None)
+    assert updates == [({"_id": "scraper_metadata"}, {"$set": {"scrape_in_progress": False}})]
+    # Workers connecting (or reconnecting after a fork) leave a running scrape's flag alone
+    assert app.data_store._on_connect == []
@@ -0,0 +1,98 @@
+"""
+Tests for the copy-on-write snapshots readers get of the store's shared state.
+"""
+import pytest
+import sys
+import os
+import threading
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mongodb_store import MongoDBStore
+from post_cache import PostCache
+from snapshots import SnapshotDict
+from tests.test_mongodb_store import make_post
+
+
+def test_published_snapshots_never_change():
+    shared = SnapshotDict({"a": 1})
+    before = shared.snapshot
+    after = shared.publish({"b": 2}, removed=["a"])
+
+    assert dict(before) == {"a": 1} and dict(after) == {"b": 2}
+    assert shared.publish({"c": 3}, replace=True) == {"c": 3}
+    with pytest.raises(TypeError):
+        shared.snapshot["d"] = 4
+
+
+def run_concurrently(write, read, batches=300, readers=4):
+    """Run a writer against reader threads; returns the readers' failures."""
+    done = threading.Event()
+    failures = []
+
+    def reader():
+        while not done.is_set():
+            try:
+                read()
+            except Exception as e:  # torn read or "changed size during iteration"
+                failures.append(e)
+                return
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    for batch in range(1, batches + 1):
+        write(batch)
+    done.set()
+    for thread in threads:
+        thread.join(5)
+    return failures
+
+
+def test_readers_see_whole_batches_of_pain_points():
+    shared = SnapshotDict()
+
+    def write(batch):
+        # Every batch rewrites all keys with its number
+        shared.publish({f"k{index}": batch for index in range(50)})
+
+    def read():
+        snapshot = shared.snapshot
+        assert len(set(snapshot.values())) <= 1
+        assert all(snapshot[key] == value for key, value in snapshot.items())
+
+    assert run_concurrently(write, read) == []
+
+
+def test_readers_iterate_the_post_cache_while_it_is_written():
+    cache = PostCache(max_entries=10 ** 6)
+
+    def write(batch):
+        cache.extend(make_post(f"b{batch}-{index}") for index in range(10))
+
+    def read():
+        posts = cache.snapshot()
+        assert len(posts) % 10 == 0
+        assert len({post.id for post in cache}) >= len(posts)
+
+    assert run_concurrently(write, read) == []
+    assert len(cache) == 3000
+
+
+def test_in_memory_rollups_do_not_mutate_published_pain_points():
+    store = MongoDBStore(None, lazy=True)
+    post = make_post("p0")
+    post.sentiment, post.products, post.pain_points = -0.5, ["Cursor"], ["performance:slow"]
+    store.apply_pain_point_rollups([post])
+    before = store.pain_points
+    (key, pain_point), = before.items()
+
+    second = make_post("p1")
+    second.sentiment, second.products, second.pain_points = -1.0, ["Cursor"], ["performance:slow"]
+    store.apply_pain_point_rollups([second])
+
+    assert pain_point.frequency == 1 and before[key] is pain_point
+    assert store.pain_points[key].frequency == 2
+    with pytest.raises(TypeError):
+        store.pain_points[key] = pain_point
@@ -0,0 +1,161 @@
+"""
+Tests for streaming spike detection on pain point frequencies.
+"""
+import pytest
+import sys
+import os
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import RedditPost
+from mongodb_store import MongoDBStore
+from spike_detection import SeriesState, SpikeDetector, series_key
+
+DAY = datetime(2024, 3, 1)
+
+
+def analyzed_post(post_id, created, pain_points=("stability:crash",), products=("Cursor",), sentiment=-0.5):
+    post = RedditPost(
+        id=post_id, title="t", content="c", author="a", subreddit="test",
+        url="u", created_utc=created, score=1, num_comments=0
+    )
+    post.sentiment = sentiment
+    post.pain_points = list(pain_points)
+    post.products = list(products)
+    return post
+
+
+def daily_posts(counts, start=DAY, prefix="p"):
+    """Posts spread over consecutive days, counts[i] on day i."""
+    return [analyzed_post(f"{prefix}{day}_{n}", start + timedelta(days=day, hours=n % 24))
+            for day, count in enumerate(counts) for n in range(count)]
+
+
+def test_steady_series_is_not_a_spike():
+    detector = SpikeDetector(granularity="day")
+    states = {}
+    detector.update(states, daily_posts([2, 3, 2, 3, 2, 3, 2]))
+    state = states[series_key("Cursor", "stability:crash")]
+    assert state.buckets_seen == 6
+    assert state.current_count == 2
+    assert not state.anomalous
+
+
+def test_spike_is_flagged_while_its_bucket_fills():
+    detector = SpikeDetector(granularity="day", threshold=3.0, min_count=3)
+    states = {}
+    detector.update(states, daily_posts([1, 2, 1, 1, 2, 1]))
+    key = series_key("Cursor", "stability:crash")
+    assert not states[key].anomalous
+
+    # The burst arrives in the next scrape and is flagged in it, before its day closes
+    burst = [analyzed_post(f"b{n}", DAY + timedelta(days=6, minutes=n)) for n in range(12)]
+    changed = detector.update(states, burst)
+    assert changed == {key}
+    assert states[key].anomalous
+    assert states[key].z_score >= 3.0
+
+
+def test_warmup_and_min_count_suppress_early_alarms():
+    detector = SpikeDetector(granularity="day", warmup=3, min_count=3)
+    states = {}
+    detector.update(states, daily_posts([0, 0, 9]))  # only the third day has posts
+    assert not states[series_key("Cursor", "stability:crash")].anomalous
+
+    quiet = {}
+    detector.update(quiet, daily_posts([0, 0, 0, 0, 0, 2]))
+    assert not quiet[series_key("Cursor", "stability:crash")].anomalous
+
+
+def test_empty_buckets_decay_the_mean():
+    detector = SpikeDetector(granularity="day", alpha=0.5)
+    state = SeriesState("Cursor", "stability:crash", current_bucket=DAY, current_count=4,
+                        mean=4.0, buckets_seen=5)
+    detector.observe(state, DAY + timedelta(days=3))
+    # Day 0 closes with 4, days 1 and 2 are empty
+    assert state.mean == pytest.approx(1.0)
+    assert state.buckets_seen == 8
+    assert (state.current_bucket, state.current_count) == (DAY + timedelta(days=3), 1)
+
+    # A long gap costs a bounded number of steps
+    detector.observe(state, DAY + timedelta(days=10000))
+    assert state.mean == pytest.approx(0.0)
+    assert state.buckets_seen == 8 + 10000 - 3
+
+
+def test_late_posts_do_not_rewind_the_state():
+    detector = SpikeDetector(granularity="day")
+    state = SeriesState("Cursor", "stability:crash", current_bucket=DAY, current_count=2)
+    assert detector.observe(state, DAY - timedelta(days=1)) is False
+    assert state.current_count == 2
+
+
+def test_state_round_trips_through_documents():
+    state = SeriesState("Cursor", "stability:crash", current_bucket=DAY, current_count=3,
+                        mean=1.5, variance=0.4, buckets_seen=7, z_score=2.0, anomalous=False)
+    document = dict(state.to_document(), _id=state.key, updated_at=DAY)
+    assert SeriesState.from_document(document).to_document() == state.to_document()
+
+
+class FakeSpikes:
+    name = "pain_point_spikes"
+
+    def __init__(self):
+        self.docs = {}
+        self.finds = 0
+
+    def find(self, query):
+        self.finds += 1
+        return [dict(self.docs[key], _id=key) for key in query["_id"]["$in"] if key in self.docs]
+
+    def bulk_write(self, operations, ordered=True):
+        for op in operations:
+            self.docs[op._filter["_id"]] = dict(op._doc["$set"])
+        return SimpleNamespace(upserted_count=len(operations))
+
+
+def test_store_keeps_state_across_scrapes():
+    store = MongoDBStore(None, lazy=True)
+    store.spike_detector = SpikeDetector(granularity="day")
+    store.db = SimpleNamespace(pain_point_spikes=FakeSpikes())
+
+    store.apply_spike_detection(daily_posts([1, 2, 1, 1, 2, 1]))
+    result = store.apply_spike_detection([analyzed_post(f"b{n}", DAY + timedelta(days=6)) for n in range(12)])
+
+    key = series_key("Cursor", "stability:crash")
+    assert result["anomalous"] == [key]
+    assert store.db.pain_point_spikes.finds == 2  # one state read per scrape
+    assert store.db.pain_point_spikes.docs[key]["current_count"] == 12
+
+
+def test_spikes_endpoint_lists_current_spikes(monkeypatch):
+    from app import app
+    import api
+
+    store = MongoDBStore(None, lazy=True)
+    store.spike_detector = SpikeDetector(granularity="day")
+    monkeypatch.setattr(api, "data_store", store)
+
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    history = daily_posts([1, 1, 2, 1, 1], start=today - timedelta(days=5))
+    burst = [analyzed_post(f"b{n}", today + timedelta(minutes=n)) for n in range(10)]
+    store.apply_spike_detection(history + burst)
+    # Replaying the same posts must not count them twice
+    store.apply_spike_detection(burst)
+
+    with app.test_request_context("/api/spikes?product=Cursor"):
+        response = api.GetSpikes.get.__wrapped__(api.GetSpikes(), {"username": "test"})
+    assert [(spike["pain_point"], spike["count"]) for spike in response["spikes"]] == [("stability:crash", 10)]
+
+    with app.test_request_context("/api/spikes?product=Replit"):
+        response = api.GetSpikes.get.__wrapped__(api.GetSpikes(), {"username": "test"})
+    assert response["spikes"] == []
+
+
+def test_post_repeated_in_a_batch_counts_once():
+    detector = SpikeDetector(granularity="day")
+    posts = [analyzed_post("p1", DAY), analyzed_post("p1", DAY), analyzed_post("p2", DAY)]
+    assert len(detector.events(posts)) == 2
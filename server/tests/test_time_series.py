@@ -0,0 +1,93 @@
+"""
+Tests for the time-bucketed pain point and sentiment series.
+"""
+import pytest
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import RedditPost
+from mongodb_store import INDEX_SPEC
+from time_series import (HOURLY_RETENTION_DAYS, bucket_update, collect_buckets, created_datetime,
+                         memory_trend, series_query)
+
+
+def analyzed_post(post_id, created, sentiment, pain_points=(), subreddit="Programming", products=("Cursor",)):
+    post = RedditPost(
+        id=post_id, title="t", content="c", author="a", subreddit=subreddit,
+        url="u", created_utc=created, score=1, num_comments=0
+    )
+    post.sentiment = sentiment
+    post.pain_points = list(pain_points)
+    post.products = list(products)
+    return post
+
+
+def test_collect_buckets_per_product_pain_point_and_subreddit():
+    posts = [
+        analyzed_post("p1", datetime(2024, 3, 1, 9, 15), -0.5, ["performance:slow"]),
+        analyzed_post("p2", datetime(2024, 3, 1, 9, 45), -0.3, ["performance:slow"]),
+        analyzed_post("p3", datetime(2024, 3, 1, 17, 0), 0.4),
+        analyzed_post("p4", datetime(2024, 3, 1, 17, 0), None, ["performance:slow"]),  # not analyzed
+    ]
+    buckets = collect_buckets(posts)
+    day = {(b.pain_point, b.subreddit): b for b in buckets.values() if b.granularity == "day"}
+    assert day[("performance:slow", "programming")].count == 2
+    assert day[(None, "programming")].count == 3
+    assert day[(None, "programming")].sentiment_sum == pytest.approx(-0.4)
+
+    hours = sorted(b.start.hour for b in buckets.values() if b.granularity == "hour" and b.pain_point is None)
+    assert hours == [9, 17]
+
+
+def test_hourly_buckets_expire_and_daily_are_kept():
+    buckets = collect_buckets([analyzed_post("p1", datetime(2024, 3, 1, 9), -0.5)])
+    for bucket in buckets.values():
+        update = bucket_update(bucket)
+        assert update["$inc"] == {"count": 1, "sentiment_sum": -0.5}
+        if bucket.granularity == "hour":
+            assert update["$setOnInsert"]["expires_at"] == bucket.start + timedelta(days=HOURLY_RETENTION_DAYS)
+        else:
+            assert "expires_at" not in update["$setOnInsert"]
+
+
+def test_memory_trend_sums_subreddits_and_derives_severity():
+    posts = [
+        analyzed_post("p1", datetime(2024, 3, 1, 9), -0.5, ["stability:crash"], subreddit="a"),
+        analyzed_post("p2", datetime(2024, 3, 1, 10), -0.25, ["stability:crash"], subreddit="b"),
+        analyzed_post("p3", datetime(2024, 3, 3, 10), -0.5, ["stability:crash"], subreddit="a"),
+    ]
+    points = memory_trend(posts, "Cursor", "stability:crash", start=datetime(2024, 2, 1), end=datetime(2024, 3, 31))
+    assert [(p["bucket"], p["count"], p["severity"]) for p in points] == [
+        ("2024-03-01T00:00:00", 2, 0.75), ("2024-03-03T00:00:00", 1, 0.5)
+    ]
+    assert len(memory_trend(posts, "Cursor", "stability:crash", subreddit="B",
+                            start=datetime(2024, 2, 1), end=datetime(2024, 3, 31))) == 1
+
+
+def test_trend_queries_have_an_index():
+    specs = {model.document["name"]: list(model.document["key"]) for model in INDEX_SPEC["pain_point_series"]}
+    for subreddit, index in ((None, "series_bucket"), ("a", "series_subreddit_bucket")):
+        query = series_query("Cursor", "stability:crash", subreddit)
+        equality = [field for field, condition in query.items() if not isinstance(condition, dict)]
+        # Equality fields first, then the bucket range
+        assert specs[index] == equality + ["bucket"]
+
+
+def test_created_datetime_accepts_stored_formats():
+    assert created_datetime(0) == datetime(1970, 1, 1)
+    assert created_datetime("2024-03-01T09:00:00") == datetime(2024, 3, 1, 9)
+    assert created_datetime("yesterday") is None
+
+
+def test_post_repeated_in_a_batch_counts_once():
+    created = datetime(2024, 3, 1, 9, 15)
+    posts = [analyzed_post("p1", created, -0.5, ["performance:slow"]),
+             analyzed_post("p1", created, -0.5, ["performance:slow"]),
+             analyzed_post(None, created, -0.5), analyzed_post(None, created, -0.5)]  # no id: kept
+    day = {b.pain_point: b for b in collect_buckets(posts).values() if b.granularity == "day"}
+    assert day["performance:slow"].count == 1
+    assert day[None].count == 3
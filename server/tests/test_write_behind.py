@@ -0,0 +1,209 @@
+"""
+Tests for the write-behind queue and the store's post writer (no database required).
+"""
+import pytest
+import sys
+import os
+import time
+import threading
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymongo.errors import AutoReconnect, OperationFailure
+import mongodb_store
+import write_behind
+from mongodb_store import MongoDBStore
+from write_behind import WriteBehindQueue, is_transient, retry_delay
+from tests.test_mongodb_store import FakeCollection, FakeDB, make_post
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(write_behind, "WRITE_BEHIND_RETRY_BASE_SECONDS", 0.01)
+
+
+class Recorder:
+    """Flush function recording its batches."""
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, batch):
+        self.batches.append(list(batch))
+        return [], {"saved": len(batch), "errors": []}
+
+
+def test_batches_fill_up_to_batch_size_and_flush_is_a_barrier():
+    recorder = Recorder()
+    queue = WriteBehindQueue(recorder, batch_size=3, flush_seconds=60)
+    queue.put(range(7))
+    totals = queue.flush(timeout=5)
+
+    assert totals == {"saved": 7, "errors": [], "pending": 0}
+    assert [item for batch in recorder.batches for item in batch] == list(range(7))
+    assert all(len(batch) <= 3 for batch in recorder.batches)
+    # Totals restart after each barrier
+    assert queue.flush(timeout=5) == {"pending": 0}
+    queue.close(timeout=5)
+
+
+def test_partial_batch_is_written_after_flush_seconds():
+    recorder = Recorder()
+    queue = WriteBehindQueue(recorder, batch_size=100, flush_seconds=0.05)
+    queue.put(["a", "b"])
+    deadline = time.monotonic() + 5
+    while not recorder.batches and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert recorder.batches == [["a", "b"]]
+    queue.close(timeout=5)
+
+
+def test_put_blocks_only_while_the_queue_is_full():
+    release = threading.Event()
+
+    def slow_flush(batch):
+        release.wait(5)
+        return [], {}
+
+    queue = WriteBehindQueue(slow_flush, max_items=2, batch_size=1, flush_seconds=0)
+    producer = threading.Thread(target=queue.put, args=(range(5),))
+    producer.start()
+    producer.join(0.2)
+    assert producer.is_alive() and len(queue) <= 2
+    release.set()
+    producer.join(5)
+    assert queue.flush(timeout=5)["pending"] == 0
+    queue.close(timeout=5)
+
+
+def test_transient_failures_are_retried_and_permanent_ones_dropped():
+    calls = []
+
+    def flaky_flush(batch):
+        calls.append(list(batch))
+        if len(calls) == 1:
+            raise AutoReconnect("primary stepped down")
+        if len(calls) == 2:
+            return batch[1:], {"saved": 1}  # first item written, the rest failed transiently
+        if "bad" in batch:
+            raise OperationFailure("document too large")
+        return [], {"saved": len(batch)}
+
+    queue = WriteBehindQueue(flaky_flush, batch_size=10, flush_seconds=60)
+    queue.put(["a", "b", "c"])
+    totals = queue.flush(timeout=5)
+    assert calls == [["a", "b", "c"], ["a", "b", "c"], ["b", "c"]]
+    assert totals == {"saved": 3, "pending": 0}
+    assert queue.stats["retries"] == 2
+
+    queue.put(["bad"])
+    totals = queue.flush(timeout=5)
+    assert totals["pending"] == 0 and "document too large" in totals["errors"][0]["error"]
+    queue.close(timeout=5)
+
+
+def test_retry_delay_doubles_up_to_the_cap():
+    assert [retry_delay(attempt, base=1, cap=5) for attempt in range(1, 5)] == [1, 2, 4, 5]
+    assert is_transient(AutoReconnect("x")) and not is_transient(OperationFailure("x"))
+
+
+class FlakyCollection(FakeCollection):
+    """Fails its first `outages` bulk_writes with a connection error."""
+    def __init__(self, name, outages=1):
+        super().__init__(name)
+        self.outages = outages
+
+    def bulk_write(self, operations, ordered=True):
+        if self.outages:
+            self.outages -= 1
+            raise AutoReconnect("connection reset")
+        return super().bulk_write(operations, ordered)
+
+
+def analyzed_posts(count):
+    posts = []
+    for index in range(count):
+        post = make_post(f"p{index}")
+        post.sentiment = -0.5
+        post.products = ["Cursor"]
+        post.pain_points = ["slow autocomplete"]
+        posts.append(post)
+    return posts
+
+
+def test_post_writer_saves_and_aggregates_through_an_outage():
+    store = MongoDBStore(None, lazy=True)
+    store.db = FakeDB()
+    store.db.posts = FlakyCollection("posts")
+    store.db.pain_point_series = FakeCollection("pain_point_series")
+    store.db.pain_point_spikes = FakeCollection("pain_point_spikes")
+
+    posts = analyzed_posts(4)
+    store.enqueue_posts(posts[:2])
+    store.enqueue_posts(posts[2:])
+    totals = store.flush_posts(timeout=5)
+
+    assert totals["saved"] == 4 and totals["newly_analyzed"] == 4
+    assert totals["errors"] == [] and totals["pending"] == 0
+    assert set(store.db.posts.docs) == {"p0", "p1", "p2", "p3"}
+    assert sorted(post.id for post in store.analyzed_posts) == ["p0", "p1", "p2", "p3"]
+    assert store.db.pain_points.docs and store.db.pain_point_series.docs and store.db.pain_point_spikes.docs
+
+    # A re-scrape of unchanged posts writes nothing and aggregates nothing
+    store.enqueue_posts(posts)
+    totals = store.flush_posts(timeout=5)
+    assert totals["saved"] == 4 and totals["written"] == 0 and totals["newly_analyzed"] == 0
+    store.post_writer.close(timeout=5)
+
+
+def test_flush_without_enqueued_posts():
+    assert MongoDBStore(None, lazy=True).flush_posts()["saved"] == 0
+
+
+def writer_store(**collections):
+    store = MongoDBStore(None, lazy=True)
+    store.db = FakeDB()
+    store.db.pain_point_series = FakeCollection("pain_point_series")
+    store.db.pain_point_spikes = FakeCollection("pain_point_spikes")
+    for name, collection in collections.items():
+        setattr(store.db, name, collection)
+    return store
+
+
+def test_post_queued_twice_is_aggregated_once():
+    store = writer_store()
+    post = analyzed_posts(1)[0]
+    store.enqueue_posts([post, post])
+    totals = store.flush_posts(timeout=5)
+
+    assert totals["newly_analyzed"] == 1
+    [update] = store.db.pain_points.writes
+    assert update["$inc"]["frequency"] == 1
+    assert update["$push"]["related_posts"]["$each"] == ["p0"]
+    store.post_writer.close(timeout=5)
+
+
+def test_aggregate_retries_are_capped(monkeypatch):
+    monkeypatch.setattr(mongodb_store, "WRITE_BEHIND_MAX_RETRIES", 2)
+    store = writer_store(pain_points=FlakyCollection("pain_points", outages=100))
+    store.enqueue_posts(analyzed_posts(2))
+    totals = store.flush_posts(timeout=5)
+
+    assert totals["pending"] == 0 and totals["saved"] == 2
+    assert store.db.pain_points.outages == 100 - 3  # first try and two retries
+    assert totals["errors"] and all(error["transient"] for error in totals["errors"])
+    store.post_writer.close(timeout=5)
+
+
+def test_flush_timeout_reports_pending_items():
+    outage = threading.Event()
+    outage.set()
+    queue = WriteBehindQueue(lambda batch: (batch if outage.is_set() else [], {}), batch_size=10, flush_seconds=0)
+    queue.put(range(3))
+    started = time.monotonic()
+    assert queue.flush(timeout=0.2)["pending"] == 3
+    assert time.monotonic() - started < 2
+
+    # The items are still queued and written once the outage ends
+    outage.clear()
+    assert queue.close(timeout=5)["pending"] == 0
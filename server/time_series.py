@@ -0,0 +1,180 @@
+"""
+Time-bucketed pain-point and sentiment series.
+
+Every newly analyzed post is added to daily and hourly bucket documents in
+the pain_point_series collection, one per product x pain point x subreddit
+(plus a pain_point=None series per product x subreddit holding the
+sentiment of all its posts). Buckets hold the post count and sentiment sum;
+average sentiment and severity are derived when a series is read, the same
+way pain point aggregates derive them. Trend queries read a handful of small
+documents per bucket from an index range and never touch posts.
+"""
+import os
+from datetime import datetime, timedelta
+from typing import Dict
+
+# Bucket sizes and the default window /api/trends returns for each
+GRANULARITIES = {
+    "day": timedelta(days=1),
+    "hour": timedelta(hours=1),
+}
+DEFAULT_WINDOWS = {
+    "day": timedelta(days=30),
+    "hour": timedelta(hours=48),
+}
+
+# Hourly buckets expire after this many days (daily buckets are kept)
+HOURLY_RETENTION_DAYS = int(os.getenv("HOURLY_SERIES_RETENTION_DAYS", 90))
+
+
+def created_datetime(value):
+    """Post creation time as a naive UTC datetime (accepts datetimes, timestamps and ISO strings)."""
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, (int, float)):
+        return datetime.utcfromtimestamp(value)
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    return None
+
+
+def bucket_start(moment, granularity):
+    """Start of the bucket a moment falls in."""
+    if granularity == "day":
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+    return moment.replace(minute=0, second=0, microsecond=0, tzinfo=None)
+
+
+class Bucket:
+    """Contribution of a batch of posts to one series bucket."""
+    def __init__(self, granularity, start, product, pain_point, subreddit):
+        self.granularity = granularity
+        self.start = start
+        self.product = product
+        self.pain_point = pain_point  # "category:indicator", or None for all posts
+        self.subreddit = subreddit
+        self.count = 0
+        self.sentiment_sum = 0.0
+
+    @property
+    def key(self):
+        return f"{self.granularity}:{self.start.isoformat()}:{self.product}:{self.pain_point or '*'}:{self.subreddit}"
+
+
+def collect_buckets(posts, granularities=tuple(GRANULARITIES)) -> Dict[str, Bucket]:
+    """
+    Group the series contributions of analyzed posts.
+
+    Args:
+        posts (list): Posts with sentiment, products, pain_points, subreddit and created_utc set;
+            a post repeated by id counts once
+        granularities (tuple): Bucket sizes to fill
+
+    Returns:
+        dict: Bucket key -> Bucket
+    """
+    buckets = {}
+    seen = set()
+    for post in posts:
+        sentiment = getattr(post, 'sentiment', None)
+        products = getattr(post, 'products', None)
+        created = created_datetime(getattr(post, 'created_utc', None))
+        post_id = getattr(post, 'id', None)
+        if sentiment is None or not products or created is None or post_id in seen:
+            continue
+        if post_id is not None:
+            seen.add(post_id)
+        subreddit = (getattr(post, 'subreddit', None) or "").lower()
+        pain_points = [None] + list(getattr(post, 'pain_points', None) or [])
+        for granularity in granularities:
+            start = bucket_start(created, granularity)
+            for product in products:
+                for pain_point in pain_points:
+                    bucket = Bucket(granularity, start, product, pain_point, subreddit)
+                    bucket = buckets.setdefault(bucket.key, bucket)
+                    bucket.count += 1
+                    bucket.sentiment_sum += sentiment
+    return buckets
+
+
+def bucket_update(bucket: Bucket):
+    """
+    Update document adding a bucket contribution to its stored bucket (for an upsert).
+
+    Returns:
+        dict: $inc/$setOnInsert update
+    """
+    fields = {
+        "granularity": bucket.granularity,
+        "bucket": bucket.start,
+        "product": bucket.product,
+        "pain_point": bucket.pain_point,
+        "subreddit": bucket.subreddit,
+    }
+    if bucket.granularity == "hour":
+        fields["expires_at"] = bucket.start + timedelta(days=HOURLY_RETENTION_DAYS)
+    return {"$inc": {"count": bucket.count, "sentiment_sum": bucket.sentiment_sum}, "$setOnInsert": fields}
+
+
+def series_query(product, pain_point=None, subreddit=None, granularity="day", start=None, end=None):
+    """
+    Filter for the buckets of one series.
+
+    Args:
+        product (str): Product name
+        pain_point (str): "category:indicator", or None for the sentiment of all posts
+        subreddit (str): Restrict to one subreddit (default: all subreddits summed)
+        granularity (str): 'day' or 'hour'
+        start (datetime): First bucket (default: DEFAULT_WINDOWS before end)
+        end (datetime): Last bucket (default: now)
+
+    Returns:
+        dict: MongoDB filter on pain_point_series
+    """
+    end = end or datetime.utcnow()
+    start = start or end - DEFAULT_WINDOWS[granularity]
+    query = {
+        "granularity": granularity,
+        "product": product,
+        "pain_point": pain_point,
+        "bucket": {"$gte": bucket_start(start, granularity), "$lte": end},
+    }
+    if subreddit:
+        query["subreddit"] = subreddit.lower()
+    return query
+
+
+def trend_pipeline(product, pain_point=None, subreddit=None, granularity="day", start=None, end=None):
+    """Aggregation summing a series' buckets over subreddits, oldest first."""
+    return [
+        {"$match": series_query(product, pain_point, subreddit, granularity, start, end)},
+        {"$group": {"_id": "$bucket", "count": {"$sum": "$count"}, "sentiment_sum": {"$sum": "$sentiment_sum"}}},
+        {"$sort": {"_id": 1}},
+    ]
+
+
+def series_point(bucket, count, sentiment_sum):
+    """One point of a trend, with average sentiment and severity derived from the sums."""
+    return {
+        "bucket": bucket.isoformat() if isinstance(bucket, datetime) else bucket,
+        "count": count,
+        "avg_sentiment": sentiment_sum / count if count else 0,
+        "severity": max(0.0, -sentiment_sum),
+    }
+
+
+def memory_trend(posts, product, pain_point=None, subreddit=None, granularity="day", start=None, end=None):
+    """The same trend computed from in-memory posts (the no-database fallback)."""
+    query = series_query(product, pain_point, subreddit, granularity, start, end)
+    totals = {}
+    for bucket in collect_buckets(posts, (granularity,)).values():
+        if (bucket.product != product or bucket.pain_point != pain_point
+                or (subreddit and bucket.subreddit != query["subreddit"])
+                or not query["bucket"]["$gte"] <= bucket.start <= query["bucket"]["$lte"]):
+            continue
+        count, sentiment_sum = totals.get(bucket.start, (0, 0.0))
+        totals[bucket.start] = (count + bucket.count, sentiment_sum + bucket.sentiment_sum)
+    return [series_point(moment, *totals[moment]) for moment in sorted(totals)]
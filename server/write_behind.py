@@ -0,0 +1,197 @@
+"""
+Write-behind queue.
+
+Producers put() items into a bounded in-memory queue and carry on; a
+dedicated writer thread hands them to a flush function in batches, as soon
+as batch_size items are waiting or flush_seconds after the first of them
+arrived. The flush function returns the items that failed with a transient
+error (connection loss, primary step-down, timeouts); those go back to the
+front of the queue and are retried with capped exponential backoff until
+they succeed, so a database outage delays writes but does not drop them.
+flush() is a barrier: it returns once everything put before the call has
+been written (or failed permanently), with the totals the flush function
+reported since the previous barrier.
+"""
+import os
+import time
+import logging
+import threading
+from collections import deque
+
+from pymongo.errors import AutoReconnect, ConnectionFailure, ExecutionTimeout, WTimeoutError
+
+logger = logging.getLogger(__name__)
+
+WRITE_BEHIND_MAX_ITEMS = int(os.getenv("WRITE_BEHIND_MAX_ITEMS", 20000))
+WRITE_BEHIND_BATCH_SIZE = int(os.getenv("WRITE_BEHIND_BATCH_SIZE", 1000))
+WRITE_BEHIND_FLUSH_SECONDS = float(os.getenv("WRITE_BEHIND_FLUSH_SECONDS", 2.0))
+# Retry delays double from the base up to the cap
+WRITE_BEHIND_RETRY_BASE_SECONDS = float(os.getenv("WRITE_BEHIND_RETRY_BASE_SECONDS", 0.5))
+WRITE_BEHIND_RETRY_MAX_SECONDS = float(os.getenv("WRITE_BEHIND_RETRY_MAX_SECONDS", 30.0))
+# Retries of a step that must not be replayed partially (the store's aggregate updates)
+# before its errors are reported instead
+WRITE_BEHIND_MAX_RETRIES = int(os.getenv("WRITE_BEHIND_MAX_RETRIES", 8))
+
+# Errors after which a write can succeed if tried again (NotPrimaryError, NetworkTimeout
+# and ServerSelectionTimeoutError are subclasses)
+TRANSIENT_ERRORS = (AutoReconnect, ConnectionFailure, ExecutionTimeout, WTimeoutError)
+
+
+def is_transient(error):
+    """Whether an exception is a transient MongoDB error."""
+    return isinstance(error, TRANSIENT_ERRORS)
+
+
+def retry_delay(attempt, base=None, cap=None):
+    """Backoff before retry number `attempt` (1-based)."""
+    base = WRITE_BEHIND_RETRY_BASE_SECONDS if base is None else base
+    cap = WRITE_BEHIND_RETRY_MAX_SECONDS if cap is None else cap
+    return min(cap, base * 2 ** (attempt - 1))
+
+
+class WriteBehindQueue:
+    """
+    Bounded queue flushed in batches by a writer thread.
+
+    Args:
+        flush (callable): Called with a list of items; returns a tuple
+            (retry_items, totals), where retry_items failed transiently and
+            totals is a dict of counts (summed) and lists (concatenated)
+        name (str): Writer thread name
+        max_items (int): Queue capacity; put() blocks while it is full
+        batch_size (int): Items per flush call
+        flush_seconds (float): Longest time an item waits for its batch to fill
+    """
+    def __init__(self, flush, name="write-behind", max_items=WRITE_BEHIND_MAX_ITEMS,
+                 batch_size=WRITE_BEHIND_BATCH_SIZE, flush_seconds=WRITE_BEHIND_FLUSH_SECONDS):
+        self._flush = flush
+        self.max_items = max_items
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._items = deque()
+        self._condition = threading.Condition()
+        self._enqueued = 0  # items put so far
+        self._done = 0  # items written or failed permanently so far
+        self._barrier = False  # a flush() is waiting: do not wait for batches to fill
+        self._oldest = None  # monotonic time the oldest waiting item arrived
+        self._attempt = 0  # consecutive transient failures
+        self._totals = {}
+        self._closed = False
+        self.stats = {"batches": 0, "items": 0, "retries": 0}
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def __len__(self):
+        with self._condition:
+            return len(self._items)
+
+    def put(self, items):
+        """
+        Queue items for writing.
+
+        Blocks only while the queue is full (the writer is more than
+        max_items behind), which keeps memory bounded during an outage.
+        """
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Write-behind queue is closed")
+            for item in items:
+                while len(self._items) >= self.max_items:
+                    self._condition.wait()
+                if not self._items:
+                    self._oldest = time.monotonic()
+                self._items.append(item)
+                self._enqueued += 1
+            self._condition.notify_all()
+
+    def flush(self, timeout=None):
+        """
+        Wait until every item put before this call has been handled.
+
+        Args:
+            timeout (float): Seconds to wait at most (default: no limit)
+
+        Returns:
+            dict: Totals reported by the flush function since the previous
+            flush() (with "pending": items still queued on timeout)
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            target = self._enqueued
+            self._barrier = True
+            self._condition.notify_all()
+            while self._done < target:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            self._barrier = False
+            totals, self._totals = self._totals, {}
+            totals["pending"] = target - min(self._done, target)
+            return totals
+
+    def close(self, timeout=None):
+        """Flush what is queued and stop the writer thread."""
+        totals = self.flush(timeout)
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+        return totals
+
+    def _next_batch(self):
+        """Wait for a full batch, the flush deadline of the oldest item, or a barrier."""
+        with self._condition:
+            while True:
+                if self._items:
+                    waited = time.monotonic() - self._oldest
+                    if (len(self._items) >= self.batch_size or self._barrier or self._closed
+                            or waited >= self.flush_seconds):
+                        break
+                    self._condition.wait(self.flush_seconds - waited)
+                elif self._closed:
+                    return None
+                else:
+                    self._condition.wait()
+            batch = [self._items.popleft() for _ in range(min(self.batch_size, len(self._items)))]
+            self._oldest = time.monotonic() if self._items else None
+            self._condition.notify_all()  # room for blocked producers
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            try:
+                retry, totals = self._flush(batch)
+            except Exception as e:
+                if is_transient(e):
+                    retry, totals = batch, {}
+                else:
+                    logger.error(f"Write-behind flush failed, dropping {len(batch)} items: {str(e)}")
+                    retry, totals = [], {"errors": [{"id": None, "error": str(e)}]}
+
+            with self._condition:
+                self.stats["batches"] += 1
+                self.stats["items"] += len(batch) - len(retry)
+                self._done += len(batch) - len(retry)
+                for key, value in totals.items():
+                    if isinstance(value, list):
+                        self._totals.setdefault(key, []).extend(value)
+                    else:
+                        self._totals[key] = self._totals.get(key, 0) + value
+                if retry:
+                    # Back to the front, in order, ahead of newer items
+                    self._items.extendleft(reversed(retry))
+                    self._oldest = time.monotonic()
+                    self._attempt += 1
+                    self.stats["retries"] += 1
+                else:
+                    self._attempt = 0
+                self._condition.notify_all()
+
+            if retry:
+                delay = retry_delay(self._attempt)
+                logger.warning(f"Transient database error, retrying {len(retry)} writes in {delay:.1f}s")
+                time.sleep(delay)